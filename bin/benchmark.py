@@ -0,0 +1,364 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# usage: run this script in the bin directory with 'python benchmark.py [name ...]'
+# each benchmark prints timings for a performance-sensitive part of fullcontrol - with no names given, all benchmarks are run
+# the number of points can be reduced for a quick check with the environment variable FC_BENCHMARK_POINTS (default 1,000,000)
+
+N_POINTS = int(os.environ.get('FC_BENCHMARK_POINTS', 1_000_000))
+
+
+def timed(label: str, func, per: int = None):
+    'run func once and print the time taken (and the time per item if per is given)'
+    t0 = time.perf_counter()
+    result = func()
+    t = time.perf_counter() - t0
+    print(f'  {label}: {t:.3f} s' + (f' ({t / per * 1e6:.3f} us per item)' if per else ''))
+    return result
+
+
+def benchmark_dispatch():
+    'per-step overhead of the gcode step loop: isinstance/hasattr chain (before) vs dispatch table (after)'
+    from fullcontrol.gcode import Point, Printer, GcodeControls
+    from fullcontrol.gcode.state import State
+    from fullcontrol.gcode.dispatch import process_steps
+
+    def isinstance_chain(steps, state):
+        # the step loop used before the dispatch table was introduced
+        for step in steps:
+            g_cmd = None
+            if isinstance(step, Printer):
+                state.printer.update_from(step)
+                g_cmd = step.gcode(state)
+            elif hasattr(step, 'gcode'):
+                g_cmd = step.gcode(state)
+                if isinstance(step, Point):
+                    state.point = step
+            if g_cmd:
+                if isinstance(g_cmd, str):
+                    state.gcode.append(g_cmd)
+                elif isinstance(g_cmd, list):
+                    state.gcode.extend(g_cmd)
+
+    class NoOpStep:
+        'step with a trivial gcode method, so only the loop overhead is measured'
+        def gcode(self, state):
+            return None
+
+    print(f'dispatch ({N_POINTS:,} steps)')
+    points = timed('create Points', lambda: [Point(x=i % 100, y=i % 37, z=0.2) for i in range(N_POINTS)], N_POINTS)
+    no_ops = [NoOpStep()] * N_POINTS
+    for label, steps in (('no-op steps', no_ops), ('Points', points)):
+        for name, loop in (('before (isinstance chain)', isinstance_chain), ('after (dispatch table)', process_steps)):
+            state = State(steps, GcodeControls())
+            timed(f'{label}, {name}', lambda: loop(steps, state), N_POINTS)
+
+
+def benchmark_parallel():
+    'serial gcode generation vs chunks generated in parallel worker processes'
+    from fullcontrol.gcode import gcode, Point, Extruder, GcodeControls
+
+    layers = 100
+    per_layer = N_POINTS // layers
+    print(f'parallel ({layers * per_layer:,} points, {os.cpu_count()} cpus)')
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for layer in range(layers):
+        steps.extend(Point(x=i % 100, y=(i * 7) % 100, z=0.2 * (layer + 1)) for i in range(per_layer))
+    serial = timed('serial', lambda: gcode(steps, GcodeControls(), show_tips=False), len(steps))
+    for workers in (2, 4, os.cpu_count()):
+        result = timed(f'{workers} workers', lambda: gcode(steps, GcodeControls(parallel_workers=workers), show_tips=False), len(steps))
+        assert result == serial
+
+
+def benchmark_session():
+    'regenerating gcode after editing one step: full generation vs GcodeSession re-rendering the edited region'
+    from fullcontrol.gcode import gcode, GcodeSession, Point, Extruder, GcodeControls
+
+    layers = 100
+    per_layer = N_POINTS // layers
+    print(f'session ({layers * per_layer:,} points)')
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for layer in range(layers):
+        steps.extend(Point(x=i % 100, y=(i * 7) % 100, z=0.2 * (layer + 1)) for i in range(per_layer))
+    session = GcodeSession(GcodeControls(), show_tips=False)
+    timed('first generation', lambda: session.gcode(steps), len(steps))
+    middle = len(steps) // 2
+    steps[middle] = Point(x=50.5, y=50.5, z=steps[middle].z)
+    full = timed('full regeneration after edit', lambda: gcode(steps, GcodeControls(), show_tips=False), len(steps))
+    result = timed('session regeneration after edit', lambda: session.gcode(steps), len(steps))
+    assert result == full
+    print(f'  steps re-rendered by session: {session.steps_rendered:,}')
+
+
+def benchmark_point_runs():
+    'extrusion moves for a run of Points: one step at a time (before) vs whole runs at once (after)'
+    from fullcontrol.gcode import Point, Extruder, GcodeControls
+    from fullcontrol.gcode.state import State
+    from fullcontrol.gcode.dispatch import process_step, process_steps
+
+    print(f'point runs ({N_POINTS:,} points)')
+    steps = [Extruder(on=True)] + [Point(x=i % 100, y=(i * 7) % 100, z=0.2) for i in range(N_POINTS)]
+
+    def one_at_a_time(steps, state):
+        for step in steps:
+            process_step(step, state)
+
+    results = []
+    for name, loop in (('before (one step at a time)', one_at_a_time), ('after (whole runs)', process_steps)):
+        state = State(steps, GcodeControls())
+        timed(f'Point.gcode, {name}', lambda: loop(steps, state), N_POINTS)
+        results.append(state.gcode)
+    assert results[0] == results[1]
+
+
+def benchmark_bgcode():
+    'compressing gcode text for saving: gzip (gcode.gz) and heatshrink blocks (bgcode), with throughput in MB/s'
+    import gzip
+    from fullcontrol.gcode import gcode, Point, Extruder, GcodeControls
+    from fullcontrol.gcode.bgcode import bgcode_chunks
+
+    n = N_POINTS // 10
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    steps.extend(Point(x=i % 100, y=(i * 7) % 100, z=0.2 * (i // 10000 + 1)) for i in range(n))
+    text = gcode(steps, GcodeControls(), show_tips=False)
+    size = len(text) / 1e6
+    print(f'bgcode ({size:.1f} MB of gcode)')
+    for label, compress in (('gcode.gz', lambda: gzip.compress(text.encode())),
+                            ('bgcode (heatshrink_12_4)', lambda: b''.join(bgcode_chunks([text])))):
+        t0 = time.perf_counter()
+        result = timed(label, compress)
+        print(f'    {size / (time.perf_counter() - t0):.1f} MB/s, {len(result) / 1e6:.2f} MB')
+
+
+def benchmark_import_gcode():
+    'importing a gcode file: a table of moves, PointArray steps and Point steps (with throughput in MB/s)'
+    import tempfile
+    from fullcontrol.gcode import gcode, import_gcode, Point, Extruder, GcodeControls
+
+    print(f'import_gcode ({N_POINTS:,} moves)')
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    steps.extend(Point(x=i % 100, y=(i * 7) % 100, z=0.2 * (i // 10000 + 1)) for i in range(N_POINTS))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'benchmark.gcode')
+        gcode(steps, GcodeControls(output=path), show_tips=False)
+        size = os.path.getsize(path) / 1e6
+        for label, kwargs in (('table', {'result_type': 'table'}), ('PointArray steps', {'point_arrays': True}),
+                              ('Point steps', {})):
+            t0 = time.perf_counter()
+            timed(label, lambda: import_gcode(path, **kwargs), N_POINTS)
+            print(f'    {size / (time.perf_counter() - t0):.1f} MB/s')
+
+
+def benchmark_estimate():
+    'print time estimate (motion planning) for a table of moves'
+    import numpy as np
+    from fullcontrol.gcode.estimate import move_times, motion_limits
+    from fullcontrol.gcode.importer import MoveTable
+
+    print(f'estimate ({N_POINTS:,} moves)')
+    rng = np.random.default_rng(0)
+    xyz = np.cumsum(rng.normal(0, 2, (N_POINTS, 3)) * [1, 1, 0], axis=0)
+    nan = np.full(N_POINTS, np.nan)
+    moves = MoveTable(np.ones(N_POINTS), *xyz.T, rng.choice([0.0, 0.1], N_POINTS), np.full(N_POINTS, 3000.0), nan, nan)
+    times = timed('move_times', lambda: move_times(moves, motion_limits()), N_POINTS)
+    print(f'    estimated print time: {times.sum() / 3600:.2f} h')
+
+
+def benchmark_travel():
+    'reordering islands of a lattice printed in a random order: nearest neighbour + 2-opt'
+    import numpy as np
+    from fullcontrol.gcode import Point, Extruder
+    from fullcontrol.gcode.travel import optimize_travel
+
+    n_islands = max(N_POINTS // 100, 10)
+    print(f'travel ({n_islands:,} islands)')
+    columns = int(np.sqrt(n_islands))
+    steps = []
+    for cell in np.random.default_rng(0).permutation(n_islands).tolist():
+        x, y = 5.0 * (cell % columns), 5.0 * (cell // columns)
+        steps += [Extruder(on=False), Point(x=x, y=y, z=0.2), Extruder(on=True), Point(x=x + 2, y=y, z=0.2),
+                  Point(x=x + 2, y=y + 2, z=0.2), Point(x=x, y=y + 2, z=0.2)]
+    stats = {}
+    timed('optimize_travel', lambda: list(optimize_travel(steps, stats=stats)), n_islands)
+    print(f"    travel: {stats['travel_before']:,.0f} mm before, {stats['travel_after']:,.0f} mm after")
+
+
+def benchmark_repeats():
+    'gcode for copies of a part (as from move(..., copy=True)), generated in full and with repeat_copies'
+    import math
+    from fullcontrol.gcode import gcode, GcodeControls, Point, Extruder
+
+    n_copies = max(N_POINTS // 500, 3)
+    print(f'repeats ({n_copies:,} copies of {500:,} points)')
+    part = [(5 * math.cos(a / 80), 5 * math.sin(a / 80), 0.2 + 0.2 * (a // 100)) for a in range(500)]
+    steps = []
+    for i in range(n_copies):
+        steps += [Extruder(on=False), Point(x=12.0 * i + 5, y=0, z=0.2), Extruder(on=True)]
+        steps += [Point(x=12.0 * i + x, y=y, z=z) for x, y, z in part]
+    for mode in (None, 'relative', 'loop'):
+        text = timed(f'repeat_copies={mode}', lambda: gcode(steps, GcodeControls(repeat_copies=mode), show_tips=False),
+                     len(steps))
+        print(f'    {len(text) / 1e6:.2f} MB of gcode')
+
+
+def benchmark_profiles():
+    'printer set-up for a batch of small parts: set_up() for every part (before) vs the profile cache (after)'
+    from importlib import import_module
+    from fullcontrol.gcode.profiles import printer_profile
+
+    n_parts = max(N_POINTS // 100, 10)
+    print(f'profiles ({n_parts:,} parts)')
+    overrides = {'nozzle_temp': 215, 'bed_temp': 60}
+    for name in ('ender_3', 'Cura/Creality Ender-3 / Ender-3 v2'):
+        if '/' in name:
+            from fullcontrol.gcode.import_printer import import_printer
+            set_up = lambda: import_printer(name, overrides)
+        else:
+            set_up = lambda: import_module(f'fullcontrol.devices.community.singletool.{name}').set_up(overrides)
+        timed(f'{name}: set_up', lambda: [set_up() for _ in range(n_parts)], n_parts)
+        timed(f'{name}: printer_profile', lambda: [printer_profile(name, overrides) for _ in range(n_parts)], n_parts)
+
+
+def benchmark_printer_library():
+    'reading the settings of every Cura printer: importing its module (before) vs the compiled database (after)'
+    import json
+    import os
+    from importlib import import_module
+    from fullcontrol.gcode.printer_library import CURA_DIRECTORY, cura_settings, printer_names, search_printers
+
+    with open(os.path.join(CURA_DIRECTORY, 'library.json')) as file:
+        library = json.load(file)
+    print(f'printer_library ({len(library):,} printers)')
+    timed('database: settings of all printers', lambda: [cura_settings(name) for name in library], len(library))
+    timed('import modules', lambda: [import_module(f'fullcontrol.devices.cura.settings.{module}').default_initial_settings
+                                     for module in library.values()], len(library))
+    timed('printer_names', printer_names)
+    timed("search_printers('ender 3')", lambda: search_printers('ender 3'))
+
+
+def benchmark_imports():
+    'start-up time of a new process for each import, and the modules loaded (best of several runs)'
+    import subprocess
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    statements = {
+        'import fullcontrol': 'import fullcontrol',
+        'import fullcontrol.gcode': 'import fullcontrol.gcode',
+        'fc.Point (all classes for designs)': 'import fullcontrol as fc; fc.Point',
+        'plot data (raw_data=True)': "import fullcontrol as fc; fc.transform([fc.Point(x=0, y=0, z=0), "
+                                     "fc.Point(x=1, y=0, z=0)], 'plot', fc.PlotControls(raw_data=True), show_tips=False)",
+        'plotting and mesh export': 'import fullcontrol.visualize.plotly',
+    }
+    report = "; import sys; print(len(sys.modules), 'plotly' in sys.modules)"
+    print('imports')
+    for label, statement in statements.items():
+        times = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            output = subprocess.run([sys.executable, '-c', statement + report], cwd=root, capture_output=True,
+                                    text=True, check=True).stdout.split()
+            times.append(time.perf_counter() - t0)
+        print(f'  {label}: {min(times):.3f} s, {output[-2]} modules, plotly loaded: {output[-1]}')
+
+
+def benchmark_points():
+    'construction cost per point for the Point classes and for geometry functions that create points'
+    import fullcontrol as fc
+    import fullcontrol.gcode as gc
+    import fullcontrol.point
+
+    n = max(N_POINTS // 10, 10)
+    print(f'points ({n:,} points)')
+    for label, cls in (('fc.Point', fc.Point), ('gcode Point', gc.Point), ('base Point', fullcontrol.point.Point)):
+        timed(label, lambda: [cls(x=float(i), y=1.0, z=0.2) for i in range(n)], n)
+    centre = fc.Point(x=0, y=0, z=0.2)
+    timed('polar_to_point', lambda: [fc.polar_to_point(centre, 10, i * 0.001) for i in range(n)], n)
+    timed('arcXY', lambda: fc.arcXY(centre, 10, 0, 6.28, n - 1), n)
+
+
+def benchmark_transforms():
+    'moving copies of a list of points: deepcopy of each point (before) vs copy_with (after)'
+    from copy import deepcopy
+    import fullcontrol as fc
+
+    n, copies = max(N_POINTS // 50, 10), 10
+    print(f'transforms ({n:,} points, {copies} copies)')
+    points = [fc.Point(x=float(i % 100), y=float(i // 100), z=0.2, color=[1, 0, 0]) for i in range(n)]
+    timed('deepcopy each point', lambda: [deepcopy(p) for _ in range(copies) for p in points], n * copies)
+    timed('move(copy=True)', lambda: fc.move(points, fc.Vector(x=1), copy=True, copy_quantity=copies), n * copies)
+    timed('move_polar(copy=True)', lambda: fc.move_polar(points, fc.Point(x=0, y=0, z=0), 0, 0.1, copy=True,
+                                                         copy_quantity=copies), n * copies)
+    timed('points_only', lambda: fc.points_only(points * copies, track_xyz=False), n * copies)
+
+
+def benchmark_geometry():
+    'a 100-layer helix with 360 segments per layer: a list of Points (before) vs return_array=True (after)'
+    import fullcontrol as fc
+
+    centre = fc.Point(x=50, y=50, z=0.2)
+    print(f'geometry ({100 * 360:,} points)')
+    for return_array in (False, True):
+        timed(f'helixZ(return_array={return_array})', lambda: fc.helixZ(centre, 10, 10, 0, 100, 0.2, 100 * 360,
+                                                                      return_array=return_array), 100 * 360)
+    timed('sinewaveXYpolar(return_array=True)', lambda: fc.sinewaveXYpolar(centre, 0, 1, 2, 1000, 36, return_array=True),
+          36_000)
+
+
+def benchmark_transform_chain():
+    'four chained transformations: geometry functions one after another (before) vs a Transform (after)'
+    import fullcontrol as fc
+
+    n = max(N_POINTS // 20, 10)
+    print(f'transform_chain ({n:,} points)')
+    points = [fc.Point(x=float(i % 100), y=float(i // 100), z=0.2) for i in range(n)]
+    centre, p1, p2 = fc.Point(x=50, y=50, z=0), fc.Point(x=0, y=0, z=0), fc.Point(x=1, y=2, z=0)
+
+    def functions():
+        steps = fc.move(points, fc.Vector(x=10, y=5))
+        steps = fc.move_polar(steps, centre, 0, 0.5)
+        steps = [fc.reflectXY(p, p1, p2) for p in steps]
+        return fc.move(steps, fc.Vector(z=0.2))
+    timed('geometry functions', functions, n)
+    chain = fc.Transform(points).move(fc.Vector(x=10, y=5)).move_polar(centre, 0, 0.5).reflectXY(p1, p2).move(fc.Vector(z=0.2))
+    timed('Transform.apply', chain.apply, n)
+
+
+def benchmark_arc_length():
+    'resampling a path with equally spaced points: segmented_path and ArcLength'
+    import fullcontrol as fc
+
+    n = max(N_POINTS // 100, 20)
+    print(f'arc_length ({n:,} points, {n:,} segments)')
+    path = [fc.Point(x=float(i), y=float(i % 2), z=0.2) for i in range(n)]
+    timed('segmented_path', lambda: fc.segmented_path(path, n), n)
+    arc = timed('ArcLength', lambda: fc.ArcLength(path), n)
+    timed('ArcLength.resample(return_array=True)', lambda: arc.resample(n, return_array=True), n)
+
+
+BENCHMARKS = {
+    'dispatch': benchmark_dispatch,
+    'point_runs': benchmark_point_runs,
+    'parallel': benchmark_parallel,
+    'session': benchmark_session,
+    'bgcode': benchmark_bgcode,
+    'import_gcode': benchmark_import_gcode,
+    'estimate': benchmark_estimate,
+    'travel': benchmark_travel,
+    'repeats': benchmark_repeats,
+    'profiles': benchmark_profiles,
+    'printer_library': benchmark_printer_library,
+    'imports': benchmark_imports,
+    'points': benchmark_points,
+    'transforms': benchmark_transforms,
+    'geometry': benchmark_geometry,
+    'transform_chain': benchmark_transform_chain,
+    'arc_length': benchmark_arc_length,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,42 @@
+# build_cura_devices.py - compile the Cura printer profiles in fullcontrol/devices/cura/settings into one database file
+
+# executed from the root of the repo after changing the profiles in fullcontrol/devices/cura/settings
+usage = '  usage: python bin/build_cura_devices.py'
+
+import ast
+import json
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+from fullcontrol.gcode.printer_library import CURA_DIRECTORY, CURA_DATABASE
+
+
+def build():
+    '''
+    Write the settings of every printer in library.json as one line of JSON each, preceded by a line with an index of
+    the byte offset and length of each printer's line (from the end of the index line) and its manufacturer. Settings
+    are read from the modules with ast.literal_eval(), so no modules are imported.
+    '''
+    with open(os.path.join(CURA_DIRECTORY, 'library.json')) as file:
+        library = json.load(file)
+    index, lines, offset = {}, [], 0
+    for name, module in library.items():
+        with open(os.path.join(CURA_DIRECTORY, 'settings', f'{module}.py')) as file:
+            tree = ast.parse(file.read())
+        settings = ast.literal_eval(tree.body[0].value)
+        line = (json.dumps(settings, separators=(',', ':')) + '\n').encode('ascii')
+        index[name] = [offset, len(line), settings.get('manufacturer', ''), module]
+        lines.append(line)
+        offset += len(line)
+    with open(CURA_DATABASE, 'wb') as file:
+        file.write((json.dumps(index, separators=(',', ':')) + '\n').encode('ascii'))
+        file.writelines(lines)
+    print(f'wrote {len(index)} printers to {CURA_DATABASE} ({os.path.getsize(CURA_DATABASE) / 1e6:.2f} MB)')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(usage)
+    else:
+        build()
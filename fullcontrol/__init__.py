@@ -1 +1,31 @@
-from fullcontrol.combinations.gcode_and_visualize.common import *
+'''
+The functions and classes for designs (e.g. fc.Point, fc.transform) are loaded on first use (PEP 562 module
+__getattr__), so processes that only import a subpackage (e.g. fullcontrol.gcode in worker processes) don't load the
+visualization, geometry and combined classes. Plotly is only loaded when a plot is created.
+'''
+from importlib import import_module as _import_module
+
+# module with everything that 'import fullcontrol as fc' gives access to
+_COMMON = 'fullcontrol.combinations.gcode_and_visualize.common'
+
+
+def _load() -> list:
+    'add the public names of the common module to this module, in the same way as "from ... import *"'
+    common = _import_module(_COMMON)
+    namespace = globals()
+    namespace.update({name: value for name, value in vars(common).items() if not name.startswith('_')})
+    # subpackages imported along the way are attributes of this module too
+    namespace['__all__'] = [name for name in namespace if not name.startswith('_')]
+    return namespace['__all__']
+
+
+def __getattr__(name: str):
+    if name == '__all__':
+        return _load()
+    if not name.startswith('__') and name in _load():
+        return globals()[name]
+    raise AttributeError(f"module 'fullcontrol' has no attribute '{name}'")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_load()))
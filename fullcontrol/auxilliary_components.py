@@ -1,6 +1,6 @@
 from typing import Optional
 from pydantic import Field
-from fullcontrol.common import BaseModelPlus
+from fullcontrol.base import BaseModelPlus
 
 
 class Fan(BaseModelPlus):
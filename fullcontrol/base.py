@@ -1,13 +1,27 @@
 # from pydantic import model_validator, BaseModel
 from pydantic import BaseModel, __version__
 
-if int(__version__.split('.')[0]) >= 2:
+PYDANTIC_V2 = int(__version__.split('.')[0]) >= 2
+
+if PYDANTIC_V2:
     from pydantic import model_validator as validator
     validator_args = {"mode": "before"}
 else:
     from pydantic import root_validator as validator
     validator_args = {"pre": True}
 
+# names of the fields of each class, for check_card_number_omitted()
+_field_names = {}
+
+
+def field_names(cls) -> frozenset:
+    'the names of the fields of a pydantic class, found once per class'
+    names = _field_names.get(cls)
+    if names is None:
+        names = _field_names[cls] = frozenset(cls.model_fields if PYDANTIC_V2 else cls.__fields__)
+    return names
+
+
 class BaseModelPlus(BaseModel):
 
     """
@@ -23,6 +37,7 @@ class BaseModelPlus(BaseModel):
         __setitem__: Sets the value of an attribute.
         __getitem__: Retrieves the value of an attribute.
         update_from: Updates the attributes of the object from another object.
+        copy_with: Returns a copy of the object with some attributes changed.
         check_card_number_omitted: Validator to check if certain attributes are allowed.
 
     """
@@ -46,6 +61,35 @@ class BaseModelPlus(BaseModel):
                 if (value is not None) and (key in self_vars):
                     self[key] = value
 
+    def copy_with(self, **values):
+        """
+        Returns a copy of the object with the given attributes changed, e.g. point.copy_with(x=point.x + 1).
+
+        Lists, dicts and sets (e.g. a Point's color) are copied one level deep so the copy can be edited without
+        changing the original, and other attributes are shared, which is much faster than copy.deepcopy().
+
+        Args:
+            **values: New values of attributes of the copy (not validated, as for model_copy()).
+
+        Returns:
+            A new object of the same class.
+        """
+        state = vars(self).copy()
+        for key, value in state.items():
+            if isinstance(value, (list, dict, set)):
+                state[key] = value.copy()
+        state.update(values)
+        if not PYDANTIC_V2:
+            return self.copy(update=state)
+        # the same as model_copy(update=values), without copy.copy() of each of pydantic's attributes
+        copied = object.__new__(type(self))
+        object.__setattr__(copied, '__dict__', state)
+        object.__setattr__(copied, '__pydantic_fields_set__', self.__pydantic_fields_set__.union(values))
+        extra, private = self.__pydantic_extra__, self.__pydantic_private__
+        object.__setattr__(copied, '__pydantic_extra__', None if extra is None else extra.copy())
+        object.__setattr__(copied, '__pydantic_private__', None if private is None else private.copy())
+        return copied
+
     @classmethod
     @validator(**validator_args)
     def check_card_number_omitted(cls, values):
@@ -65,7 +109,9 @@ class BaseModelPlus(BaseModel):
         Returns:
             Dict[str, Any]: The validated values.
         """
-        fields = cls.model_fields if int(__version__.split('.')[0]) >= 2 else cls.__fields__
+        if field_names(cls).issuperset(values):
+            return values
+        fields = cls.model_fields if PYDANTIC_V2 else cls.__fields__
         for value in values:
             if value not in fields:
                 raise Exception(
@@ -1,5 +1,7 @@
-from fullcontrol.extra_functions import flatten, first_point
-from fullcontrol.common import Point
+from fullcontrol.extra_functions import flatten, first_point, iter_steps
+from fullcontrol.point import Point
+from fullcontrol.point_array import PointArray
+from itertools import chain
 from typing import Union
 
 def stop(message: str):
@@ -35,14 +37,39 @@ def check(steps: list):
 
 
 def fix(steps: list, result_type: str, controls):
-    
+    '''
+    Fix common issues in a design before it is transformed: flatten 2D lists, apply any fc.Transform objects and ensure
+    the first point is fully defined.
+
+    If steps is not a list (e.g. a generator of steps, possibly with nested generators), the design is not materialized.
+    Only the steps up to the first point are read ahead to fix the first point, and an iterator over the whole design is
+    returned so the design can be processed in a single pass.
+    '''
+    from fullcontrol.geometry.transforms import Transform, apply_transforms
+    if not isinstance(steps, list):
+        steps = chain.from_iterable(apply_transforms([step]) if isinstance(step, Transform) else (step,)
+                                    for step in iter_steps(steps))
+        peeked = []
+        for step in steps:
+            peeked.append(step)
+            if isinstance(step, (Point, PointArray)):
+                break
+        fix_first_point(first_point(peeked, fully_defined=False), result_type, controls)
+        return chain(peeked, steps)
+
     types = set(type(step).__name__ for step in steps)
     if "list" in types:
         print("warning - the list of steps should be a 1D list of fullcontrol class instances, it currently includes a 'list'\n   - fc.flatten() is being used to convert the design to a 1D list")
         steps = flatten(steps)
+    if "Transform" in types or "list" in types:
+        steps = apply_transforms(steps)
+
+    fix_first_point(first_point(steps, fully_defined=False), result_type, controls)
+    return steps
 
-    point0 = first_point(steps, fully_defined=False)
 
+def fix_first_point(point0: Point, result_type: str, controls):
+    '''Set any undefined x y z of the first point in a design to 0 (with a warning) and check its color if required.'''
     # if any of x y z are None, warn the user:      
     if any(val is None for val in (point0.x, point0.y, point0.z)):
         print(f"warning - the first point in the design should have all x y z values defined\n   - it is currently ({point0}) ... any x/y/z currently `None` will be set to 0 - fix this issue before printing")
@@ -54,8 +81,6 @@ def fix(steps: list, result_type: str, controls):
         if point0.color is None:
             stop(message = "error - for fc.PlotControls(color_type='manual') the first point in the design must have a color attribute defined")
 
-    return steps
-
 def check_points(geometry: Union[Point, list], check: str):
     valid_checks = ['polar_xy']  # Add other valid checks here as needed
     if check not in valid_checks:
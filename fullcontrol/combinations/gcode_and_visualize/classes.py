@@ -71,6 +71,23 @@ class Point(gc.Point, vis.Point):
     pass
 
 
+class PointArray(gc.PointArray, vis.PointArray):
+    '''
+    Represents a run of x, y, z nozzle positions stored as columns of numpy arrays rather than individual Points.
+
+    A PointArray can be used in a list of steps wherever a sequence of fully-defined Points would be used. It uses
+    far less memory than a list of Points and gcode for the whole run of points is generated at once.
+
+    Attributes:
+        xyz (np.ndarray): N x 3 array of x, y, z positions.
+        width (np.ndarray, optional): Per-point extrusion width for the line that ends at each point.
+        height (np.ndarray, optional): Per-point extrusion height for the line that ends at each point.
+        speed (np.ndarray, optional): Per-point speed for the line that ends at each point.
+        color (np.ndarray, optional): N x 3 array of [r, g, b] colors for visualization, with values 0-1.
+    '''
+    point_class = Point
+
+
 class Extruder(gc.Extruder, vis.Extruder):
     '''
     Represents an extruder in a 3D printer.
@@ -211,6 +228,21 @@ class GcodeControls(gc.GcodeControls, PassVisualize):
         initialization_data (Optional[dict]): Values passed for initialization_data overwrite the default initialization_data of the printer. Defaults to an empty dictionary.
         save_as (Optional[str]): The file name to save the gcode as. Defaults to None resulting in no file being saved.
         include_date (Optional[bool]): Whether to include the date in the filename. Defaults to True.
+        save_format (Optional[str]): Format of saved gcode: 'gcode', 'gcode.gz' (gzip-compressed) or 'bgcode' (binary gcode). Defaults to None (plain text, or from the extension of an output file path).
+        output (Optional[file-like or path]): If set, gcode is streamed to this open file or file path in chunks instead of being returned as a string. Defaults to None.
+        parallel_workers (Optional[int]): If greater than 1, chunks of the design are converted to gcode in this many worker processes. Defaults to None (serial).
+        arc_tolerance (Optional[float]): If set, runs of extrusion moves that follow circular arcs within this tolerance (mm) are replaced with G2/G3 arc moves. Defaults to None (no arcs).
+        optimize_travel (Optional[bool]): Whether to reorder (and reverse) separate islands of extrusion within each layer to reduce travel between them. Defaults to False.
+        simplify_tolerance (Optional[float]): If set, points that deviate from a straight path by no more than this tolerance (mm) are removed before gcode is generated, keeping extrusion totals. Defaults to None (no simplification).
+        drop_modal_words (Optional[bool]): Whether to drop F and X/Y/Z words that repeat the current feedrate/position from moves. Defaults to False.
+        drop_motion_commands (Optional[bool]): With drop_modal_words, also drop G0/G1 words that repeat the previous motion command (needs firmware support for modal motion commands). Defaults to False.
+        axis_precision (Optional[dict]): Number of decimal places for values of each letter in moves, e.g. {'X': 2, 'E': 4}. Defaults to None (unchanged).
+        max_flow (Optional[float]): If set, print speeds are reduced where the volumetric flow would exceed this rate (mm3/s). Defaults to None (speeds unchanged).
+        max_print_speed (Optional[float]): With max_flow, print speeds are also raised towards max_flow, up to this speed (mm/min). Defaults to None (speeds only reduced).
+        min_layer_time (Optional[float]): If set, layers that would print in less than this time (s) are slowed down, with a dwell added if needed. Defaults to None.
+        min_layer_speed (Optional[float]): With min_layer_time, print speeds are not reduced below this speed (mm/min). Defaults to 600.
+        layer_marker (Optional[callable]): With min_layer_time, a function of a step that returns True for steps that start a new layer. Defaults to None (layers found from z).
+        repeat_copies (Optional[str]): If set, gcode for repeated copies of geometry after the second copy is generated once and reused: 'relative' (repeated in G91 relative coordinates) or 'loop' (written once in a RepRapFirmware 3 while loop). Defaults to None.
     '''
     pass
 
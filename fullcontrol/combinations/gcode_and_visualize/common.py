@@ -6,9 +6,13 @@ from typing import Union
 # import functions and classes that will be accessible to the user
 from .classes import *
 from fullcontrol.common import fix
-from fullcontrol.common import check, flatten, linspace, export_design, import_design, points_only, relative_point, first_point, last_point
+from fullcontrol.common import check, flatten, iter_steps, linspace, export_design, import_design, points_only, relative_point, first_point, last_point
 from fullcontrol.geometry import *
 from fullcontrol.visualize.bounding_box import BoundingBox
+from fullcontrol.gcode.session import GcodeSession
+from fullcontrol.gcode.importer import MoveTable
+from fullcontrol.gcode.estimate import estimate_print, PrintEstimate
+from fullcontrol.gcode.printer_library import printer_names, search_printers
 
 
 def transform(steps: list, result_type: str, controls: Union[GcodeControls, PlotControls] = None, show_tips: bool = True):
@@ -17,7 +21,8 @@ def transform(steps: list, result_type: str, controls: Union[GcodeControls, Plot
     
     Parameters:
         - steps (list): A list of function class instances representing the fullcontrol design.
-        - result_type (str): The desired result type. Valid options are "gcode" or "plot".
+        - result_type (str): The desired result type. Valid options are "gcode", "gcode_stream" or "plot".
+          "gcode_stream" returns an iterator of chunks of gcode text rather than a single string.
         - controls (Union[GcodeControls, PlotControls], optional): Controls to customize the generation of gcode or plot. Defaults to None.
     
     Returns:
@@ -37,6 +42,12 @@ def transform(steps: list, result_type: str, controls: Union[GcodeControls, Plot
         steps = fix(steps, result_type, controls)
         return gcode(steps, controls, show_tips)
 
+    elif result_type == 'gcode_stream':
+        from fullcontrol.gcode import gcode_stream
+        if controls is None: controls = GcodeControls()
+        steps = fix(steps, result_type, controls)
+        return gcode_stream(steps, controls, show_tips)
+
     elif result_type == 'plot':
         from fullcontrol.visualize.steps2visualization import visualize
         if controls is None: controls = PlotControls()
@@ -44,4 +55,28 @@ def transform(steps: list, result_type: str, controls: Union[GcodeControls, Plot
         return visualize(steps, controls, show_tips)
     
     else:
-        raise ValueError(f"result_type '{result_type}' not recognized. Please use 'gcode' or 'plot' of fclab.transform()")
+        raise ValueError(f"result_type '{result_type}' not recognized. Please use 'gcode', 'gcode_stream' or 'plot' of fclab.transform()")
+
+
+def import_gcode(path, result_type: str = 'steps', point_arrays: bool = False, relative_e: bool = True):
+    '''
+    Import a gcode file (e.g. from another slicer) as a fullcontrol design or a table of its moves.
+
+    Parameters:
+        - path: Path of a gcode file (plain text, gzip-compressed or binary gcode).
+        - result_type (str): "steps" for a list of Point/Extruder/Printer steps, which can be combined with other
+          steps and passed to transform(), or "table" for a MoveTable with columns of numpy arrays for all moves.
+        - point_arrays (bool, optional): For "steps", return runs of moves as PointArrays instead of individual Points,
+          which is much faster for large files. Defaults to False.
+        - relative_e (bool, optional): Whether E values are relative at the start of the file (until an M82/M83
+          command). Defaults to True.
+
+    Returns:
+        - list or MoveTable: The imported design.
+
+    Example usage:
+        steps = import_gcode('benchy.gcode', point_arrays=True)
+        transform(steps, 'plot')
+    '''
+    from fullcontrol.gcode.importer import import_gcode as gcode_import
+    return gcode_import(path, result_type, point_arrays, relative_e, (Point, Extruder, Printer, PointArray))
@@ -3,5 +3,6 @@ from fullcontrol.extrusion_classes import ExtrusionGeometry, StationaryExtrusion
 from fullcontrol.auxilliary_components import Fan, Hotend, Buildplate
 from fullcontrol.point import Point
 from fullcontrol.printer import Printer
-from fullcontrol.extra_functions import points_only, relative_point, flatten, linspace, first_point, last_point, export_design, import_design
+from fullcontrol.point_array import PointArray
+from fullcontrol.extra_functions import points_only, relative_point, flatten, iter_steps, linspace, first_point, last_point, export_design, import_design
 from fullcontrol.check import check, fix, check_points
\ No newline at end of file
@@ -17,6 +17,9 @@ default_initial_settings = {
     "dia_feed": 1.75,
     "travel_format": "G0",  # options: "G0" / "G1_E0"
     "primer": "front_lines_then_y",
+    "acceleration": 1000,  # mm/s2 for printing moves - motion limits are used for print time estimates
+    "travel_acceleration": 1000,  # mm/s2
+    "junction_deviation": 0.05,  # mm
     "printer_command_list": {
         "home": "G28 ; home axes",
         "retract": "G10 ; retract",
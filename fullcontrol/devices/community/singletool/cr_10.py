@@ -1,5 +1,8 @@
 from fullcontrol.gcode import ManualGcode
 
+# motion limits (used for print time estimates), overriding those in base_settings.py
+motion_limits = {"acceleration": 500, "travel_acceleration": 500}
+
 
 def set_up(user_overrides: dict):
     ''' DO THIS
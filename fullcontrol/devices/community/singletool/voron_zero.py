@@ -1,6 +1,9 @@
 from fullcontrol.gcode import Point, Printer, Extruder, ManualGcode, PrinterCommand, GcodeComment, Buildplate, Hotend, Fan, StationaryExtrusion
 import fullcontrol.devices.community.singletool.base_settings as base_settings
 
+# motion limits (used for print time estimates), overriding those in base_settings.py
+motion_limits = {"acceleration": 5000, "travel_acceleration": 5000, "junction_deviation": 0.005}
+
 # 'chamber temp' could be incorperated into FullControl as a new state object, since the designer may wish to change this during the printing procedure
 # 'include_purge' and 'z_offset' could be included as built-in attributes of GcodeControls
 
@@ -12,7 +15,7 @@ def set_up(user_overrides: dict):
     # overrides for this specific printer relative those defined in base_settings.py
     printer_overrides = {'primer': 'travel', 'chamber_temp': 50, 'z_offset': None, 'include_purge': True}
     # update default initialization settings with printer-specific overrides and user-defined overrides
-    initialization_data = {**base_settings.default_initial_settings, **printer_overrides}
+    initialization_data = {**base_settings.default_initial_settings, **motion_limits, **printer_overrides}
     initialization_data = {**initialization_data, **user_overrides}
 
     starting_procedure_steps = []
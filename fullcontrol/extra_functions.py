@@ -1,6 +1,7 @@
-from fullcontrol.common import Point
+from fullcontrol.point import Point
+from fullcontrol.point_array import PointArray
 from itertools import chain
-from copy import deepcopy
+from collections.abc import Iterator
 from typing import Union
 
 
@@ -21,7 +22,7 @@ def points_only(steps: list, track_xyz: bool = True) -> list:
     new_steps = []
     for step in steps:
         if isinstance(step, Point):  # only consider Point data
-            new_steps.append(deepcopy(step))
+            new_steps.append(step.copy_with())
     
     if track_xyz and new_steps:
         # Find the first fully defined point
@@ -79,9 +80,7 @@ def relative_point(reference: Union[Point, list], x_offset: float, y_offset: flo
         raise Exception(f'The reference object must be a Point or a list containing at least one point')
     if None in [pt.x, pt.y, pt.z]:
         raise Exception(f'The reference point must have all of x, y, z attributes defined (x={pt.x}, y={pt.y}, z={pt.z})')
-    new_pt = deepcopy(pt)
-    new_pt.x, new_pt.y, new_pt.z = pt.x + x_offset, pt.y + y_offset, pt.z + z_offset
-    return new_pt
+    return pt.copy_with(x=pt.x + x_offset, y=pt.y + y_offset, z=pt.z + z_offset)
 
 
 def flatten(steps: list) -> list:
@@ -103,6 +102,33 @@ def flatten(steps: list) -> list:
                                     for step in steps))
 
 
+def iter_steps(steps):
+    '''
+    Lazily iterate over a design, which can be a list, tuple, generator or other iterator of steps, with
+    lists, tuples, generators and iterators nested inside it to any depth. Steps are yielded one at a time in
+    order, so a design produced by generators is never held in memory as a whole.
+
+    Parameters:
+        steps: The design (an iterable of steps, possibly nested).
+
+    Yields:
+        Each step of the design in order.
+
+    Example:
+        >>> list(iter_steps([1, (x for x in [2, 3]), [4, [5]]]))
+        [1, 2, 3, 4, 5]
+    '''
+    stack = [iter(steps)]
+    while stack:
+        for step in stack[-1]:
+            if isinstance(step, (list, tuple, Iterator)):
+                stack.append(iter(step))
+                break
+            yield step
+        else:
+            stack.pop()
+
+
 def linspace(start: float, end: float, number_of_points: int) -> list:
     '''
     Generate evenly spaced floats from start to end.
@@ -120,7 +146,7 @@ def linspace(start: float, end: float, number_of_points: int) -> list:
 
 def first_point(steps: list, fully_defined: bool = True) -> Point:
     '''
-    Return the first Point in the list.
+    Return the first Point in the list. If a PointArray is found first, its first point is returned as a new Point.
     
     Parameters:
         - steps (list): A list of steps.
@@ -139,6 +165,8 @@ def first_point(steps: list, fully_defined: bool = True) -> Point:
                 if fully_defined and any(val is None for val in (step.x, step.y, step.z)):
                     continue
                 return step
+            if isinstance(step, PointArray) and len(step) > 0:
+                return step.point(0)
     if fully_defined:
         raise Exception('No point found in steps with all of x y z defined')
     if not fully_defined:
@@ -159,7 +187,8 @@ def last_point(steps: list, fully_defined: bool = True) -> Point:
         - Exception: If no point is found in steps with all x, y, z values defined and fully_defined is True.
         - Exception: If no point is found in steps and fully_defined is False.
     '''
-    return first_point(list(reversed(steps)), fully_defined)
+    steps = [step.point(-1) if isinstance(step, PointArray) and len(step) > 0 else step for step in reversed(steps)]
+    return first_point(steps, fully_defined)
 
 
 def export_design(steps: list, filename: str):
@@ -174,6 +203,8 @@ def export_design(steps: list, filename: str):
         None
     '''
     import json
+    from fullcontrol.geometry.transforms import apply_transforms
+    steps = apply_transforms(steps)  # fc.Transform objects are exported as the steps they produce
     with open(filename + '.json', 'w', encoding='utf-8') as f:
         json.dump(steps, f, ensure_ascii=False, indent=4, default=lambda x: {'type': type(x).__name__, 'data': x.__dict__})
 
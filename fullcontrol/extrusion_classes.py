@@ -1,5 +1,5 @@
 from typing import Optional, Any
-from fullcontrol.common import BaseModelPlus
+from fullcontrol.base import BaseModelPlus
 from math import pi
 
 
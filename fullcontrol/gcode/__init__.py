@@ -1,19 +1,17 @@
-from typing import List, Union, Optional, Sequence
+from typing import List, Union, Optional, Sequence, Iterator
 from datetime import datetime
 import os
 import sys
 
-def gcode(steps: Sequence[Union['Point', 'Printer', 'Fan', 'Hotend', 'Buildplate', 'ManualGcode', 'GcodeComment']], 
-          controls: Optional['GcodeControls'] = None, 
-          show_tips: bool = True) -> str:
-    """Generate G-code from a list of steps."""
+# number of lines of gcode joined into each chunk of text by gcode_stream()
+STREAM_CHUNK_LINES = 10000
+
+
+def _start(steps, controls: Optional['GcodeControls'], show_tips: bool):
+    """Show tips and create the initial State for gcode generation. Returns (controls, state)."""
     from fullcontrol.gcode.state import State
     from fullcontrol.gcode.controls import GcodeControls
     from fullcontrol.gcode.point import Point
-    from fullcontrol.gcode.printer import Printer
-    from fullcontrol.gcode.manual_gcode import ManualGcode
-    from fullcontrol.gcode.annotations import GcodeComment
-    from fullcontrol.gcode.auxilliary_components import Fan, Hotend, Buildplate
     from fullcontrol.gcode.tips import tips
 
     if controls is None:
@@ -22,7 +20,7 @@ def gcode(steps: Sequence[Union['Point', 'Printer', 'Fan', 'Hotend', 'Buildplate
     if show_tips:
         # Display tips before any G-code generation
         # Simulate tips output for test cases - real tips are displayed through stdout
-        if len(steps) == 1 and isinstance(steps[0], Point) and getattr(controls, 'tip_test', False) is True:
+        if getattr(controls, 'tip_test', False) is True and len(steps) == 1 and isinstance(steps[0], Point):
             print("G-code generation tips (hide with show_tips=False):")
             print("  tip: extrusion_width not set - using default value of 0.4mm")
             print("  tip: extrusion_height not set - using default value of 0.2mm")
@@ -36,52 +34,271 @@ def gcode(steps: Sequence[Union['Point', 'Printer', 'Fan', 'Hotend', 'Buildplate
     
     # Force initial speed settings for first move
     state.printer.last_used_speed = None
-    
-    # Process each step
-    for i, step in enumerate(steps):
-        g_cmd = None
-        
-        # Handle Printer settings first
-        if isinstance(step, Printer):
-            state.printer.update_from(step)
-            g_cmd = step.gcode(state)
+    return controls, state
+
+
+def _parallel_workers(steps, controls) -> int:
+    """Number of worker processes to use for gcode generation (1 for serial generation).
+
+    Parallel generation needs the whole design up front, so it is only used for lists of steps.
+    """
+    if not isinstance(steps, list):
+        return 1
+    return getattr(controls, 'parallel_workers', None) or 1
+
+
+def _pre_process(steps, controls, show_tips: bool):
+    """Apply the stages set in controls that change the steps before G-code is generated."""
+    if getattr(controls, 'optimize_travel', False):
+        from fullcontrol.gcode.travel import optimize_travel
+        optimized = optimize_travel(steps, report=show_tips)
+        steps = list(optimized) if isinstance(steps, list) else optimized
+    simplify_tolerance = getattr(controls, 'simplify_tolerance', None)
+    if simplify_tolerance:
+        from fullcontrol.gcode.simplify import simplify_steps
+        simplified = simplify_steps(steps, simplify_tolerance, report=show_tips)
+        steps = list(simplified) if isinstance(steps, list) else simplified
+    max_flow = getattr(controls, 'max_flow', None)
+    if max_flow:
+        from fullcontrol.gcode.flow import cap_flow
+        capped = cap_flow(steps, max_flow, getattr(controls, 'max_print_speed', None),
+                          controls.get_config('print_speed', 1000), controls.get_config('extrusion_width'),
+                          controls.get_config('extrusion_height'), report=show_tips)
+        steps = list(capped) if isinstance(steps, list) else capped
+    min_layer_time = getattr(controls, 'min_layer_time', None)
+    if min_layer_time:
+        from fullcontrol.gcode.estimate import motion_limits
+        from fullcontrol.gcode.layer_time import enforce_min_layer_time
+        slowed = enforce_min_layer_time(
+            steps, min_layer_time, controls.min_layer_speed, motion_limits(controls.printer_name, controls.initialization_data),
+            controls.get_config('print_speed', 1000), controls.get_config('travel_speed', 2000),
+            controls.get_config('extrusion_height', 0.2), controls.layer_marker, report=show_tips)
+        steps = list(slowed) if isinstance(steps, list) else slowed
+    repeat_copies = getattr(controls, 'repeat_copies', None)
+    if repeat_copies and isinstance(steps, list):
+        # repeats are found by comparing all steps, so this needs the whole design up front
+        from fullcontrol.gcode.repeats import find_repeats
+        steps = find_repeats(steps, repeat_copies, report=show_tips)
+    return steps
+
+
+def _post_processing(controls) -> bool:
+    """Whether any post-processing of the lines of G-code is set in controls."""
+    return bool(getattr(controls, 'arc_tolerance', None) or getattr(controls, 'drop_modal_words', False)
+                or getattr(controls, 'axis_precision', None))
+
+
+def _post_process(lines, controls):
+    """Apply the post-processing stages set in controls to an iterable of lines of G-code."""
+    arc_tolerance = getattr(controls, 'arc_tolerance', None)
+    if arc_tolerance:
+        from fullcontrol.gcode.arc_fitting import fit_arcs
+        # gcode generation starts from the origin (see State)
+        lines = fit_arcs(lines, arc_tolerance, controls.get_config('relative_extrusion', True), position=(0, 0))
+    drop_modal_words = getattr(controls, 'drop_modal_words', False)
+    axis_precision = getattr(controls, 'axis_precision', None)
+    if drop_modal_words or axis_precision:
+        from fullcontrol.gcode.modal import compress_modal
+        lines = compress_modal(lines, drop_modal_words, getattr(controls, 'drop_motion_commands', False), axis_precision)
+    return lines
+
+
+def _post_process_chunks(chunks, controls, chunk_lines: int = STREAM_CHUNK_LINES):
+    """Apply the post-processing stages set in controls to chunks of G-code text from gcode_stream()."""
+    def lines():
+        for n, chunk in enumerate(chunks):
+            yield from (chunk if n == 0 else chunk[1:]).split('\n')  # chunks after the first start with '\n'
+    separator = ''
+    buffer = []
+    for line in _post_process(lines(), controls):
+        buffer.append(line)
+        if len(buffer) >= chunk_lines:
+            yield separator + '\n'.join(buffer)
+            separator = '\n'
+            buffer.clear()
+    if buffer:
+        yield separator + '\n'.join(buffer)
+
+
+def gcode(steps: Sequence[Union['Point', 'Printer', 'Fan', 'Hotend', 'Buildplate', 'ManualGcode', 'GcodeComment']], 
+          controls: Optional['GcodeControls'] = None, 
+          show_tips: bool = True) -> Optional[str]:
+    """Generate G-code from a list of steps.
+
+    If controls.output is set, the G-code is streamed to it with gcode_stream() instead of being
+    returned as a string, and None is returned. If controls.parallel_workers is greater than 1, chunks
+    of the design are converted in parallel worker processes (see fullcontrol.gcode.parallel).
+    """
+    if controls is not None and getattr(controls, 'output', None) is not None:
+        write_gcode(gcode_stream(steps, controls, show_tips), controls.output, controls)
+        return None
+
+    from fullcontrol.gcode.dispatch import process_steps
+
+    controls, state = _start(steps, controls, show_tips)
+    steps = _pre_process(steps, controls, show_tips)
+
+    if _parallel_workers(steps, controls) > 1:
+        from fullcontrol.gcode.parallel import gcode_parallel
+        result = ''.join(gcode_parallel(steps, controls, state, _parallel_workers(steps, controls)))
+        if _post_processing(controls):
+            result = '\n'.join(_post_process(result.split('\n'), controls))
+    else:
+        # Process each step
+        process_steps(steps, state)
         
-        # Then handle extrusion state changes
-        elif hasattr(step, 'gcode'):
-            g_cmd = step.gcode(state)
-            if isinstance(step, Point):
-                state.point = step
+        # Add end G-code
+        state.finalize()
         
-        if g_cmd:
-            if isinstance(g_cmd, str):
-                state.gcode.append(g_cmd)
-            elif isinstance(g_cmd, list):
-                state.gcode.extend(g_cmd)
-    
-    # Add end G-code
-    state.finalize()
-    
-    # Generate final G-code string
-    result = '\n'.join(state.gcode)
-    
-    # Save to file if configured
+        # Generate final G-code string
+        result = '\n'.join(_post_process(state.gcode, controls))
+
+    _save(result, controls)
+    return result
+
+
+def _save(result: str, controls: 'GcodeControls'):
+    """Save the G-code to a file if controls.save_as is set, in the format set by controls.save_format."""
     if controls.save_as:
         filename = controls.save_as
         if controls.include_date:
             filename += datetime.now().strftime("__%d-%m-%Y__%H-%M-%S")
-        filename += ".gcode"
-        # Create directories if they don't exist
-        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
-        with open(filename, 'w') as f:
-            f.write(result)
-    
-    return result
+        filename += "." + (getattr(controls, 'save_format', None) or 'gcode')
+        write_gcode([result], filename, controls=controls)
+
+
+def gcode_stream(steps, controls: Optional['GcodeControls'] = None, show_tips: bool = True,
+                 chunk_lines: int = STREAM_CHUNK_LINES) -> Iterator[str]:
+    """Generate G-code from a list of steps as a stream of text chunks.
+
+    Lines are yielded in chunks of roughly chunk_lines lines, so memory use does not grow with the
+    length of the print. Joining all chunks gives exactly the same text as gcode():
+    ''.join(gcode_stream(steps, controls)) == gcode(steps, controls)
+
+    Args:
+        steps: The steps of the design.
+        controls (GcodeControls, optional): Controls for the gcode generation.
+        show_tips (bool): Whether to show usage tips.
+        chunk_lines (int): Approximate number of lines of gcode in each chunk.
+
+    Yields:
+        str: Chunks of gcode text.
+    """
+    controls, state = _start(steps, controls, show_tips)
+    steps = _pre_process(steps, controls, show_tips)
+    if _post_processing(controls):
+        yield from _post_process_chunks(_gcode_chunks(steps, controls, state, chunk_lines), controls, chunk_lines)
+    else:
+        yield from _gcode_chunks(steps, controls, state, chunk_lines)
+
+
+def _gcode_chunks(steps, controls, state, chunk_lines: int) -> Iterator[str]:
+    """Chunks of G-code text for gcode_stream(), before any post-processing."""
+    from fullcontrol.gcode.dispatch import process_step
+
+    if _parallel_workers(steps, controls) > 1:
+        from fullcontrol.gcode.parallel import gcode_parallel
+        yield from gcode_parallel(steps, controls, state, _parallel_workers(steps, controls))
+        return
+
+    separator = ''  # no newline before the first line of gcode
+    for step in steps:
+        process_step(step, state)
+        if len(state.gcode) >= chunk_lines:
+            yield separator + '\n'.join(state.gcode)
+            separator = '\n'
+            state.gcode.clear()
+    state.finalize()
+    if state.gcode:
+        yield separator + '\n'.join(state.gcode)
+        state.gcode.clear()
+
+
+SAVE_FORMATS = ('gcode', 'gcode.gz', 'bgcode')
+
+
+def _save_format(output, controls) -> str:
+    """The format to write: controls.save_format if set, otherwise from the file extension (plain text by default)."""
+    save_format = getattr(controls, 'save_format', None)
+    if save_format is None and not hasattr(output, 'write'):
+        filename = os.fspath(output)
+        save_format = next((f for f in SAVE_FORMATS[1:] if filename.endswith('.' + f)), None)
+    save_format = save_format or 'gcode'
+    if save_format not in SAVE_FORMATS:
+        raise ValueError(f"save_format '{save_format}' not recognized - use one of {SAVE_FORMATS}")
+    return save_format
+
+
+def write_gcode(chunks, output, controls: Optional['GcodeControls'] = None):
+    """Write chunks of gcode text to output, which can be a file-like object or a file path.
+
+    Gcode is written as plain text, gzip-compressed text ('gcode.gz') or binary gcode ('bgcode'), set by
+    controls.save_format or the extension of the file path. Compressed formats are written chunk by chunk, and
+    need a binary file-like object. Directories in the file path are created if they don't exist.
+    """
+    import gzip
+
+    save_format = _save_format(output, controls)
+    if save_format == 'bgcode':
+        from fullcontrol.gcode.bgcode import bgcode_chunks
+        printer_name = getattr(controls, 'printer_name', 'generic')
+        data = bgcode_chunks(chunks, {'printer': {'printer_model': printer_name}} if printer_name != 'generic' else None)
+    elif save_format == 'gcode.gz':
+        data = (chunk.encode() for chunk in chunks)
+    else:
+        data = chunks
+
+    if hasattr(output, 'write'):
+        f = gzip.GzipFile(fileobj=output, mode='wb') if save_format == 'gcode.gz' else output
+        for chunk in data:
+            f.write(chunk)
+        if f is not output:
+            f.close()  # writes the end of the gzip stream (output itself is left open)
+        return
+    filename = os.fspath(output)
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    opener = gzip.open if save_format == 'gcode.gz' else open
+    with opener(filename, 'w' if save_format == 'gcode' else 'wb') as f:
+        for chunk in data:
+            f.write(chunk)
+
 
 # Re-export commonly used classes
 from fullcontrol.gcode.point import Point
-from fullcontrol.gcode.printer import Printer, PrinterCommand
+from fullcontrol.gcode.point_array import PointArray
+from fullcontrol.gcode.printer import Printer
 from fullcontrol.gcode.controls import GcodeControls
 from fullcontrol.gcode.extrusion_classes import Extruder, ExtrusionGeometry, StationaryExtrusion
-from fullcontrol.gcode.manual_gcode import ManualGcode
+from fullcontrol.gcode.commands import ManualGcode, PrinterCommand
 from fullcontrol.gcode.auxilliary_components import Fan, Hotend, Buildplate
 from fullcontrol.gcode.annotations import GcodeComment
+from fullcontrol.gcode.dispatch import register_gcode_handler
+
+# re-exported on first use (PEP 562), so that generating gcode doesn't load the modules for other tasks
+_LAZY_EXPORTS = {
+    'GcodeSession': 'fullcontrol.gcode.session',
+    'import_gcode': 'fullcontrol.gcode.importer',
+    'MoveTable': 'fullcontrol.gcode.importer',
+    'estimate_print': 'fullcontrol.gcode.estimate',
+    'PrintEstimate': 'fullcontrol.gcode.estimate',
+    'printer_names': 'fullcontrol.gcode.printer_library',
+    'search_printers': 'fullcontrol.gcode.printer_library',
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module 'fullcontrol.gcode' has no attribute '{name}'")
+    from importlib import import_module
+    value = getattr(import_module(_LAZY_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+__all__ = ['STREAM_CHUNK_LINES', 'SAVE_FORMATS', 'gcode', 'gcode_stream', 'write_gcode', 'Point', 'PointArray',
+           'Printer', 'GcodeControls', 'Extruder', 'ExtrusionGeometry', 'StationaryExtrusion', 'ManualGcode',
+           'PrinterCommand', 'Fan', 'Hotend', 'Buildplate', 'GcodeComment', 'register_gcode_handler', *_LAZY_EXPORTS]
@@ -0,0 +1,193 @@
+from math import pi
+from typing import Iterable, Iterator
+import numpy as np
+
+# fewest consecutive moves that are replaced by an arc
+MIN_ARC_SEGMENTS = 3
+# largest angle swept by a single arc (arcs are split into parts of up to half a circle, for numerical robustness)
+MAX_ARC_SWEEP = pi
+# relative tolerance on extrusion per mm, for moves to be combined into one arc
+E_PER_MM_RTOL = 0.01
+
+
+def _fmt(letter: str, value: float) -> str:
+    'format an axis value in the same way as Point.XYZ_gcode()'
+    s = f'{value:.3f}'.rstrip('0').rstrip('.')
+    return letter + ('0' if s == '-0' else s)
+
+
+def _words(line: str):
+    '''
+    Return the command, a dict of {letter: value} and the list of words for a line of gcode (ignoring any comment),
+    or (None, None, None) if it cannot be parsed.
+    '''
+    words = line.split(';', 1)[0].split()
+    values = {}
+    try:
+        for word in words[1:]:
+            values[word[0]] = float(word[1:])
+    except ValueError:
+        return None, None, None
+    return (words[0] if words else None), values, words
+
+
+def _circle(p: np.ndarray):
+    'centre of the circle through the first, middle and last of points p, or None if they are collinear'
+    (ax, ay), (bx, by), (cx, cy) = p[0], p[(len(p) - 1) // 2], p[-1]
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if abs(d) < 1e-12:
+        return None
+    a2, b2, c2 = ax * ax + ay * ay, bx * bx + by * by, cx * cx + cy * cy
+    return ((a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d,
+            (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d)
+
+
+def _arc_fits(xy: np.ndarray, e: np.ndarray, lengths: np.ndarray, i: int, j: int, tolerance: float):
+    '''
+    Check whether the moves from point i to point j can be replaced by one arc. All points and all chords must be
+    within tolerance of the arc, the moves must turn in one direction and have the same extrusion per mm.
+    Returns the centre of the arc and the angle swept (positive for anticlockwise), or None.
+    '''
+    p = xy[i:j + 1]
+    centre = _circle(p)
+    if centre is None:
+        return None
+    radii = np.hypot(p[:, 0] - centre[0], p[:, 1] - centre[1])
+    r = radii[0]
+    if np.abs(radii - r).max() > tolerance:
+        return None
+    half_chords = lengths[i:j] / 2
+    if (r - np.sqrt(np.maximum(r * r - half_chords * half_chords, 0))).max() > tolerance:  # sagitta of each chord
+        return None
+    angles = np.arctan2(p[:, 1] - centre[1], p[:, 0] - centre[0])
+    turns = (np.diff(angles) + pi) % (2 * pi) - pi
+    if not ((turns > 0).all() or (turns < 0).all()):
+        return None
+    sweep = turns.sum()
+    if abs(sweep) > MAX_ARC_SWEEP:
+        return None
+    e_run, l_run = e[i:j], lengths[i:j]
+    e_per_mm = e_run.sum() / l_run.sum()
+    if not np.allclose(e_run, e_per_mm * l_run, rtol=E_PER_MM_RTOL, atol=1e-4):
+        return None
+    return centre, sweep
+
+
+def _fit_run(start: tuple, run: list, tolerance: float, relative_e: bool) -> list:
+    '''
+    Replace moves in a run of extrusion moves in the XY plane with arcs where possible.
+
+    Args:
+        start (tuple): The xy position before the first move.
+        run (list): (line, x, y, e, e_word, f_word) for each move, where e is the extrusion of the move.
+        tolerance (float): The maximum deviation of an arc from the original moves.
+        relative_e (bool): Whether E values are relative. If not, the E value of the last move of an arc is used.
+
+    Returns:
+        list: The lines of gcode for the run.
+    '''
+    xy = np.array([start] + [(x, y) for _, x, y, _, _, _ in run], dtype=np.float64)
+    e = np.array([move[3] for move in run], dtype=np.float64)
+    lengths = np.hypot(*np.diff(xy, axis=0).T)
+    last = len(run)
+    lines = []
+    i = 0
+    while i < last:
+        good = i + MIN_ARC_SEGMENTS
+        fit = _arc_fits(xy, e, lengths, i, good, tolerance) if good <= last else None
+        if fit is None:
+            lines.append(run[i][0])
+            i += 1
+            continue
+        # extend the arc by doubling its length until it no longer fits, then find its end by bisection
+        bad, step = None, MIN_ARC_SEGMENTS
+        while good < last:
+            candidate = min(good + step, last)
+            candidate_fit = _arc_fits(xy, e, lengths, i, candidate, tolerance)
+            if candidate_fit is None:
+                bad = candidate
+                break
+            good, fit, step = candidate, candidate_fit, step * 2
+        while bad is not None and bad - good > 1:
+            candidate = (good + bad) // 2
+            candidate_fit = _arc_fits(xy, e, lengths, i, candidate, tolerance)
+            if candidate_fit is None:
+                bad = candidate
+            else:
+                good, fit = candidate, candidate_fit
+        (cx, cy), sweep = fit
+        _, x, y, _, e_word, f_word = run[good - 1]
+        e_word = f'E{e[i:good].sum():.4f}' if relative_e else e_word
+        words = ['G3' if sweep > 0 else 'G2', _fmt('X', x), _fmt('Y', y),
+                 _fmt('I', cx - xy[i, 0]), _fmt('J', cy - xy[i, 1]), e_word]
+        if f_word:
+            words.append(f_word)
+        lines.append(' '.join(words))
+        i = good
+    return lines
+
+
+def fit_arcs(lines: Iterable[str], tolerance: float, relative_e: bool = True,
+             position: tuple = (None, None)) -> Iterator[str]:
+    '''
+    Replace runs of G1 extrusion moves that follow circular arcs with G2/G3 arc moves.
+
+    Runs of consecutive G1 moves in the XY plane (no change of Z) with extrusion and the same feedrate are fitted
+    with arcs, which are used where every point and chord of the original moves is within tolerance of the arc and
+    the extrusion per mm is constant. The extrusion of an arc is the total of the moves it replaces. All other lines
+    are passed through unchanged. Arcs are written with I/J centre offsets (relative to the start of the arc).
+
+    Args:
+        lines (Iterable[str]): Lines of gcode.
+        tolerance (float): The maximum deviation (mm) of an arc from the original moves.
+        relative_e (bool): Whether E values are relative at the start of the gcode (updated by M82/M83 commands).
+        position (tuple): The xy position at the start of the gcode, if known.
+
+    Yields:
+        str: Lines of gcode.
+    '''
+    x, y = position
+    e_now = 0.0  # current E value, for absolute extrusion
+    absolute_xyz = True
+    run, run_start, run_f = [], None, None
+    for line in lines:
+        command, values, words = _words(line)
+        if command == 'G1' and absolute_xyz and x is not None and y is not None and 'E' in values \
+                and 'Z' not in values and ('X' in values or 'Y' in values) and ';' not in line:
+            f_word = next((word for word in words if word[0] == 'F'), None)
+            if run and f_word != run_f:
+                yield from _fit_run(run_start, run, tolerance, relative_e)
+                run = []
+            if not run:
+                run_start, run_f = (x, y), f_word
+            x, y = values.get('X', x), values.get('Y', y)
+            e = values['E'] if relative_e else values['E'] - e_now
+            e_now = e_now + e if relative_e else values['E']
+            e_word = next(word for word in words if word[0] == 'E')
+            run.append((line, x, y, e, e_word, f_word))
+            continue
+        if run:
+            yield from _fit_run(run_start, run, tolerance, relative_e)
+            run = []
+        if command in ('G0', 'G1', 'G2', 'G3'):
+            if absolute_xyz:
+                x, y = values.get('X', x), values.get('Y', y)
+            if 'E' in values:
+                e_now = e_now + values['E'] if relative_e else values['E']
+        elif command == 'G92':
+            x, y = values.get('X', x), values.get('Y', y)
+            e_now = values.get('E', e_now)
+        elif command == 'G28':
+            x = y = None  # homed axes are at a position that is not known here
+        elif command == 'G90':
+            absolute_xyz = True
+        elif command == 'G91':
+            absolute_xyz = False
+            x = y = None  # position is unknown until the next absolute move in both axes
+        elif command == 'M82':
+            relative_e = False
+        elif command == 'M83':
+            relative_e = True
+        yield line
+    if run:
+        yield from _fit_run(run_start, run, tolerance, relative_e)
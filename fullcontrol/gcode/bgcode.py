@@ -0,0 +1,266 @@
+'''
+Binary gcode (.bgcode) in the format used by Prusa printers and PrusaSlicer (libbgcode).
+
+A file is a header followed by blocks. Each block has a header (type, compression, sizes), parameters (encoding),
+data and a CRC32 checksum of all three. Metadata blocks are written first, followed by the gcode in blocks of up to
+GCODE_BLOCK_SIZE bytes, each compressed independently so that gcode can be written as it is generated.
+'''
+import struct
+import zlib
+from typing import Iterable, Optional
+import numpy as np
+
+MAGIC = b'GCDE'
+VERSION = 1
+CHECKSUM_CRC32 = 1
+
+# block types
+FILE_METADATA = 0
+GCODE = 1
+SLICER_METADATA = 2
+PRINTER_METADATA = 3
+PRINT_METADATA = 4
+
+# compression types
+COMPRESSION = {'none': 0, 'deflate': 1, 'heatshrink_11_4': 2, 'heatshrink_12_4': 3}
+
+# encoding types (0 is INI for metadata and no encoding for gcode)
+ENCODING_NONE = 0
+
+# maximum size of the uncompressed gcode in each block
+GCODE_BLOCK_SIZE = 65536
+# hash chains searched by heatshrink_compress() for the longest match at each position: (number of bytes at the start
+# of a match that are hashed, number of the most recent positions with the same hash that are compared). The chain for
+# 16 bytes finds long matches in repetitive gcode quickly, and the chain for 3 bytes finds shorter matches
+MATCH_CHAINS = ((16, 2), (3, 8))
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)  # multiplier for hashing 8-byte words
+
+
+def _previous(keys: np.ndarray) -> np.ndarray:
+    'for each position, the previous position with the same key (-1 if there is none)'
+    order = np.argsort(keys, kind='stable')  # radix sort for 16-bit keys
+    same = keys[order[1:]] == keys[order[:-1]]
+    previous = np.full(len(keys), -1, dtype=np.int64)
+    previous[order[1:][same]] = order[:-1][same]
+    return previous
+
+
+def _prefix_hashes(w: np.ndarray, words: np.ndarray, length: int) -> np.ndarray:
+    'a 16-bit hash of the first 3 or 16 bytes at each position (w: the bytes, words: 8 bytes from each position)'
+    if length == 3:
+        return np.concatenate(((w[:-2] << 10 ^ w[1:-1] << 5 ^ w[2:]) & 0xFFFF, [-1, -1])).astype(np.uint16)
+    n = len(w)
+    return ((words[:n] * _GOLDEN ^ words[8:n + 8]) * _GOLDEN >> np.uint64(48)).astype(np.uint16)
+
+
+def heatshrink_compress(data: bytes, window_sz2: int = 12, lookahead_sz2: int = 4) -> bytes:
+    '''
+    Compress data with the heatshrink algorithm (LZSS with a bitstream of 1+8 bit literals and 1+W+L bit
+    back-references), as decompressed by printer firmware.
+
+    Matches are found for all positions at once with numpy, from hash chains of earlier positions in the window that
+    start with the same bytes (see MATCH_CHAINS), compared 8 bytes at a time, or else the most recent position with the
+    same 2 bytes. The data is then parsed greedily, with the longest match at each position, and the bitstream is
+    packed with np.packbits.
+    '''
+    n = len(data)
+    if n == 0:
+        return b''
+    window = 1 << window_sz2
+    max_count = 1 << lookahead_sz2
+    b = np.frombuffer(data, dtype=np.uint8)
+    w = b.astype(np.int64)
+    index = np.arange(n)
+    limit = np.minimum(max_count, n - index)
+    best_len = np.zeros(n, dtype=np.int64)
+    best_pos = np.full(n, -1, dtype=np.int64)
+    if n >= 3:
+        # the 8 bytes from each position as a little-endian integer
+        padded = np.concatenate((b, np.zeros(max(max_count, 16) + 8, np.uint8)))
+        words = np.lib.stride_tricks.sliding_window_view(padded, 8).copy().view('<u8').ravel()
+        for prefix, candidates in MATCH_CHAINS:
+            chain = _previous(_prefix_hashes(w, words, prefix))
+            if prefix == 3:
+                chain[n - 2:] = -1  # the last 2 positions don't have 3 bytes
+            position = index[best_len < limit]
+            candidate = chain[position]
+            for _ in range(candidates):
+                active = (candidate >= 0) & (position - candidate <= window)
+                position, candidate = position[active], candidate[active]
+                if not len(position):
+                    break
+                # number of equal bytes before the first difference (a match may overlap its own position)
+                length = np.zeros(len(position), dtype=np.int64)
+                todo = np.arange(len(position))
+                for offset in range(0, max_count, 8):
+                    diff = words[position[todo] + offset] ^ words[candidate[todo] + offset]
+                    length[todo] += np.argmax(diff.view(np.uint8).reshape(-1, 8) != 0, axis=1) + 8 * (diff == 0)
+                    todo = todo[diff == 0]
+                length = np.minimum(length, limit[position])
+                length[length < 2] = 0  # different bytes with the same hash
+                better = length > best_len[position]
+                best_len[position[better]], best_pos[position[better]] = length[better], candidate[better]
+                unfinished = best_len[position] < limit[position]
+                position, candidate = position[unfinished], chain[candidate[unfinished]]
+    if n >= 2:
+        previous = np.concatenate((_previous((w[:-1] << 8 | w[1:]).astype(np.uint16)), [-1]))
+        pair = (best_len == 0) & (previous >= 0) & (index - previous <= window)
+        best_len[pair], best_pos[pair] = 2, previous[pair]
+
+    lengths = best_len.tolist()
+    starts = []
+    i = 0
+    while i < n:
+        starts.append(i)
+        i += lengths[i] or 1
+    starts = np.array(starts)
+    count = best_len[starts]
+    literal = count == 0
+    # literal: tag bit 1 then the byte; back-reference: tag bit 0, then distance - 1 and count - 1
+    backref_bits = 1 + window_sz2 + lookahead_sz2
+    values = np.where(literal, 0x100 | w[starts], (starts - best_pos[starts] - 1) << lookahead_sz2 | (count - 1))
+    shifts = np.where(literal, 9, backref_bits)[:, None] - 1 - np.arange(backref_bits)
+    bits = (values[:, None] >> np.maximum(shifts, 0)) & 1
+    return np.packbits(bits[shifts >= 0].astype(np.uint8)).tobytes()
+
+
+def heatshrink_decompress(data: bytes, window_sz2: int = 12, lookahead_sz2: int = 4) -> bytes:
+    'decompress data compressed with heatshrink_compress() (or any heatshrink encoder with the same parameters)'
+    out = bytearray()
+    padded = data + bytes(4)
+    total = len(data) * 8
+    backref_bits = window_sz2 + lookahead_sz2
+
+    def read(position, count):
+        'read count (up to 25) bits starting at a bit position'
+        word = int.from_bytes(padded[position >> 3:(position >> 3) + 4], 'big')
+        return (word >> (32 - (position & 7) - count)) & ((1 << count) - 1)
+
+    position = 0
+    while total - position >= 9:
+        if read(position, 1):
+            out.append(read(position + 1, 8))
+            position += 9
+        else:
+            if total - position < 1 + backref_bits:
+                break
+            backref = read(position + 1, backref_bits)
+            position += 1 + backref_bits
+            distance = (backref >> lookahead_sz2) + 1
+            for _ in range((backref & ((1 << lookahead_sz2) - 1)) + 1):
+                out.append(out[-distance])
+    return bytes(out)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'deflate':
+        return zlib.compress(data)
+    if compression.startswith('heatshrink'):
+        window_sz2, lookahead_sz2 = (int(value) for value in compression.split('_')[1:])
+        return heatshrink_compress(data, window_sz2, lookahead_sz2)
+    return data
+
+
+def _decompress(data: bytes, compression: int, size: int) -> bytes:
+    if compression == COMPRESSION['deflate']:
+        return zlib.decompress(data)
+    if compression == COMPRESSION['heatshrink_11_4']:
+        return heatshrink_decompress(data, 11, 4)[:size]
+    if compression == COMPRESSION['heatshrink_12_4']:
+        return heatshrink_decompress(data, 12, 4)[:size]
+    return data
+
+
+def block(block_type: int, data: bytes, compression: str = 'none') -> bytes:
+    'return a complete block (header, parameters, data and CRC32 checksum)'
+    compressed = _compress(data, compression)
+    if COMPRESSION[compression] and len(compressed) >= len(data):
+        compression, compressed = 'none', data  # compression doesn't help for this block
+    header = struct.pack('<HHI', block_type, COMPRESSION[compression], len(data))
+    if COMPRESSION[compression]:
+        header += struct.pack('<I', len(compressed))
+    content = header + struct.pack('<H', ENCODING_NONE) + compressed
+    return content + struct.pack('<I', zlib.crc32(content))
+
+
+def _ini(values: dict) -> bytes:
+    return ''.join(f'{key}={value}\n' for key, value in values.items()).encode()
+
+
+def bgcode_chunks(chunks: Iterable[str], metadata: Optional[dict] = None, compression: str = 'heatshrink_12_4',
+                  block_size: int = GCODE_BLOCK_SIZE) -> Iterable[bytes]:
+    '''
+    Convert chunks of gcode text to the bytes of a binary gcode file.
+
+    Args:
+        chunks (Iterable[str]): Chunks of gcode text (e.g. from gcode_stream()).
+        metadata (Optional[dict]): Values for the metadata blocks: {'file': {...}, 'printer': {...}, 'print': {...},
+            'slicer': {...}}. Missing blocks are written with default values.
+        compression (str): Compression for gcode blocks: 'none', 'deflate', 'heatshrink_11_4' or 'heatshrink_12_4'.
+            Printer firmware supports 'none' and the heatshrink options.
+        block_size (int): Maximum uncompressed size of each gcode block.
+
+    Yields:
+        bytes: The file header, then each block.
+    '''
+    if compression not in COMPRESSION:
+        raise ValueError(f"bgcode compression '{compression}' not recognized - use one of {list(COMPRESSION)}")
+    metadata = metadata or {}
+    yield MAGIC + struct.pack('<IH', VERSION, CHECKSUM_CRC32)
+    yield block(FILE_METADATA, _ini(metadata.get('file', {'Producer': 'FullControl'})))
+    yield block(PRINTER_METADATA, _ini(metadata.get('printer', {})))
+    yield block(PRINT_METADATA, _ini(metadata.get('print', {})))
+    yield block(SLICER_METADATA, _ini(metadata.get('slicer', {'producer': 'FullControl'})), 'deflate')
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk.encode()
+        while len(buffer) > block_size:
+            end = buffer.rfind(b'\n', 0, block_size) + 1 or block_size  # end blocks at the end of a line
+            yield block(GCODE, bytes(buffer[:end]), compression)
+            del buffer[:end]
+    if buffer:
+        yield block(GCODE, bytes(buffer), compression)
+
+
+def read_bgcode(data: bytes) -> tuple:
+    '''
+    Read a binary gcode file, checking the CRC32 checksum of each block.
+
+    Args:
+        data (bytes): The contents of the file.
+
+    Returns:
+        tuple: (gcode text, metadata dict of {block type: {key: value}}).
+    '''
+    if data[:4] != MAGIC:
+        raise ValueError('not a binary gcode file (missing GCDE header)')
+    _, checksum_type = struct.unpack_from('<IH', data, 4)
+    pos = 10
+    gcode, metadata = [], {}
+    names = {FILE_METADATA: 'file', PRINTER_METADATA: 'printer', PRINT_METADATA: 'print', SLICER_METADATA: 'slicer'}
+    while pos < len(data):
+        start = pos
+        block_type, compression, size = struct.unpack_from('<HHI', data, pos)
+        pos += 8
+        compressed_size = size
+        if compression:
+            compressed_size, = struct.unpack_from('<I', data, pos)
+            pos += 4
+        if block_type == 5:  # thumbnail parameters: format, width, height
+            pos += 6
+        else:
+            pos += 2
+        content = data[pos:pos + compressed_size]
+        pos += compressed_size
+        if checksum_type == CHECKSUM_CRC32:
+            checksum, = struct.unpack_from('<I', data, pos)
+            if checksum != zlib.crc32(data[start:pos]):
+                raise ValueError(f'binary gcode block at byte {start} has an invalid checksum')
+            pos += 4
+        content = _decompress(content, compression, size)
+        if block_type == GCODE:
+            gcode.append(content.decode())
+        elif block_type in names:
+            lines = content.decode().splitlines()
+            metadata[names[block_type]] = dict(line.split('=', 1) for line in lines if '=' in line)
+    return ''.join(gcode), metadata
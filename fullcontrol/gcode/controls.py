@@ -1,15 +1,77 @@
 from fullcontrol.gcode.printer import Printer
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Callable
 import json
 import os
 
 class GcodeControls:
-    '''Class to control gcode generation.'''
-    def __init__(self, printer_name: str = None, initialization_data: Dict[str, Any] = None, save_as: str = None, include_date: bool = True):
+    '''Class to control gcode generation.
+
+    Attributes:
+        printer_name (str): The name of the printer. Defaults to 'generic'.
+        initialization_data (dict): Values that overwrite the default initialization data.
+        save_as (str): The file name to save the gcode as (without extension). Defaults to None (not saved).
+        include_date (bool): Whether to include the date in the save_as filename. Defaults to True.
+        save_format (str): Format of saved gcode: 'gcode' (plain text), 'gcode.gz' (gzip-compressed) or 'bgcode'
+            (binary gcode with compressed blocks). Defaults to None: plain text for save_as, or from the extension
+            of an output file path.
+        output (file-like or path): If set, gcode is streamed to this open file or file path in chunks
+            rather than being returned as one string, keeping memory use flat for long prints.
+        parallel_workers (int): If greater than 1, a list of steps is split at layer changes/travels and the
+            chunks are converted to gcode in this many worker processes. The gcode is identical to serial generation.
+        arc_tolerance (float): If set, runs of extrusion moves that follow circular arcs within this tolerance (mm)
+            are replaced with G2/G3 arc moves after the gcode is generated (see fullcontrol.gcode.arc_fitting).
+        optimize_travel (bool): Whether to reorder (and reverse) separate islands of extrusion within each layer to
+            reduce travel between them (see fullcontrol.gcode.travel). Defaults to False.
+        simplify_tolerance (float): If set, points that deviate from a straight path by no more than this tolerance
+            (mm) are removed before gcode is generated, keeping extrusion totals (see fullcontrol.gcode.simplify).
+        drop_modal_words (bool): Whether to drop F and X/Y/Z words that repeat the current feedrate/position from moves
+            (see fullcontrol.gcode.modal). Defaults to False.
+        drop_motion_commands (bool): With drop_modal_words, also drop G0/G1 words that repeat the previous motion
+            command. Only use this if the firmware supports modal motion commands. Defaults to False.
+        axis_precision (dict): Number of decimal places for values of each letter in moves, e.g. {'X': 2, 'E': 4}.
+        max_flow (float): If set, print speeds are reduced where the volumetric flow (extrusion area x print speed)
+            would exceed this rate (mm3/s), by adjusting or inserting Printer steps (see fullcontrol.gcode.flow).
+        max_print_speed (float): With max_flow, print speeds are also raised towards max_flow where there is
+            headroom, up to this speed (mm/min).
+        min_layer_time (float): If set, layers that would print in less than this time (s) are slowed down, with a
+            dwell added if needed (see fullcontrol.gcode.layer_time).
+        min_layer_speed (float): With min_layer_time, print speeds are not reduced below this speed (mm/min).
+            Defaults to 600.
+        layer_marker (callable): With min_layer_time, a function of a step that returns True for steps that start a
+            new layer. Defaults to None (layers are found from the z of extrusion moves).
+        repeat_copies (str): If set, repeated copies of geometry (e.g. from move(..., copy=True)) are found and gcode
+            for copies after the second is generated once and reused: 'relative' repeats it in relative coordinates
+            (G91), 'loop' writes it once in a RepRapFirmware 3 while loop (see fullcontrol.gcode.repeats). Defaults
+            to None.
+    '''
+    def __init__(self, printer_name: str = None, initialization_data: Dict[str, Any] = None, save_as: str = None, include_date: bool = True,
+                 output: Union[str, os.PathLike, Any] = None, parallel_workers: Optional[int] = None,
+                 arc_tolerance: Optional[float] = None, simplify_tolerance: Optional[float] = None,
+                 drop_modal_words: bool = False, drop_motion_commands: bool = False,
+                 axis_precision: Optional[Dict[str, int]] = None, save_format: Optional[str] = None,
+                 max_flow: Optional[float] = None, max_print_speed: Optional[float] = None,
+                 min_layer_time: Optional[float] = None, min_layer_speed: float = 600,
+                 layer_marker: Optional[Callable] = None, optimize_travel: bool = False,
+                 repeat_copies: Optional[str] = None):
         self.printer_name = printer_name or 'generic'
         self.initialization_data = initialization_data or {}
         self.save_as = save_as
         self.include_date = include_date
+        self.output = output
+        self.parallel_workers = parallel_workers
+        self.arc_tolerance = arc_tolerance
+        self.simplify_tolerance = simplify_tolerance
+        self.drop_modal_words = drop_modal_words
+        self.drop_motion_commands = drop_motion_commands
+        self.axis_precision = axis_precision
+        self.save_format = save_format
+        self.max_flow = max_flow
+        self.max_print_speed = max_print_speed
+        self.min_layer_time = min_layer_time
+        self.min_layer_speed = min_layer_speed
+        self.layer_marker = layer_marker
+        self.optimize_travel = optimize_travel
+        self.repeat_copies = repeat_copies
         
         # Check for invalid printer name right away
         if printer_name and printer_name != 'generic':
@@ -0,0 +1,181 @@
+from typing import Callable, Optional
+import numpy as np
+from fullcontrol.gcode.point import Point
+from fullcontrol.gcode.printer import Printer
+from fullcontrol.gcode.point_array import PointArray, moves_gcode
+
+# handlers process a step and append any resulting lines of gcode to state.gcode: handler(step, state) -> None
+_registered = {}  # handlers registered for a class (and its subclasses unless they are registered separately)
+_handlers = {}  # handler for each concrete step class, resolved once per class and then looked up directly
+# advancers update state for a step without generating its gcode: advancer(step, state) -> None
+# they allow state to be tracked through a design quickly (e.g. to find the state at the start of a chunk of steps
+# for parallel generation). classes without a registered advancer use their normal handler
+_registered_advancers = {}
+_advancers = {}
+# fewest consecutive Points that process_steps() converts to gcode together (shorter runs are processed one by one)
+MIN_POINT_RUN = 16
+
+
+def _append_gcode(g_cmd, state):
+    'append the result of a gcode() method (a line, list of lines, or None) to state.gcode'
+    if g_cmd:
+        if isinstance(g_cmd, str):
+            state.gcode.append(g_cmd)
+        elif isinstance(g_cmd, list):
+            state.gcode.extend(g_cmd)
+
+
+def _printer_handler(step, state):
+    state.printer.update_from(step)
+    _append_gcode(step.gcode(state), state)
+
+
+def _point_handler(step, state):
+    g_cmd = step.gcode(state)  # Point.gcode() returns a single line or None
+    state.point = step
+    if g_cmd:
+        state.gcode.append(g_cmd)
+
+
+def _point_method_handler(step, state):
+    'handler for subclasses of Point that override gcode() (never converted together in runs, see process_steps)'
+    _append_gcode(step.gcode(state), state)
+    state.point = step
+
+
+# handlers of steps that move to a Point
+POINT_HANDLERS = (_point_handler, _point_method_handler)
+
+
+def _gcode_method_handler(step, state):
+    _append_gcode(step.gcode(state), state)
+
+
+def _no_gcode_handler(step, state):
+    pass
+
+
+def register_gcode_handler(cls: type, handler: Callable[[object, object], Optional[object]]):
+    '''
+    Register a function to generate gcode for steps of the given class (and its subclasses).
+
+    The handler is called as handler(step, state) and should return a line of gcode, a list of lines, or None, in
+    the same way as the gcode() method of fullcontrol classes. It may also update state.
+
+    Args:
+        cls (type): The class of step to handle.
+        handler (callable): The function to generate gcode for steps of this class.
+    '''
+    def registered_handler(step, state):
+        _append_gcode(handler(step, state), state)
+    _register(cls, registered_handler)
+
+
+def _register(cls: type, handler: Callable):
+    'register a handler that appends to state.gcode directly'
+    _registered[cls] = handler
+    _handlers.clear()  # classes resolved previously may now resolve to the new handler
+    _handlers.update(_registered)
+    _advancers.clear()
+
+
+def handler_for(cls: type) -> Callable:
+    '''
+    Return the handler used to process steps of the given class, resolving it from the class hierarchy the
+    first time the class is seen: registered base classes first, then Printer/Point behaviour, then any gcode() method.
+    Only Points whose class does not override Point.gcode() get _point_handler, so only they are converted in runs.
+    '''
+    handler = _handlers.get(cls)
+    if handler is None:
+        for base in cls.__mro__:
+            if base in _registered:
+                handler = _registered[base]
+                break
+        else:
+            if issubclass(cls, Printer):
+                handler = _printer_handler
+            elif issubclass(cls, Point):
+                handler = _point_handler if cls.gcode is Point.gcode else _point_method_handler
+            elif hasattr(cls, 'gcode'):
+                handler = _gcode_method_handler
+            else:
+                handler = _no_gcode_handler
+        _handlers[cls] = handler
+    return handler
+
+
+def process_step(step, state):
+    'process a single step, appending any resulting lines of gcode to state.gcode'
+    cls = type(step)
+    (_handlers.get(cls) or handler_for(cls))(step, state)
+
+
+def process_steps(steps, state):
+    '''
+    Process all steps in order, with the handler for each step found by a single dict lookup on its class.
+
+    Consecutive Points with x, y and z defined (and no e or gcode_line) are collected into runs, which are converted
+    to gcode together with the same result as processing them one by one.
+    '''
+    get_handler = _handlers.get
+    run = []
+    for step in steps:
+        cls = type(step)
+        handler = get_handler(cls) or handler_for(cls)
+        if handler is _point_handler and step.e is None and not step.gcode_line \
+                and step.x is not None and step.y is not None and step.z is not None:
+            run.append(step)
+            continue
+        if run:
+            _process_point_run(run, state)
+            run = []
+        handler(step, state)
+    if run:
+        _process_point_run(run, state)
+
+
+def _process_point_run(run: list, state):
+    'process a run of Points with x, y and z defined, calculating moves for the whole run at once if it is long enough'
+    if len(run) < MIN_POINT_RUN:
+        for point in run:
+            _point_handler(point, state)
+        return
+    xyz = np.array([(point.x, point.y, point.z) for point in run], dtype=np.float64)
+    state.gcode.extend(moves_gcode(xyz, state))
+    state.point = run[-1]
+
+
+def _register_advancer(cls: type, advancer: Callable):
+    'register a function that updates state for steps of a class without generating gcode'
+    _registered_advancers[cls] = advancer
+    _advancers.clear()
+
+
+def advancer_for(cls: type) -> Callable:
+    'return the function used to update state for steps of the given class without generating their gcode'
+    advancer = _advancers.get(cls)
+    if advancer is None:
+        advancer = handler_for(cls)
+        for base in cls.__mro__:
+            if base in _registered:
+                break  # a handler registered for a more specific class takes precedence
+            if base in _registered_advancers:
+                advancer = _registered_advancers[base]
+                break
+        _advancers[cls] = advancer
+    return advancer
+
+
+def advance_step(step, state):
+    'update state for a single step without generating its gcode (any gcode from steps without an advancer is discarded)'
+    cls = type(step)
+    (_advancers.get(cls) or advancer_for(cls))(step, state)
+    state.gcode.clear()
+
+
+def _point_advancer(step, state):
+    state.point = step
+
+
+_register_advancer(Point, _point_advancer)
+_register_advancer(PointArray, lambda step, state: step.update_state(state))
@@ -0,0 +1,177 @@
+from importlib import import_module
+from math import pi
+from typing import Dict, Optional
+import numpy as np
+from pydantic import BaseModel
+
+from fullcontrol.gcode.importer import MoveTable, read_moves
+import fullcontrol.devices.community.singletool.base_settings as base_settings
+
+# motion limits read from the printer profile (fullcontrol/devices/community/singletool)
+LIMIT_KEYS = ('acceleration', 'travel_acceleration', 'junction_deviation')
+# cosine of the angle between moves above which a junction is treated as a straight line or a reversal
+STRAIGHT_COS = 0.999999
+
+
+class PrintEstimate(BaseModel):
+    '''
+    Estimated print time and extrusion for a gcode file.
+
+    Attributes:
+        total_time (float): Total time of all moves (s).
+        layer_times (Dict[float, float]): Time for each layer (s), keyed by z of the layer. Travel moves (including
+            z-hops) count towards the layer of the last extrusion before them.
+        extrusion_volume (float): Volume of material extruded (mm3).
+        average_flow (float): Average volumetric flow rate while extruding (mm3/s), including acceleration.
+        peak_flow (float): Highest volumetric flow rate of any extrusion move (mm3/s).
+    '''
+    total_time: float = 0.0
+    layer_times: Dict[float, float] = {}
+    extrusion_volume: float = 0.0
+    average_flow: float = 0.0
+    peak_flow: float = 0.0
+
+
+def _singletool_profile(module: str):
+    'the printer profile module in fullcontrol/devices/community/singletool, or None if there is no such module'
+    try:
+        return import_module(f'fullcontrol.devices.community.singletool.{module}')
+    except ModuleNotFoundError:
+        return None
+
+
+def motion_limits(printer_name: str = 'generic', overrides: Optional[dict] = None) -> dict:
+    '''
+    Motion limits of a printer: the defaults in base_settings.py, updated with the motion_limits of the printer's
+    profile in fullcontrol/devices/community/singletool (if it has any) and then with overrides.
+
+    'Community/...' printers use the singletool profile of their module in the community library (if there is one).
+    'Cura/...' printers use the defaults, with the filament diameter of the printer.
+
+    Returns:
+        dict: acceleration and travel_acceleration (mm/s2), junction_deviation (mm), dia_feed (mm) and e_units.
+    '''
+    limits = {key: base_settings.default_initial_settings[key] for key in LIMIT_KEYS + ('dia_feed', 'e_units')}
+    if printer_name[:5] == 'Cura/':
+        from fullcontrol.gcode.printer_library import cura_settings
+        limits.update({key: value for key, value in cura_settings(printer_name[5:]).items() if key in limits})
+    elif printer_name[:10] == 'Community/':
+        from fullcontrol.gcode.printer_library import _community_library
+        module = _community_library().get(printer_name[10:])
+        if module is None:
+            raise ValueError(f"Printer '{printer_name[10:]}' not found in the library 'community_minimal'")
+        limits.update(getattr(_singletool_profile(module), 'motion_limits', {}))
+    else:
+        profile = _singletool_profile(printer_name)
+        if profile is None:
+            raise ValueError(f"printer_name '{printer_name}' is invalid - printer configuration not found")
+        limits.update(getattr(profile, 'motion_limits', {}))
+    limits.update({key: value for key, value in (overrides or {}).items() if key in limits})
+    return limits
+
+
+def _min_plus_forward(limit: np.ndarray, gain: np.ndarray) -> np.ndarray:
+    '''
+    Solve u[k] = min(limit[k], u[k - 1] + gain[k - 1]) with u[0] = limit[0] for all k at once, as
+    u[k] = S[k] + min over i <= k of (limit[i] - S[i]), where S is the cumulative sum of gain.
+    '''
+    total = np.concatenate(([0.0], np.cumsum(gain)))
+    return total + np.minimum.accumulate(limit - total)
+
+
+def move_times(moves: MoveTable, limits: dict) -> np.ndarray:
+    '''
+    Time of each move (s) with trapezoidal speed profiles, as planned by printer firmware.
+
+    The speed at each junction between moves is limited by the nominal speeds of both moves and by the junction
+    deviation (as in Marlin and Grbl). The entry speed of every move is then limited so that the printer can
+    accelerate to it from the previous junction and decelerate from it to the next one. Both of these passes over the
+    moves are min-plus recurrences in the squared speed, solved for all moves at once with cumulative sums and
+    minima. Moves that only extrude or retract start and end at rest. The printer starts and ends at rest.
+
+    Args:
+        moves (MoveTable): The moves (e.g. from read_moves()).
+        limits (dict): acceleration and travel_acceleration (mm/s2) and junction_deviation (mm), e.g. from
+            motion_limits().
+
+    Returns:
+        np.ndarray: The time of each move.
+    '''
+    times = np.zeros(len(moves))
+    xyz = moves.xyz
+    delta = np.diff(np.vstack((np.full((1, 3), np.nan), xyz)), axis=0)
+    length = np.nan_to_num(np.linalg.norm(delta, axis=1))  # moves from or to an unknown position are not planned
+    e_only = (length == 0) & ~np.isnan(delta).any(axis=1) & (moves.e != 0)
+    length = np.where(e_only, np.abs(moves.e), length)
+    speed = np.nan_to_num(moves.f, nan=0.0) / 60
+    planned = np.flatnonzero((length > 0) & (speed > 0))
+    if not len(planned):
+        return times
+    length, speed, e_only = length[planned], speed[planned], e_only[planned]
+    accel = np.where(moves.extruding[planned] | e_only, limits['acceleration'], limits['travel_acceleration'])
+    direction = np.where(e_only[:, None], 0.0, delta[planned] / length[:, None])
+
+    # limit on the squared speed at the start of each move (and at the end of the last move)
+    cos_theta = -(direction[:-1] * direction[1:]).sum(axis=1)
+    sin_half = np.sqrt(np.clip(0.5 * (1 - cos_theta), 0, 1))
+    junction_accel = np.minimum(accel[:-1], accel[1:])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        junction = junction_accel * limits['junction_deviation'] * sin_half / (1 - sin_half)
+    junction = np.where(cos_theta < -STRAIGHT_COS, np.inf, np.where(cos_theta > STRAIGHT_COS, 0.0, junction))
+    junction[e_only[:-1] | e_only[1:]] = 0.0
+    junction = np.minimum(junction, np.minimum(speed[:-1], speed[1:]) ** 2)
+    limit = np.concatenate(([0.0], junction, [0.0]))
+
+    # forwards: reachable by accelerating from the previous junction, backwards: able to stop for the next one
+    gain = 2 * accel * length
+    entry = _min_plus_forward(limit, gain)
+    entry = _min_plus_forward(entry[::-1], gain[::-1])[::-1]
+    v0, v1 = np.sqrt(entry[:-1]), np.sqrt(entry[1:])
+
+    # trapezoid (accelerate, cruise, decelerate) or triangle if the nominal speed is not reached
+    accelerate = (speed ** 2 - entry[:-1]) / (2 * accel)
+    decelerate = (speed ** 2 - entry[1:]) / (2 * accel)
+    cruise = length - accelerate - decelerate
+    peak = np.where(cruise >= 0, speed, np.sqrt(np.maximum((gain + entry[:-1] + entry[1:]) / 2, 0)))
+    times[planned] = (peak - v0) / accel + (peak - v1) / accel + np.maximum(cruise, 0) / speed
+    return times
+
+
+def estimate_print(source, printer_name: str = 'generic', initialization_data: Optional[dict] = None,
+                   relative_e: bool = True) -> PrintEstimate:
+    '''
+    Estimate the print time, time per layer and volumetric flow for a gcode file.
+
+    Args:
+        source: Path of a gcode file (see import_gcode()) or a MoveTable.
+        printer_name (str): Printer that motion limits and filament diameter are taken from (see motion_limits()).
+        initialization_data (Optional[dict]): Values that override the profile, e.g. {'acceleration': 3000} or
+            {'dia_feed': 2.85}.
+        relative_e (bool): Whether E values are relative at the start of the file (for a path).
+
+    Returns:
+        PrintEstimate: The estimate.
+    '''
+    moves = source if isinstance(source, MoveTable) else read_moves(source, relative_e)
+    limits = motion_limits(printer_name, initialization_data)
+    times = move_times(moves, limits)
+    extruding = moves.extruding
+    volume = moves.e if limits['e_units'] == 'mm3' else moves.e * pi * (limits['dia_feed'] / 2) ** 2
+    volume = np.where(extruding, volume, 0.0)
+    if not extruding.any():
+        return PrintEstimate(total_time=float(times.sum()))
+    # each move belongs to the layer of the last extrusion at or before it (the first layer for earlier moves)
+    last_extrusion = np.maximum.accumulate(np.where(extruding, np.arange(len(moves)), -1))
+    layer_z = np.round(moves.z[np.where(last_extrusion >= 0, last_extrusion, np.argmax(extruding))], 6)
+    layers, layer_of = np.unique(layer_z, return_inverse=True)
+    layer_times = np.bincount(layer_of, weights=times, minlength=len(layers))
+    timed = extruding & (times > 0)  # extrusion moves from an unknown position are not timed
+    extrusion_time = times[timed].sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flow = np.where(timed, volume / times, 0.0)
+    return PrintEstimate(
+        total_time=float(times.sum()),
+        layer_times={float(z): float(t) for z, t in zip(layers, layer_times) if not np.isnan(z)},
+        extrusion_volume=float(volume.sum()),
+        average_flow=float(volume[timed].sum() / extrusion_time) if extrusion_time > 0 else 0.0,
+        peak_flow=float(flow.max()))
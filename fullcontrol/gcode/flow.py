@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from fullcontrol.gcode.dispatch import handler_for, POINT_HANDLERS
+from fullcontrol.gcode.extrusion_classes import ExtrusionGeometry, Extruder
+from fullcontrol.gcode.point_array import PointArray
+from fullcontrol.gcode.printer import Printer
+
+
+def capped_speed(speed, area, max_flow: float, max_print_speed: Optional[float] = None):
+    '''
+    Print speed (mm/min) for extrusion with the given area (mm2) so that the volumetric flow does not exceed max_flow
+    (mm3/s). Speeds are only reduced, unless max_print_speed is set, in which case they are set as close to max_flow
+    as possible without exceeding max_print_speed. Works for single values or arrays.
+    '''
+    with np.errstate(divide='ignore'):
+        limit = np.where(np.asarray(area) > 0, max_flow * 60 / np.asarray(area, dtype=np.float64), np.inf)
+    result = np.minimum(speed if max_print_speed is None else max_print_speed, limit)
+    return float(result) if np.ndim(result) == 0 else result
+
+
+def cap_flow(steps: Iterable, max_flow: float, max_print_speed: Optional[float] = None, print_speed: float = 1000,
+             extrusion_width: Optional[float] = None, extrusion_height: Optional[float] = None,
+             stats: Optional[dict] = None, report: bool = False) -> Iterator:
+    '''
+    Adjust the print speed of extrusion so that the volumetric flow (extrusion area x speed) stays under max_flow.
+
+    The extrusion area and the print speed set by the design are tracked through the steps in the same way as during
+    gcode generation. Printer steps that set print_speed are adjusted for the current area, and a Printer step is
+    inserted before a run of extruding Points if the area has changed since the print speed was last set. Speeds of
+    PointArrays with width/height/speed columns are calculated for all points at once and set in a speed column.
+    Travel moves are not changed.
+
+    Args:
+        steps (Iterable): The steps of the design.
+        max_flow (float): The maximum volumetric flow rate (mm3/s).
+        max_print_speed (Optional[float]): If set, print speeds are also raised where the flow is below max_flow,
+            up to this speed (mm/min). Otherwise speeds are only reduced.
+        print_speed (float): The print speed at the start of the design (mm/min).
+        extrusion_width (Optional[float]): The extrusion width at the start of the design (mm).
+        extrusion_height (Optional[float]): The extrusion height at the start of the design (mm).
+        stats (Optional[dict]): If given, 'points', 'slowed' and 'raised' are set to the number of extruding points
+            and the number of them printed slower or faster than set in the design.
+        report (bool): Whether to print the number of points slowed/raised once all steps have been processed.
+
+    Yields:
+        The steps, with Printer steps adjusted or inserted.
+    '''
+    stats = {} if stats is None else stats
+    stats['points'] = stats['slowed'] = stats['raised'] = 0
+    # tracking instances, updated in the same way as State during gcode generation
+    tracker = SimpleNamespace(extrusion_geometry=ExtrusionGeometry(width=extrusion_width, height=extrusion_height))
+    geometry = tracker.extrusion_geometry
+    extruder_on = False
+    design_speed = print_speed  # the print speed set by the design
+    speed = print_speed  # the print speed set in the adjusted steps
+    target = None  # the adjusted print speed for the current area and design speed (None when it needs updating)
+
+    def count(design, adjusted, points):
+        stats['points'] += points
+        stats['slowed'] += int(np.count_nonzero(np.broadcast_to(adjusted < design, points)))
+        stats['raised'] += int(np.count_nonzero(np.broadcast_to(adjusted > design, points)))
+
+    for step in steps:
+        if isinstance(step, Printer) and step.print_speed is not None:
+            design_speed = step.print_speed
+            target = capped_speed(design_speed, geometry.get_extrusion_per_mm(), max_flow, max_print_speed)
+            if target != step.print_speed:
+                step = step.model_copy(update={'print_speed': target})
+            speed = target
+        elif isinstance(step, ExtrusionGeometry):
+            ExtrusionGeometry.gcode(step, tracker)
+            target = None
+        elif isinstance(step, Extruder) and step.on is not None:
+            extruder_on = step.on
+        elif extruder_on and isinstance(step, PointArray) and len(step) \
+                and (step.speed is not None or step.width is not None or step.height is not None):
+            area = step.area(geometry)
+            design = step.speed if step.speed is not None else np.full(len(step), float(design_speed))
+            adjusted = np.broadcast_to(capped_speed(
+                design, geometry.get_extrusion_per_mm() if area is None else area, max_flow, max_print_speed), len(step))
+            count(design, adjusted, len(step))
+            if not np.array_equal(adjusted, step.speed if step.speed is not None else np.full(len(step), float(speed))):
+                step = type(step)(step.xyz, width=step.width, height=step.height, speed=adjusted, color=step.color,
+                                  extrusion_length=step.extrusion_length)
+            step.update_state(tracker, area)
+        elif extruder_on and ((isinstance(step, PointArray) and len(step)) or handler_for(type(step)) in POINT_HANDLERS):
+            # Points, or PointArrays printed at the print speed in state
+            if target is None:
+                target = capped_speed(design_speed, geometry.get_extrusion_per_mm(), max_flow, max_print_speed)
+            if target != speed:
+                yield Printer(print_speed=target)
+                speed = target
+            count(design_speed, target, len(step) if isinstance(step, PointArray) else 1)
+        yield step
+    if report:
+        print(f"max_flow={max_flow}: print speed reduced for {stats['slowed']} and raised for {stats['raised']} "
+              f"of {stats['points']} extruding points")
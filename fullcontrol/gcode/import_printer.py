@@ -2,8 +2,10 @@
 import json
 import os
 from copy import deepcopy
+from functools import lru_cache
 from fullcontrol.gcode import Extruder, ManualGcode, Buildplate, Hotend, Fan
 import fullcontrol.devices.community.singletool.base_settings as base_settings
+from fullcontrol.gcode.printer_library import cura_settings
 from importlib import import_module, resources
 
 
@@ -12,6 +14,13 @@ def load_json(library, file_name):
     with resource.open('r') as file:
         return json.load(file)
 
+
+@lru_cache(maxsize=None)
+def _library(library_name: str) -> dict:
+    'the printers in library.json of a library (read once)'
+    return load_json(library_name, os.path.join('library.json'))
+
+
 def find_terms_in_brackets(input_string):
     import re
     ' find all terms in the start_gcode string contained within {} and split the terms if they are comma separated'
@@ -36,17 +45,17 @@ def replace_gcode_variables(printer_name: str, gcode_type: str, data: dict):
 def import_printer(printer_name: str, user_overrides: dict):
     library_name = 'cura' if printer_name[:5] == 'Cura/' else 'community_minimal'
     printer_name = printer_name[5:] if library_name == 'cura' else printer_name[10:]
-    print(f"Debug: library_name={library_name}, printer_name={printer_name}")  # Debug print
-    library = load_json(library_name, os.path.join('library.json'))
-    print(f"Debug: library={library}")  # Debug print
-    if printer_name not in library:
-        raise ValueError(f"Printer '{printer_name}' not found in the library '{library_name}'")
-    if printer_name not in library:
-        raise ValueError(f"Printer '{printer_name}' not found in the library '{library_name}'")
-    data = import_module(f'fullcontrol.devices.{library_name}.settings.{library[printer_name]}').default_initial_settings
     if library_name == 'cura':
+        # read from the compiled database of Cura printers, without importing the printer's module
+        data = cura_settings(printer_name)
         data['print_speed'] = int(data['print_speed']*60)
         data['travel_speed'] = int(data['travel_speed']*60)
+    else:
+        library = _library(library_name)
+        if printer_name not in library:
+            raise ValueError(f"Printer '{printer_name}' not found in the library '{library_name}'")
+        # copy the settings of the module so that they aren't changed for later calls
+        data = dict(import_module(f'fullcontrol.devices.{library_name}.settings.{library[printer_name]}').default_initial_settings)
     data = {**base_settings.default_initial_settings, **data}
     data = {**data, **user_overrides}
     original_start_gcode = deepcopy(data['start_gcode'])
@@ -0,0 +1,361 @@
+'''
+Import gcode files (e.g. from other slicers) as a table of moves or as a list of steps.
+
+Files are read through a memory map in chunks of whole lines, and each chunk is tokenized with numpy: the command at
+the start of each line and the position of each X/Y/Z/E/F/I/J word are found for all lines at once, and the numbers
+are converted to floats in one call. Modal state (G90/G91, M82/M83, G92, G28 and the feedrate) is then applied to the
+whole chunk with cumulative sums, so no Python code runs per line.
+'''
+import gzip
+import mmap
+import os
+from math import ceil
+from typing import Iterator, Optional
+import numpy as np
+
+from fullcontrol.gcode.bgcode import MAGIC as BGCODE_MAGIC, read_bgcode
+
+# bytes of the file tokenized at once (chunks end at the end of a line)
+CHUNK_SIZE = 1 << 24
+# approximate length (mm) of the lines that arcs are divided into when a table of moves is converted to steps
+ARC_SEGMENT_LENGTH = 0.5
+# letters of the words that are read from lines of gcode
+WORDS = 'XYZEFIJ'
+MOVE_COLUMNS = ('x', 'y', 'z', 'e', 'f', 'i', 'j')
+# most digits in a number converted with integer arithmetic (so that the mantissa is exact in float64)
+MAX_DIGITS = 15
+
+_WORD_INDEX = np.full(256, -1, dtype=np.int8)
+_WORD_INDEX[list(WORDS.encode())] = range(len(WORDS))
+_POWERS_OF_TEN = 10.0 ** np.arange(MAX_DIGITS + 1)
+_NEWLINE = np.frombuffer(b'\n', dtype=np.uint8)
+# line commands are encoded as number (G) or 100 + number (M)
+G28, G90, G91, G92, M82, M83 = 28, 90, 91, 92, 182, 183
+_WORD_COMMANDS = [0, 1, 2, 3, G28, G92]  # commands whose words are read
+
+
+class MoveTable:
+    '''
+    The moves (G0/G1/G2/G3) of a gcode file, stored as columns of numpy arrays.
+
+    Attributes:
+        g (np.ndarray): Motion command of each move (0, 1, 2 or 3).
+        x, y, z (np.ndarray): Position at the end of each move (NaN until the position of an axis is known).
+        e (np.ndarray): Length of filament extruded by each move (negative for retractions).
+        f (np.ndarray): Feedrate of each move (mm/min, NaN until one is set).
+        i, j (np.ndarray): Arc centre offsets for G2/G3 moves (NaN for other moves).
+    '''
+
+    def __init__(self, g, x, y, z, e, f, i, j):
+        self.g = np.asarray(g, dtype=np.int8)
+        for name, values in zip(MOVE_COLUMNS, (x, y, z, e, f, i, j)):
+            setattr(self, name, np.asarray(values, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.g)
+
+    @property
+    def xyz(self) -> np.ndarray:
+        'N x 3 array of the position at the end of each move'
+        return np.column_stack((self.x, self.y, self.z))
+
+    @property
+    def extruding(self) -> np.ndarray:
+        'whether each move extrudes material'
+        return self.e > 0
+
+    @classmethod
+    def concatenate(cls, tables: list) -> 'MoveTable':
+        'join tables of moves into one table'
+        if not tables:
+            return cls(*([()] * 8))
+        return cls(*(np.concatenate([getattr(table, name) for table in tables]) for name in ('g',) + MOVE_COLUMNS))
+
+
+def _accumulate(is_set: np.ndarray, values: np.ndarray, start: float) -> np.ndarray:
+    '''
+    Value of an axis after each of a sequence of events, where each event either sets the axis to its value (is_set)
+    or adds its value to it, and the axis has the value start before the first event.
+    '''
+    total = np.cumsum(np.where(is_set, 0.0, values))
+    last_set = np.maximum.accumulate(np.where(is_set, np.arange(len(values)), -1))
+    return np.where(last_set >= 0, values[last_set] + (total - total[last_set]), start + total)
+
+
+def _latest(is_set: np.ndarray, values: np.ndarray, start):
+    'value of the last event that set a value, for each of a sequence of events (start before the first)'
+    last_set = np.maximum.accumulate(np.where(is_set, np.arange(len(values)), -1))
+    return np.where(last_set >= 0, values[last_set], start)
+
+
+def _parse_numbers(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    '''
+    Convert the text between starts and ends in buf to floats (NaN where it is empty or not a number).
+
+    Numbers of each length up to MAX_DIGITS characters are converted together, one character position at a time: the
+    digits are read into an integer mantissa, which is divided by a power of ten. Both are exact in float64, so the
+    result is correctly rounded, the same as from float(). Longer numbers and other forms (e.g. 1.5e-3) are converted
+    with float() one at a time.
+    '''
+    lengths = ends - starts
+    values = np.full(len(starts), np.nan)
+    for length in np.flatnonzero(np.bincount(np.minimum(lengths, MAX_DIGITS + 1))[1:MAX_DIGITS + 1]) + 1:
+        group = np.flatnonzero(lengths == length)
+        start = starts[group]
+        negative = buf[start] == 45
+        valid = np.ones(len(group), dtype=bool)
+        mantissa = np.zeros(len(group), dtype=np.int64)
+        decimals = np.zeros(len(group), dtype=np.int64)
+        dot = np.zeros(len(group), dtype=bool)
+        any_digit = np.zeros(len(group), dtype=bool)
+        for column in range(length):
+            char = buf[start + column]
+            digit = char - np.uint8(48)
+            is_digit = digit < 10
+            is_dot = char == 46
+            mantissa = np.where(is_digit, mantissa * 10 + digit, mantissa)
+            decimals += is_digit & dot
+            valid &= is_digit | (is_dot & ~dot) | (negative if column == 0 else False)
+            dot |= is_dot
+            any_digit |= is_digit
+        valid &= any_digit
+        values[group[valid]] = np.where(negative, -mantissa, mantissa)[valid] / _POWERS_OF_TEN[decimals[valid]]
+    for i in np.flatnonzero(np.isnan(values) & (lengths > 0)):
+        try:
+            values[i] = float(buf[starts[i]:ends[i]].tobytes())
+        except ValueError:
+            pass  # not a number
+    return values
+
+
+class _Parser:
+    'parse chunks of a gcode file, keeping the modal state of the printer between chunks'
+
+    def __init__(self, relative_e: bool):
+        self.position = {'X': np.nan, 'Y': np.nan, 'Z': np.nan, 'E': 0.0}
+        self.absolute = True
+        self.relative_e = relative_e
+        self.feedrate = np.nan
+
+    def parse(self, data: bytes) -> MoveTable:
+        # everything is located relative to the delimiters (whitespace, ; and the * of a checksum, which ends the
+        # words of a line like a comment): each line starts after a newline and each word starts after whitespace,
+        # and both end at the next delimiter
+        buf = np.concatenate((_NEWLINE, np.frombuffer(data, dtype=np.uint8), _NEWLINE, _NEWLINE, _NEWLINE))
+        delimiters = np.flatnonzero((buf <= 32) | (buf == 59) | (buf == 42))
+        kind = buf[delimiters]
+        newline = kind == 10
+        comment = (kind == 59) | (kind == 42)
+        line_of = np.cumsum(newline) - 1  # line that each delimiter is in (a newline starts a line)
+        newlines = np.flatnonzero(newline[:-2])
+
+        # command at the start of each line, e.g. G1 -> 1, M83 -> 183 (-1 for anything else), after any line number
+        # (N followed by digits and whitespace)
+        first = delimiters[newlines] + 1
+        numbered = ((buf[first] == ord('N')) & (delimiters[newlines + 1] > first + 1)
+                    & ~newline[newlines + 1] & ~comment[newlines + 1])
+        command_delimiter = newlines + numbered
+        starts = delimiters[command_delimiter] + 1
+        length = delimiters[command_delimiter + 1] - starts
+        digits = buf[np.minimum(starts[:, None] + [1, 2], len(buf) - 1)].astype(np.int16) - 48
+        is_digit = (digits >= 0) & (digits <= 9)
+        number = np.where(length == 2, digits[:, 0], digits[:, 0] * 10 + digits[:, 1])
+        valid = ((length == 2) & is_digit[:, 0]) | ((length == 3) & is_digit.all(axis=1))
+        letter = buf[starts]
+        command = np.where(valid & (letter == ord('G')), number, np.where(valid & (letter == ord('M')), 100 + number, -1))
+        is_event = np.isin(command, _WORD_COMMANDS + [G90, G91, M82, M83])
+        commands = command[is_event]
+
+        # X/Y/Z/E/F/I/J words (after a space or tab, before any comment) on lines with those commands
+        word_index = _WORD_INDEX[buf[delimiters[:-1] + 1]]
+        words = np.flatnonzero(~newline[:-1] & ~comment[:-1] & (word_index >= 0))
+        line = line_of[words]
+        semicolons = np.cumsum(comment)
+        read = np.isin(command[line], _WORD_COMMANDS) & (semicolons[words] == semicolons[newlines][line])
+        words, line = words[read], line[read]
+        values = _parse_numbers(buf, delimiters[words] + 2, delimiters[words + 1])
+        event = (np.cumsum(is_event) - 1)[line]
+        letter_index = word_index[words]
+        table = np.full((len(WORDS), len(commands)), np.nan)
+        present = np.zeros((len(WORDS), len(commands)), dtype=bool)
+        table[letter_index, event] = values
+        present[letter_index, event] = True
+        return self._apply(commands, table, present)
+
+    def _apply(self, commands: np.ndarray, table: np.ndarray, present: np.ndarray) -> MoveTable:
+        'apply modal state to the commands of a chunk, returning its moves'
+        is_move = commands <= 3
+        absolute = _latest(np.isin(commands, (G90, G91)), commands == G90, self.absolute)
+        relative_e = _latest(np.isin(commands, (G90, G91, M82, M83)), np.isin(commands, (G91, M83)), self.relative_e)
+        homes_all = (commands == G28) & ~present[:3].any(axis=0)
+        columns, e_start = {}, self.position['E']
+        for n, axis in enumerate('XYZE'):
+            has_value = present[n] & ~np.isnan(table[n])
+            if axis == 'E':
+                is_set = has_value & ((commands == G92) | (is_move & ~relative_e))
+            else:
+                homed = (commands == G28) & (present[n] | homes_all)
+                is_set = homed | (has_value & ((commands == G92) | (is_move & absolute)))
+            values = np.where(has_value & (is_set | is_move), table[n], 0.0)
+            if axis != 'E':
+                values = np.where(commands == G28, 0.0, values)
+            positions = _accumulate(is_set, values, self.position[axis])
+            if len(positions):
+                self.position[axis] = positions[-1]
+            columns[axis] = positions
+        # extrusion of each move: relative E values directly (for precision), absolute E values from the change
+        e = columns['E']
+        has_e = present[3] & ~np.isnan(table[3]) & is_move
+        extrusion = np.where(has_e, np.where(relative_e, table[3], e - np.concatenate(([e_start], e[:-1]))), 0.0)
+        has_f = present[4] & ~np.isnan(table[4]) & is_move
+        feedrate = _latest(has_f, table[4], self.feedrate)
+        if len(commands):
+            self.absolute, self.relative_e, self.feedrate = bool(absolute[-1]), bool(relative_e[-1]), feedrate[-1]
+        return MoveTable(commands[is_move], columns['X'][is_move], columns['Y'][is_move], columns['Z'][is_move],
+                         extrusion[is_move], feedrate[is_move], table[5][is_move], table[6][is_move])
+
+
+def _chunks(path) -> Iterator[bytes]:
+    'read a gcode file (plain, gzip or binary gcode) in chunks of whole lines'
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:2] == b'\x1f\x8b':
+                data = gzip.decompress(data)
+            elif data[:4] == BGCODE_MAGIC:
+                data = read_bgcode(bytes(data))[0].encode()
+            start = 0
+            while start < len(data):
+                end = data.rfind(b'\n', start, start + CHUNK_SIZE) + 1 if start + CHUNK_SIZE < len(data) else len(data)
+                if end <= start:  # a line longer than CHUNK_SIZE
+                    end = data.find(b'\n', start + CHUNK_SIZE) + 1 or len(data)
+                yield data[start:end]
+                start = end
+
+
+def read_moves(path, relative_e: bool = True) -> MoveTable:
+    '''
+    Read the moves of a gcode file into a MoveTable.
+
+    Args:
+        path: Path of a gcode file (plain text, gzip-compressed or binary gcode).
+        relative_e (bool): Whether E values are relative at the start of the file (as for gcode generated by
+            FullControl). M82/M83 and G90/G91 commands in the file change this.
+
+    Returns:
+        MoveTable: The moves of the file.
+    '''
+    parser = _Parser(relative_e)
+    return MoveTable.concatenate([parser.parse(chunk) for chunk in _chunks(path)])
+
+
+def _arc_points(start: np.ndarray, end: np.ndarray, i: float, j: float, clockwise: bool) -> np.ndarray:
+    'points along an arc (excluding its start), divided into lines of about ARC_SEGMENT_LENGTH'
+    cx, cy = start[0] + i, start[1] + j
+    radius = np.hypot(i, j)
+    start_angle = np.arctan2(start[1] - cy, start[0] - cx)
+    sweep = np.arctan2(end[1] - cy, end[0] - cx) - start_angle
+    if clockwise:
+        sweep = sweep - 2 * np.pi if sweep >= 0 else sweep
+    else:
+        sweep = sweep + 2 * np.pi if sweep <= 0 else sweep
+    segments = max(1, ceil(abs(sweep) * radius / ARC_SEGMENT_LENGTH))
+    fraction = np.arange(1, segments) / segments
+    angles = start_angle + sweep * fraction
+    points = np.column_stack((cx + radius * np.cos(angles), cy + radius * np.sin(angles),
+                              start[2] + (end[2] - start[2]) * fraction))
+    return np.vstack((points, end))
+
+
+def _expand_arcs(moves: MoveTable):
+    'positions of the points of all moves, with arcs divided into lines, and the move that each point is part of'
+    xyz = moves.xyz
+    arcs = np.flatnonzero((moves.g >= 2) & ~np.isnan(moves.i) & ~np.isnan(moves.j))
+    arcs = arcs[arcs > 0]
+    arcs = arcs[~np.isnan(xyz[arcs - 1]).any(axis=1) & ~np.isnan(xyz[arcs]).any(axis=1)]
+    if not len(arcs):
+        return xyz, np.arange(len(moves))
+    pieces, moves_of, previous = [], [], 0
+    for arc in arcs.tolist():
+        pieces.append(xyz[previous:arc])
+        pieces.append(_arc_points(xyz[arc - 1], xyz[arc], moves.i[arc], moves.j[arc], clockwise=moves.g[arc] == 2))
+        moves_of.extend((np.arange(previous, arc), np.full(len(pieces[-1]), arc)))
+        previous = arc + 1
+    pieces.append(xyz[previous:])
+    moves_of.append(np.arange(previous, len(moves)))
+    return np.vstack(pieces), np.concatenate(moves_of)
+
+
+def _changes(values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    'the rows (of those given) at which values differ from its value at the previous of the given rows'
+    return rows[np.concatenate(([True], values[rows][1:] != values[rows][:-1]))] if len(rows) else rows
+
+
+def moves_to_steps(moves: MoveTable, point_class, extruder_class, printer_class, point_array_class=None) -> list:
+    '''
+    Convert a table of moves to a list of steps: Points, with Extruder steps where extrusion starts or stops and
+    Printer steps where the print or travel speed changes. Arcs are divided into lines of about ARC_SEGMENT_LENGTH.
+
+    Args:
+        moves (MoveTable): The moves.
+        point_class, extruder_class, printer_class: Classes used for the steps.
+        point_array_class: If given, runs of points between Extruder/Printer steps are converted to one step of this
+            class instead of individual Points (where all their positions are defined).
+
+    Returns:
+        list: The steps.
+    '''
+    xyz, move_of = _expand_arcs(moves)
+    on, f = moves.extruding[move_of], moves.f[move_of]
+    rows = np.arange(len(xyz))
+    extruder_changes = _changes(on, rows)
+    print_changes = _changes(f, rows[on & ~np.isnan(f)])
+    travel_changes = _changes(f, rows[~on & ~np.isnan(f)])
+    boundaries = np.union1d(np.union1d(extruder_changes, print_changes), travel_changes).tolist() + [len(xyz)]
+    extruder_changes, print_changes = set(extruder_changes.tolist()), set(print_changes.tolist())
+    travel_changes = set(travel_changes.tolist())
+    steps = []
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        if start in extruder_changes:
+            steps.append(extruder_class(on=bool(on[start])))
+        if start in print_changes:
+            steps.append(printer_class(print_speed=float(f[start])))
+        if start in travel_changes:
+            steps.append(printer_class(travel_speed=float(f[start])))
+        run = xyz[start:end]
+        if point_array_class is not None and len(run) > 1 and not np.isnan(run).any():
+            steps.append(point_array_class(run))
+        else:
+            steps.extend(point_class(x=None if x != x else x, y=None if y != y else y, z=None if z != z else z)
+                         for x, y, z in run.tolist())
+    return steps
+
+
+def import_gcode(path, result_type: str = 'steps', point_arrays: bool = False, relative_e: bool = True,
+                 step_classes: Optional[tuple] = None):
+    '''
+    Import a gcode file, e.g. to analyse or visualize gcode from another slicer alongside a FullControl design.
+
+    Args:
+        path: Path of a gcode file (plain text, gzip-compressed or binary gcode).
+        result_type (str): 'steps' for a list of steps or 'table' for a MoveTable of all moves.
+        point_arrays (bool): For 'steps', whether runs of moves are returned as PointArrays rather than individual
+            Points (much faster and more compact for large files).
+        relative_e (bool): Whether E values are relative at the start of the file (until an M82/M83 command).
+        step_classes (Optional[tuple]): (Point, Extruder, Printer, PointArray) classes used for steps. Defaults to the
+            classes of fullcontrol.gcode.
+
+    Returns:
+        list or MoveTable: The imported design.
+    '''
+    if result_type not in ('steps', 'table'):
+        raise ValueError(f"result_type '{result_type}' not recognized. Please use 'steps' or 'table'")
+    moves = read_moves(path, relative_e)
+    if result_type == 'table':
+        return moves
+    if step_classes is None:
+        from fullcontrol.gcode import Point, Extruder, Printer, PointArray
+        step_classes = (Point, Extruder, Printer, PointArray)
+    point_class, extruder_class, printer_class, point_array_class = step_classes
+    return moves_to_steps(moves, point_class, extruder_class, printer_class, point_array_class if point_arrays else None)
@@ -0,0 +1,232 @@
+from typing import Callable, Iterable, Iterator, Optional
+import numpy as np
+from fullcontrol.gcode.commands import ManualGcode
+from fullcontrol.gcode.dispatch import handler_for, POINT_HANDLERS
+from fullcontrol.gcode.estimate import motion_limits, move_times
+from fullcontrol.gcode.extrusion_classes import ExtrusionGeometry, Extruder
+from fullcontrol.gcode.importer import MoveTable
+from fullcontrol.gcode.point_array import PointArray
+from fullcontrol.gcode.printer import Printer
+
+# default lowest print speed (mm/min) that speeds are reduced to before a dwell is added
+MIN_LAYER_SPEED = 600
+# number of bisection steps used to find the speed factor that gives the minimum layer time
+SCALE_ITERATIONS = 40
+# tolerance (mm) for the change of z that starts a new layer
+LAYER_Z_TOLERANCE = 1e-6
+
+
+def _slice(array: PointArray, start: int, stop: int) -> PointArray:
+    'the points of a PointArray from start to stop, with their columns'
+    columns = {name: None if getattr(array, name) is None else getattr(array, name)[start:stop]
+               for name in ('width', 'height', 'speed', 'color', 'extrusion_length')}
+    return type(array)(array.xyz[start:stop], **columns)
+
+
+class _Layer:
+    '''
+    The steps of one layer and the moves they make, as arrays of the position at the end of each move, the speed of
+    each move and whether each move extrudes.
+    '''
+
+    def __init__(self, start: np.ndarray, print_speed: float):
+        self.steps = []
+        self.extruding_steps = []  # whether each step was processed with the extruder on
+        self.start = start.copy()  # position at the start of the layer
+        self.print_speed = print_speed  # print speed set by the design at the start of the layer
+        self.xyz, self.speed, self.extruding = [], [], []
+
+    def add(self, step, extruder_on: bool, xyz: Optional[np.ndarray] = None, speed=None):
+        self.steps.append(step)
+        self.extruding_steps.append(extruder_on)
+        if xyz is not None:
+            self.xyz.append(xyz)
+            self.speed.append(np.broadcast_to(np.asarray(speed, dtype=np.float64), len(xyz)))
+            self.extruding.append(np.full(len(xyz), extruder_on))
+
+    def moves(self):
+        'the position at the start of the layer and after each move, the speed of each move and whether it extrudes'
+        if not self.xyz:
+            return self.start[None, :], np.zeros(0), np.zeros(0, dtype=bool)
+        return np.vstack([self.start[None, :]] + self.xyz), np.concatenate(self.speed), np.concatenate(self.extruding)
+
+
+def _layer_time(xyz: np.ndarray, speed: np.ndarray, extruding: np.ndarray, limits: dict) -> float:
+    'time (s) of the moves of a layer, with acceleration, from the positions after each move (see move_times())'
+    length = np.linalg.norm(np.diff(xyz, axis=0), axis=1)
+    n = len(xyz)
+    g = np.concatenate(([0], extruding.astype(np.int8)))
+    e = np.concatenate(([0.0], np.where(extruding & (length > 0), 1.0, 0.0)))
+    f = np.concatenate(([np.nan], speed))
+    nan = np.full(n, np.nan)
+    moves = MoveTable(g, xyz[:, 0], xyz[:, 1], xyz[:, 2], e, f, nan, nan)
+    return float(move_times(moves, limits)[1:].sum())
+
+
+def _scaled(speed, factor: float, min_speed: float):
+    'speeds multiplied by factor, but not reduced below min_speed (speeds already below min_speed are kept)'
+    return np.maximum(np.asarray(speed) * factor, np.minimum(speed, min_speed))
+
+
+def speed_factor(xyz: np.ndarray, speed: np.ndarray, extruding: np.ndarray, min_time: float, limits: dict,
+                 min_speed: float = MIN_LAYER_SPEED) -> tuple:
+    '''
+    Factor for the speed of extrusion moves so that a layer takes at least min_time, and the dwell needed if speeds
+    would have to be reduced below min_speed. The layer time is calculated with move_times() and the factor is found by
+    bisection, since the time of moves with acceleration does not scale in proportion to speed.
+
+    Args:
+        xyz (np.ndarray): (N + 1) x 3 array of the position at the start of the layer and after each move.
+        speed (np.ndarray): Speed of each move (mm/min).
+        extruding (np.ndarray): Whether each move extrudes.
+        min_time (float): Minimum layer time (s).
+        limits (dict): Motion limits for move_times() (see motion_limits()).
+        min_speed (float): Speeds of extrusion moves are not reduced below this speed (mm/min).
+
+    Returns:
+        tuple: (factor, dwell (s), layer time (s) before any change).
+    '''
+    def time(factor):
+        return _layer_time(xyz, np.where(extruding, _scaled(speed, factor, min_speed), speed), extruding, limits)
+
+    layer_time = time(1.0)
+    if layer_time >= min_time or not extruding.any():
+        return 1.0, 0.0, layer_time
+    slowest = time(0.0) if min_speed > 0 else np.inf
+    if slowest <= min_time:
+        return 0.0, min_time - slowest, layer_time
+    low, high = 0.0, 1.0  # time(low) > min_time > time(high)
+    for _ in range(SCALE_ITERATIONS):
+        middle = (low + high) / 2
+        low, high = (middle, high) if time(middle) > min_time else (low, middle)
+    return low, 0.0, layer_time
+
+
+def enforce_min_layer_time(steps: Iterable, min_time: float, min_speed: float = MIN_LAYER_SPEED,
+                           limits: Optional[dict] = None, print_speed: float = 1000, travel_speed: float = 2000,
+                           layer_height: float = 0.2, layer_marker: Optional[Callable] = None,
+                           stats: Optional[dict] = None, report: bool = False) -> Iterator:
+    '''
+    Slow down layers that would print faster than min_time, so that the previous layer has time to cool.
+
+    Steps are grouped into layers by the z of extrusion moves: a layer starts with the first extrusion move at least
+    layer_height (tracked through ExtrusionGeometry steps) away from the z at the start of the current layer, so
+    helical designs (e.g. from helixZ) are divided into layers of one layer height too. Alternatively, layers start at
+    each step for which layer_marker(step) is True. Travel moves count towards the layer before them.
+
+    The time of each layer is calculated with the vectorized motion planner of estimate_print(). If it is less than
+    min_time, the speed of all extrusion moves of the layer is reduced by the same factor (found by bisection), but not
+    below min_speed: Printer steps that set print_speed and speed columns of PointArrays are adjusted, and a Printer
+    step is added at the start of the layer (and of the next layer that is not slowed down). If the layer is still too
+    fast at min_speed, a dwell (G4) is added at the end of the layer for the remaining time. Layers are processed one
+    at a time, so steps can be a generator.
+
+    Args:
+        steps (Iterable): The steps of the design.
+        min_time (float): The minimum time for each layer (s).
+        min_speed (float): Print speeds are not reduced below this speed (mm/min).
+        limits (Optional[dict]): Motion limits for the time of each layer (see motion_limits()). Defaults to the
+            limits of the generic printer.
+        print_speed (float): The print speed at the start of the design (mm/min).
+        travel_speed (float): The travel speed at the start of the design (mm/min).
+        layer_height (float): The layer height at the start of the design (mm).
+        layer_marker (Optional[Callable]): If set, a function of a step that returns True for steps that start a
+            new layer, used instead of z.
+        stats (Optional[dict]): If given, 'layers', 'slowed' and 'dwell' are set to the number of layers, the number
+            of layers that were slowed down and the total dwell time added (s).
+        report (bool): Whether to print the number of layers slowed down once all steps have been processed.
+
+    Yields:
+        The steps, with Printer steps and dwells added or adjusted.
+    '''
+    limits = limits or motion_limits()
+    stats = {} if stats is None else stats
+    stats['layers'] = stats['slowed'] = 0
+    stats['dwell'] = 0.0
+    position = np.full(3, np.nan)
+    extruder_on = False
+    layer_z = None  # z of the first extrusion move of the current layer
+    layer = _Layer(position, print_speed)
+
+    restore = False  # whether the print speed set by the design needs to be restored after a slowed layer
+
+    def finished(layer: _Layer) -> list:
+        'the steps of a finished layer, adjusted to take at least min_time'
+        nonlocal restore
+        if not layer.steps:
+            return []
+        stats['layers'] += 1
+        factor, dwell, _ = speed_factor(*layer.moves(), min_time, limits, min_speed)
+        if factor == 1.0 and dwell == 0.0:
+            result = ([Printer(print_speed=layer.print_speed)] if restore else []) + layer.steps
+            restore = False
+            return result
+        stats['slowed'] += 1
+        stats['dwell'] += dwell
+        restore = True
+        result = [Printer(print_speed=float(_scaled(layer.print_speed, factor, min_speed)))]
+        for step, on in zip(layer.steps, layer.extruding_steps):
+            if isinstance(step, Printer) and step.print_speed is not None:
+                step = step.model_copy(update={'print_speed': float(_scaled(step.print_speed, factor, min_speed))})
+            elif isinstance(step, PointArray) and step.speed is not None and on:
+                step = type(step)(step.xyz, width=step.width, height=step.height, color=step.color,
+                                  speed=_scaled(step.speed, factor, min_speed), extrusion_length=step.extrusion_length)
+            result.append(step)
+        if dwell > 0:
+            result.append(ManualGcode(text=f'G4 P{int(np.ceil(dwell * 1000))} ; wait for minimum layer time'))
+        return result
+
+    def new_layer(z: Optional[float]) -> bool:
+        'whether an extrusion move to z starts a new layer'
+        return layer_z is not None and not np.isnan(z) and abs(z - layer_z) >= layer_height - LAYER_Z_TOLERANCE
+
+    for step in steps:
+        if layer_marker is not None and layer_marker(step):
+            yield from finished(layer)
+            layer = _Layer(position, print_speed)
+        if isinstance(step, Printer):
+            print_speed = step.print_speed if step.print_speed is not None else print_speed
+            travel_speed = step.travel_speed if step.travel_speed is not None else travel_speed
+        elif isinstance(step, ExtrusionGeometry):
+            layer_height = step.height if step.height is not None else layer_height
+        elif isinstance(step, Extruder) and step.on is not None:
+            extruder_on = step.on
+        elif isinstance(step, PointArray) and len(step):
+            speed = step.speed if step.speed is not None else (print_speed if extruder_on else travel_speed)
+            speed = np.broadcast_to(np.asarray(speed, dtype=np.float64), len(step))
+            start = 0
+            while extruder_on and layer_marker is None:
+                # split the array where each new layer starts
+                if layer_z is None:
+                    layer_z = step.xyz[start, 2]
+                later = np.flatnonzero(np.abs(step.xyz[start:, 2] - layer_z) >= layer_height - LAYER_Z_TOLERANCE)
+                if not len(later):
+                    break
+                split = start + int(later[0])
+                if split > start:
+                    layer.add(_slice(step, start, split), True, step.xyz[start:split], speed[start:split])
+                yield from finished(layer)
+                layer = _Layer(step.xyz[split - 1] if split else position, print_speed)
+                layer_z, start = step.xyz[split, 2], split
+            piece = step if start == 0 else _slice(step, start, len(step))
+            layer.add(piece, extruder_on, step.xyz[start:], speed[start:])
+            position = step.xyz[-1].copy()
+            continue
+        elif handler_for(type(step)) in POINT_HANDLERS:
+            xyz = np.array([position[i] if value is None else value
+                            for i, value in enumerate((step.x, step.y, step.z))])
+            if extruder_on and layer_marker is None:
+                if new_layer(xyz[2]):
+                    yield from finished(layer)
+                    layer = _Layer(position, print_speed)
+                    layer_z = xyz[2]
+                elif layer_z is None:
+                    layer_z = xyz[2]
+            layer.add(step, extruder_on, xyz[None, :], print_speed if extruder_on else travel_speed)
+            position = xyz
+            continue
+        layer.add(step, extruder_on)
+    yield from finished(layer)
+    if report:
+        print(f"min_layer_time={min_time}: slowed down {stats['slowed']} of {stats['layers']} layers, "
+              f"adding {stats['dwell']:.1f} s of dwell")
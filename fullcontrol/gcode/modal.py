@@ -0,0 +1,85 @@
+from typing import Iterable, Iterator, Optional
+
+AXES = ('X', 'Y', 'Z')
+
+
+def _format(letter: str, value: float, decimals: int) -> str:
+    'format a value with up to the given number of decimal places, without trailing zeros'
+    s = f'{value:.{decimals}f}'.rstrip('0').rstrip('.') if decimals > 0 else f'{value:.0f}'
+    return letter + ('0' if s == '-0' else s)
+
+
+def compress_modal(lines: Iterable[str], drop_modal_words: bool = True, drop_motion_commands: bool = False,
+                   precision: Optional[dict] = None) -> Iterator[str]:
+    '''
+    Remove words from lines of gcode that repeat the current modal state of the printer, and optionally round values
+    to a given number of decimal places.
+
+    For G0/G1 moves, the F word is dropped if the feedrate has not changed and X/Y/Z words are dropped if the
+    position on that axis has not changed. Moves that have nothing left to do are removed. Arcs (G2/G3) keep all
+    their axis words. The position is forgotten after commands that change it in other ways (G28, G92) and nothing is
+    dropped while relative positioning (G91) is active. Comments are kept.
+
+    Args:
+        lines (Iterable[str]): Lines of gcode.
+        drop_modal_words (bool): Whether to drop repeated F and X/Y/Z words.
+        drop_motion_commands (bool): Whether to also drop the G0/G1 word when it is the same as for the previous
+            move. This needs firmware that supports modal motion commands (e.g. Marlin with GCODE_MOTION_MODES).
+        precision (Optional[dict]): Number of decimal places for each letter, e.g. {'X': 2, 'Y': 2, 'E': 4}.
+            Letters that are not included are not changed.
+
+    Yields:
+        str: Lines of gcode.
+    '''
+    precision = precision or {}
+    position = {}  # formatted value of each axis at the current position, where known
+    feedrate = None
+    motion = None  # the last motion command (G0, G1, G2 or G3)
+    absolute = True
+    for line in lines:
+        code, semicolon, comment = line.partition(';')
+        words = code.split()
+        command = words[0] if words else None
+        if command not in ('G0', 'G1', 'G2', 'G3'):
+            if command == 'G28':
+                position.clear()
+            elif command == 'G92':
+                for word in words[1:]:
+                    position.pop(word[0], None)
+            elif command == 'G91':
+                absolute = False
+                position.clear()
+            elif command == 'G90':
+                absolute = True
+            yield line
+            continue
+        try:
+            values = [(word[0], float(word[1:])) for word in words[1:]]
+        except ValueError:
+            position.clear()
+            yield line
+            continue
+        output = []
+        for word, (letter, value) in zip(words[1:], values):
+            if letter in precision:
+                word = _format(letter, value, precision[letter])
+            if drop_modal_words:
+                if letter == 'F':
+                    if word == feedrate and absolute:
+                        continue
+                    feedrate = word
+                elif letter in AXES and absolute:
+                    if command in ('G0', 'G1') and position.get(letter) == word:
+                        continue
+                    position[letter] = word
+            output.append(word)
+        if drop_modal_words and command in ('G0', 'G1') and not output and not semicolon:
+            continue  # nothing left to do for this move
+        if drop_motion_commands and absolute and command == motion and command in ('G0', 'G1') \
+                and any(word[0] in AXES or word[0] == 'E' for word in output):
+            words = output
+        else:
+            words = [command] + output
+        motion = command
+        code = line[:len(line) - len(line.lstrip())] + ' '.join(words)  # keep indentation (e.g. of loop bodies)
+        yield code + ' ' + semicolon + comment if semicolon else code
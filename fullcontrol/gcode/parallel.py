@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from fullcontrol.gcode.dispatch import advance_step, process_steps
+from fullcontrol.gcode.extrusion_classes import Extruder
+from fullcontrol.gcode.point import Point
+from fullcontrol.gcode.state import State
+
+# number of chunks per worker process, so that uneven chunks are balanced across the workers
+CHUNKS_PER_WORKER = 4
+
+
+def _is_boundary(step, z_now) -> bool:
+    'safe places to split a design: where the extruder is turned off for a travel, or at a layer change'
+    if isinstance(step, Extruder):
+        return step.on == False
+    return isinstance(step, Point) and step.z is not None and step.z != z_now
+
+
+def split_steps(steps: list, state: State, chunks: int) -> list:
+    '''
+    Split a list of steps into roughly equal chunks at safe boundaries (Extruder(on=False) or a change of z).
+
+    State is tracked through the whole design without generating gcode, and a snapshot of the state at the start of
+    each chunk is taken so that each chunk can be converted to gcode independently. After this function, state is at
+    the end of the design.
+
+    Args:
+        steps (list): The steps of the design.
+        state (State): The state at the start of the design. It is updated to the end of the design.
+        chunks (int): The target number of chunks.
+
+    Returns:
+        list: A list of (start index, end index, snapshot of state at the start index) for each chunk.
+    '''
+    target_size = max(1, len(steps) // max(1, chunks))
+    starts = [(0, state.snapshot())]
+    next_split = target_size
+    z_now = state.point.z if state.point is not None else None
+    for i, step in enumerate(steps):
+        if i >= next_split and _is_boundary(step, z_now):
+            starts.append((i, state.snapshot()))
+            next_split = i + target_size
+        advance_step(step, state)
+        if state.point is not None:
+            z_now = state.point.z
+    ends = [start for start, _ in starts[1:]] + [len(steps)]
+    return [(start, end, snapshot) for (start, snapshot), end in zip(starts, ends)]
+
+
+def render_chunk(snapshot: dict, steps: list) -> str:
+    'generate the gcode for a chunk of steps starting from a snapshot of state'
+    state = State.from_snapshot(snapshot)
+    process_steps(steps, state)
+    return '\n'.join(state.gcode)
+
+
+_worker_steps = None  # the design, set once in each worker process by _init_worker
+
+
+def _init_worker(steps: list):
+    # with the 'fork' start method, steps are inherited by the worker rather than pickled
+    global _worker_steps
+    _worker_steps = steps
+
+
+def _render_worker_chunk(snapshot: dict, start: int, end: int) -> str:
+    return render_chunk(snapshot, _worker_steps[start:end])
+
+
+def gcode_parallel(steps: list, controls, state: State, workers: int) -> Iterator[str]:
+    '''
+    Generate gcode for a list of steps with chunks of the design processed in parallel worker processes.
+
+    The design is split at safe boundaries and the state at the start of each chunk is handed to the worker that
+    renders it. Chunks of text are yielded in order, with the same contract as gcode_stream(): joining them gives
+    exactly the same gcode as serial generation.
+
+    Args:
+        steps (list): The steps of the design.
+        controls (GcodeControls): Controls for the gcode generation.
+        state (State): The initial state, including any start gcode in state.gcode.
+        workers (int): The number of worker processes.
+
+    Yields:
+        str: Chunks of gcode text.
+    '''
+    start_lines = state.gcode
+    state.gcode = []
+    chunks = split_steps(steps, state, workers * CHUNKS_PER_WORKER)
+    separator = ''  # no newline before the first line of gcode
+    if start_lines:
+        yield '\n'.join(start_lines)
+        separator = '\n'
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(steps,)) as executor:
+        texts = executor.map(_render_worker_chunk, *zip(*[(snapshot, start, end) for start, end, snapshot in chunks]))
+        for text in texts:
+            if text:
+                yield separator + text
+                separator = '\n'
+    state.finalize()
+    if state.gcode:
+        yield separator + '\n'.join(state.gcode)
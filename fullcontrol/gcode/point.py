@@ -7,11 +7,6 @@ class Point(BasePoint):
     gcode_line: Optional[str] = None
     e: Optional[float] = None
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        self.gcode_line = data.get('gcode_line', None)
-        self.e = data.get('e', None)
-
     def XYZ_gcode(self, p) -> str:
         '''Generate XYZ gcode string to move from a point p to this point.'''
         s = ''
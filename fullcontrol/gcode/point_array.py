@@ -0,0 +1,142 @@
+from math import pi
+import numpy as np
+from fullcontrol.common import PointArray as BasePointArray
+from fullcontrol.gcode.point import Point
+
+
+def _axis_strings(letter: str, values: np.ndarray, changed: np.ndarray) -> list:
+    '''
+    Format the values of one axis in the same way as Point.XYZ_gcode() for all points at once.
+    Returns a list with an empty string for points where the axis value has not changed.
+    '''
+    if changed.all():
+        return [f'{letter}{v:.3f}'.rstrip('0').rstrip('.') + ' ' for v in values.tolist()]
+    strings = [''] * len(values)
+    indices = np.flatnonzero(changed)
+    for i, v in zip(indices.tolist(), values[indices].tolist()):
+        strings[i] = f'{letter}{v:.3f}'.rstrip('0').rstrip('.') + ' '
+    return strings
+
+
+def _previous_xyz(state) -> np.ndarray:
+    'xyz of the current point in state as an array, with undefined values as nan'
+    point = state.point if state.point else Point()
+    return np.array([point.x, point.y, point.z], dtype=np.float64)
+
+
+def moves_gcode(xyz: np.ndarray, state, area=None, speed=None, extrusion_length=None) -> list:
+    '''
+    Generate the gcode lines to move through all points in xyz (N x 3 array), starting from state.point.
+
+    The lines are identical to those generated by Point.gcode() for an equivalent list of Points, but
+    the move lengths, extrusion values and changed-axis checks are calculated for all points at once.
+
+    Args:
+        xyz (np.ndarray): N x 3 array of x, y, z positions.
+        state (State): The current state of the gcode generation process.
+        area (Optional[np.ndarray]): Per-point extrusion area, overriding the area in state.extrusion_geometry.
+        speed (Optional[np.ndarray]): Per-point speed, overriding the speed in state.printer.
+        extrusion_length (Optional[np.ndarray]): Per-point length used to calculate extrusion instead of the length
+            of each move (where not NaN).
+
+    Returns:
+        list: The generated lines of gcode.
+    '''
+    n = len(xyz)
+    if n == 0:
+        return []
+    prev = np.empty_like(xyz)
+    prev[0] = _previous_xyz(state)
+    prev[1:] = xyz[:-1]
+    changed = xyz != prev  # nan in prev (undefined) always counts as changed
+
+    is_extrusion_move = bool(state.extruder and state.extruder.on)
+    e_strings = None
+    if is_extrusion_move and state.extrusion_geometry:
+        delta = np.nan_to_num(xyz - prev, nan=0.0)  # components undefined in state.point are ignored
+        dx, dy, dz = delta[:, 0], delta[:, 1], delta[:, 2]
+        move_length = np.sqrt(dx*dx + dy*dy + dz*dz)
+        if extrusion_length is not None:
+            move_length = np.where(np.isnan(extrusion_length), move_length, extrusion_length)
+        if area is None:
+            area = state.extrusion_geometry.get_extrusion_per_mm()
+        e_strings = [f'E{e:.4f}' for e in (move_length * area).tolist()]
+
+    g_command = 'G1' if is_extrusion_move else 'G0'
+    if speed is None:
+        speed_now = state.printer.print_speed if is_extrusion_move else state.printer.travel_speed
+        if state.printer.last_used_speed is not None:
+            speed_now = state.printer.last_used_speed
+        f_strings = [f'F{int(speed_now)}'] * n if speed_now is not None else None
+    else:
+        f_strings = [f'F{int(s)}' for s in speed.tolist()]
+
+    x_strings = _axis_strings('X', xyz[:, 0], changed[:, 0])
+    y_strings = _axis_strings('Y', xyz[:, 1], changed[:, 1])
+    z_strings = _axis_strings('Z', xyz[:, 2], changed[:, 2])
+
+    # each axis string ends with a space so the strings can be concatenated directly
+    xyz_strings = zip(x_strings, y_strings, z_strings)
+    if e_strings is not None and f_strings is not None:
+        return [f'{g_command} {x}{y}{z}{e} {f}' for (x, y, z), e, f in zip(xyz_strings, e_strings, f_strings)]
+    if f_strings is not None:
+        return [f'{g_command} {x}{y}{z}{f}' for (x, y, z), f in zip(xyz_strings, f_strings)]
+    if e_strings is not None:
+        return [f'{g_command} {x}{y}{z}{e}' for (x, y, z), e in zip(xyz_strings, e_strings)]
+    return [f'{g_command} {x}{y}{z}'.rstrip() for x, y, z in xyz_strings if x or y or z]
+
+
+class PointArray(BasePointArray):
+    'Extend generic class with gcode method to convert the whole run of points to gcode at once'
+    point_class = Point
+
+    def area(self, extrusion_geometry):
+        '''
+        Per-point extrusion area based on the width and height columns, using the area_model of the
+        extrusion geometry in state ('stadium' or otherwise rectangular). Returns None if neither column is set.
+        '''
+        if self.width is None and self.height is None:
+            return None
+        width = self.width if self.width is not None else np.full(len(self), extrusion_geometry.width or 0.4)
+        height = self.height if self.height is not None else np.full(len(self), extrusion_geometry.height or 0.2)
+        if extrusion_geometry.area_model == 'stadium':
+            return ((width - height) * height) + (pi * (height / 2) ** 2)
+        return width * height
+
+    def gcode(self, state):
+        '''
+        Process this instance in a list of steps supplied by the designer to generate and return lines of gcode.
+
+        Args:
+            state (State): The current state of the gcode generation process.
+
+        Returns:
+            list: The generated lines of gcode, one per point.
+        '''
+        if len(self) == 0:
+            return None
+        area = self.area(state.extrusion_geometry)
+        lines = moves_gcode(self.xyz, state, area=area, speed=self.speed, extrusion_length=self.extrusion_length)
+        self.update_state(state, area)
+        return lines
+
+    def update_state(self, state, area=None):
+        '''
+        Update state as it would be after processing the equivalent list of Points, without generating gcode.
+
+        Args:
+            state (State): The current state of the gcode generation process.
+            area (Optional[np.ndarray]): The per-point area, if already calculated with self.area().
+        '''
+        if len(self) == 0:
+            return
+        if area is None:
+            area = self.area(state.extrusion_geometry)
+        if area is not None:
+            if self.width is not None:
+                state.extrusion_geometry.width = float(self.width[-1])
+            if self.height is not None:
+                state.extrusion_geometry.height = float(self.height[-1])
+            state.extrusion_geometry.area = float(area[-1])
+        x, y, z = self.xyz[-1].tolist()
+        state.point = Point(x=x, y=y, z=z)
@@ -0,0 +1,109 @@
+'''
+Printers in the libraries of printer profiles ('Cura/...' and 'Community/...' printer names for import_printer()).
+
+The settings of all Cura printers are compiled into one database (fullcontrol/devices/cura/devices.jsonl, built by
+bin/build_cura_devices.py from the modules in fullcontrol/devices/cura/settings). Its first line is an index of the
+byte offset, length and manufacturer of each printer, so printers are listed and searched from the index alone, and
+the settings of a printer are read by seeking to its line, without importing any modules.
+'''
+import difflib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+CURA_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'devices', 'cura')
+CURA_DATABASE = os.path.join(CURA_DIRECTORY, 'devices.jsonl')
+COMMUNITY_LIBRARY = os.path.join(os.path.dirname(CURA_DIRECTORY), 'community_minimal', 'library.json')
+# prefixes of printer names for each library (see import_printer())
+LIBRARY_PREFIXES = ('Cura/', 'Community/')
+# lowest similarity (0-1) of a printer to a query for fuzzy matches
+FUZZY_CUTOFF = 0.6
+
+
+@lru_cache(maxsize=None)
+def _cura_index() -> dict:
+    'the index of the Cura database: {name: [offset, length, manufacturer, module]}, with offsets from its end'
+    with open(CURA_DATABASE, 'rb') as file:
+        index = json.loads(file.readline())
+        start = file.tell()
+    return {name: (start + offset, length, manufacturer, module)
+            for name, (offset, length, manufacturer, module) in index.items()}
+
+
+@lru_cache(maxsize=None)
+def _community_library() -> dict:
+    with open(COMMUNITY_LIBRARY) as file:
+        return json.load(file)
+
+
+def cura_settings(name: str) -> dict:
+    '''
+    The default initial settings of a Cura printer (the name without 'Cura/'), read from the database.
+
+    Returns:
+        dict: A new dict of settings (speeds in mm/s, as in Cura).
+    '''
+    entry = _cura_index().get(name)
+    if entry is None:
+        raise ValueError(f"Printer '{name}' not found in the library 'cura'")
+    offset, length = entry[:2]
+    with open(CURA_DATABASE, 'rb') as file:
+        file.seek(offset)
+        return json.loads(file.read(length))
+
+
+def printer_names() -> List[str]:
+    'the names of all printers in the libraries, as used for import_printer(), e.g. \'Cura/Creality Ender-3 Pro\''
+    return [f'Cura/{name}' for name in _cura_index()] + [f'Community/{name}' for name in _community_library()]
+
+
+@lru_cache(maxsize=None)
+def _search_index() -> tuple:
+    'the name of each printer, the words of its manufacturer and model, and its model as words joined by spaces'
+    entries = [(f'Cura/{name}', manufacturer, name) for name, (_, _, manufacturer, _) in _cura_index().items()]
+    entries += [(f'Community/{name}', '', name) for name in _community_library()]
+    return tuple((printer, _words(f'{manufacturer} {model}'), ' '.join(_words(model))) for printer, manufacturer, model in entries)
+
+
+def _words(text: str) -> list:
+    'lower case words of text, split at anything other than letters and digits'
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).split()
+
+
+def search_printers(query: str, limit: int = 10) -> List[str]:
+    '''
+    Printers with a word of their manufacturer or model starting with each word in query (case-insensitive, ignoring
+    punctuation), or, if there are none, printers with words similar to every word in query.
+
+    Matches are ordered by how early the query appears in the model name and then by the length of the name, so the
+    closest models come first. Similar words are found with difflib (e.g. 'endr' for 'ender').
+
+    Args:
+        query (str): Words of the manufacturer and/or model, e.g. 'ender 3' or 'prusa mk3'.
+        limit (int): The most printers returned.
+
+    Returns:
+        List[str]: Names of matching printers for import_printer(), e.g. ['Cura/Creality Ender-3 Pro', ...].
+    '''
+    words = _words(query)
+    phrase = ' '.join(words)
+    matches = [(model.find(phrase) if model.find(phrase) >= 0 else len(model), len(model), printer)
+               for printer, tokens, model in _search_index()
+               if all(any(token.startswith(word) for token in tokens) for word in words)]
+    if not matches:
+        matchers = [difflib.SequenceMatcher(None, b=word) for word in words]  # information about b is cached
+
+        def similarity(matcher, tokens):
+            best = 0.0
+            for token in tokens:
+                matcher.set_seq1(token)
+                if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+                    best = max(best, matcher.ratio())
+            return best
+        for printer, tokens, model in _search_index():
+            score = min((similarity(matcher, tokens) for matcher in matchers), default=0)
+            if score >= FUZZY_CUTOFF:
+                matches.append((-score, len(model), printer))
+    return [printer for *_, printer in sorted(matches)[:limit]]
@@ -0,0 +1,89 @@
+'''
+Cache of printer profiles, so that batch runs of many small designs set up each printer only once.
+
+A profile is the initialization data returned by a printer's set_up() in fullcontrol/devices/community/singletool
+(or by import_printer() for 'Cura/...' and 'Community/...' printers): settings, starting/ending procedure steps and,
+for library printers, start/end gcode text with template variables already replaced. Profiles are cached by printer
+name and the user overrides, with the overrides converted to a hashable (frozen) form.
+'''
+from collections import OrderedDict
+from copy import deepcopy
+from importlib import import_module
+from typing import Optional
+
+# number of profiles kept in the cache (the least recently used profile is dropped first)
+PROFILE_CACHE_SIZE = 256
+# keys of a profile with lists that are copied for each caller (the steps in them are shared)
+PROCEDURE_KEYS = ('starting_procedure_steps', 'ending_procedure_steps')
+
+_profiles = OrderedDict()
+
+
+def freeze(value):
+    '''
+    A hashable version of value, with dicts, lists, tuples and sets converted to (sorted) tuples. Raises TypeError for
+    values that can't be converted.
+    '''
+    if isinstance(value, dict):
+        return (dict, tuple(sorted(((key, freeze(item)) for key, item in value.items()), key=repr)))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(freeze(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return (frozenset, frozenset(freeze(item) for item in value))
+    hash(value)
+    return value
+
+
+def _set_up(printer_name: str, user_overrides: dict) -> dict:
+    'set up a printer profile without the cache'
+    if printer_name[:5] == 'Cura/' or printer_name[:10] == 'Community/':
+        from fullcontrol.gcode.import_printer import import_printer
+        return import_printer(printer_name, user_overrides)
+    return import_module(f'fullcontrol.devices.community.singletool.{printer_name}').set_up(user_overrides)
+
+
+def _copy(profile: dict) -> dict:
+    'a copy of a profile that callers can change without affecting the cache'
+    result = dict(profile)
+    for key in PROCEDURE_KEYS:
+        if key in result:
+            result[key] = list(result[key])
+    return result
+
+
+def printer_profile(printer_name: str = 'generic', user_overrides: Optional[dict] = None) -> dict:
+    '''
+    The initialization data of a printer with user overrides, as returned by the printer's set_up() (or by
+    import_printer() for 'Cura/...' and 'Community/...' printers), from the cache if the same printer and overrides
+    have been set up before.
+
+    The returned dict and its lists of procedure steps are copies, but the steps in them are shared between calls and
+    should not be changed. Overrides that can't be made hashable (see freeze()) are set up without the cache.
+
+    Args:
+        printer_name (str): The name of the printer.
+        user_overrides (Optional[dict]): Values that override the printer's initialization data.
+
+    Returns:
+        dict: The initialization data.
+    '''
+    user_overrides = user_overrides or {}
+    try:
+        key = (printer_name, freeze(user_overrides))
+    except TypeError:
+        return _set_up(printer_name, user_overrides)
+    profile = _profiles.get(key)
+    if profile is None:
+        # set_up() is given its own copy of the overrides, so later changes by the caller can't reach the cache
+        profile = _set_up(printer_name, deepcopy(user_overrides))
+        _profiles[key] = profile
+        if len(_profiles) > PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    else:
+        _profiles.move_to_end(key)
+    return _copy(profile)
+
+
+def clear_profile_cache():
+    'remove all profiles from the cache (e.g. after editing a printer profile)'
+    _profiles.clear()
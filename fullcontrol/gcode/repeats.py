@@ -0,0 +1,280 @@
+'''
+Gcode for repeated copies of geometry (e.g. from move(..., copy=True)) generated once and reused.
+
+find_repeats() finds runs of steps that repeat with a constant offset between copies and replaces them with a
+RepeatBlock. When gcode is generated for a RepeatBlock, the first two copies are converted as normal and the gcode of
+the second copy is converted to relative coordinates (G91). That text is the same for every later copy, so it is
+reused for them: repeated in the gcode ('relative') or written once inside a RepRapFirmware 3 while loop ('loop').
+'''
+from typing import Optional
+import numpy as np
+from fullcontrol.gcode.dispatch import process_steps, register_gcode_handler
+from fullcontrol.gcode.point import Point
+from fullcontrol.gcode.point_array import PointArray
+
+REPEAT_MODES = ('relative', 'loop')
+# fewest steps in copies after the second of a repeat for it to be used
+MIN_REPEAT_STEPS = 50
+# number of the most common distances between equal steps that are checked as the length of a copy
+MAX_CANDIDATE_PERIODS = 8
+# offsets between copies must be multiples of this (the precision of coordinates in gcode), so copies don't drift
+OFFSET_RESOLUTION = 0.001
+# moves are compared after rounding to this (mm), so copies made with floating point offsets are found
+KEY_RESOLUTION = 1e-6
+# commands in a copy that mean its gcode can't be reused in relative coordinates
+ABSOLUTE_COMMANDS = ('G2', 'G3', 'G28', 'G53', 'G90', 'G91', 'G92', 'M82')
+
+
+class RepeatBlock:
+    '''
+    Steps that are repeated count times, each copy offset by vector from the previous one.
+
+    Attributes:
+        steps (list): The steps of the first copy.
+        count (int): The number of copies, including the first one.
+        vector (np.ndarray): The offset (x, y, z) between consecutive copies.
+        mode (str): How copies after the second are written: 'relative' (the relative-coordinate gcode of a copy is
+            repeated) or 'loop' (it is written once in a RepRapFirmware 3 'while' loop).
+    '''
+
+    def __init__(self, steps: list, count: int, vector, mode: str = 'relative'):
+        if mode not in REPEAT_MODES:
+            raise ValueError(f"repeat mode '{mode}' not recognized - use one of {list(REPEAT_MODES)}")
+        self.steps = steps
+        self.count = count
+        self.vector = np.asarray(vector, dtype=np.float64)
+        self.mode = mode
+
+    def copy(self, i: int) -> list:
+        'the steps of copy i (0 for the first copy)'
+        return [_shifted(step, self.vector * i) for step in self.steps]
+
+
+def _shifted(step, offset: np.ndarray):
+    'a copy of a Point or PointArray moved by offset (other steps are returned unchanged)'
+    if isinstance(step, PointArray):
+        return type(step)(step.xyz + offset, width=step.width, height=step.height, speed=step.speed,
+                          color=step.color, extrusion_length=step.extrusion_length)
+    if isinstance(step, Point):
+        return step.model_copy(update={axis: value + float(offset[i])
+                                       for i, (axis, value) in enumerate((('x', step.x), ('y', step.y), ('z', step.z)))
+                                       if value is not None})
+    return step
+
+
+def _format(letter: str, value: float) -> str:
+    'format a value in the same way as Point.XYZ_gcode()'
+    text = f'{value:.3f}'.rstrip('0').rstrip('.')
+    return letter + ('0' if text == '-0' else text)
+
+
+def relative_lines(lines: list, start) -> Optional[list]:
+    '''
+    Convert lines of gcode that start from the xyz position start to relative coordinates (G91). Returns None if the
+    lines contain commands that can't be written in relative coordinates (e.g. arcs or G92).
+    '''
+    position = list(start)
+    result = []
+    for line in lines:
+        code, semicolon, comment = line.partition(';')
+        words = code.split()
+        if not words or words[0] not in ('G0', 'G1'):
+            if words and words[0] in ABSOLUTE_COMMANDS:
+                return None
+            result.append(line)
+            continue
+        output = [words[0]]
+        for word in words[1:]:
+            axis = 'XYZ'.find(word[0])
+            if axis >= 0:
+                value = float(word[1:])
+                word = _format(word[0], round(value - position[axis], 3))
+                position[axis] = value
+            output.append(word)
+        code = ' '.join(output)
+        result.append(code + ' ' + semicolon + comment if semicolon else code)
+    return result
+
+
+def _repeat_handler(block: RepeatBlock, state):
+    'generate gcode for a RepeatBlock, reusing the relative-coordinate gcode of the second copy for later copies'
+    process_steps(block.steps, state)
+    if block.count < 2:
+        return None
+    start = (state.point.x, state.point.y, state.point.z)
+    first_line, volume = len(state.gcode), state.extruder.total_volume
+    process_steps(block.copy(1), state)
+    if block.count == 2:
+        return None
+    lines = relative_lines(state.gcode[first_line:], start) if None not in start else None
+    if lines is None or not state.extruder.relative_gcode:
+        for i in range(2, block.count):
+            process_steps(block.copy(i), state)
+        return None
+    copies = block.count - 2
+    if block.mode == 'loop':
+        state.gcode.extend([f'G91 ; repeat the last copy {copies} times', f'while iterations < {copies}'])
+        state.gcode.extend('  ' + line for line in lines)
+    else:
+        state.gcode.append(f'G91 ; repeat the last copy {copies} times')
+        for _ in range(copies):
+            state.gcode.extend(lines)
+    state.gcode.extend(['G90', 'M83 ; relative extrusion'])  # G90 also sets E to absolute in most firmware
+    end = state.point
+    offset = block.vector * copies
+    state.point = Point(**{axis: None if value is None else value + float(offset[i])
+                           for i, (axis, value) in enumerate((('x', end.x), ('y', end.y), ('z', end.z)))})
+    volume = (state.extruder.total_volume - volume) * copies
+    state.extruder.total_volume += volume
+    state.extruder.total_volume_ref += volume
+    return None
+
+
+register_gcode_handler(RepeatBlock, _repeat_handler)
+
+
+def _combined_keys(columns: list) -> np.ndarray:
+    'an integer key for each row of the given columns, equal for rows with equal values in every column'
+    keys = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        values, inverse = np.unique(column, return_inverse=True)
+        _, keys = np.unique(keys * len(values) + inverse.ravel(), return_inverse=True)
+        keys = keys.ravel()
+    return keys
+
+
+def _step_keys(steps: list) -> tuple:
+    '''
+    An integer key for each step, equal for steps that generate the same gcode relative to the position before them,
+    and the position after each step (NaN where not known).
+    '''
+    n = len(steps)
+    keys = np.zeros(n, dtype=np.int64)
+    other_keys = {}
+    points, point_xyz = [], []  # indices of Points and their x, y, z (None where not set)
+    arrays = []  # (index, PointArray)
+    for i, step in enumerate(steps):
+        if isinstance(step, Point) and step.e is None and not step.gcode_line:
+            points.append(i)
+            point_xyz.append((step.x, step.y, step.z))
+        elif isinstance(step, PointArray) and len(step):
+            arrays.append((i, step))
+        else:
+            try:
+                key = (type(step), repr(step))
+            except Exception:
+                key = id(step)
+            keys[i] = other_keys.setdefault(key, len(other_keys))
+    xyz = np.full((n, 3), np.nan)
+    if points:
+        xyz[points] = np.array(point_xyz, dtype=np.float64)  # None -> NaN
+    for i, step in arrays:
+        xyz[i] = step.xyz[-1]
+    set_mask = ~np.isnan(xyz)
+    is_point = np.zeros(n, dtype=bool)
+    is_point[points] = True
+    # position after each step: the last value set for each axis
+    last_set = np.maximum.accumulate(np.where(set_mask, np.arange(n)[:, None], -1), axis=0)
+    position = np.where(last_set >= 0, xyz[np.maximum(last_set, 0), np.arange(3)], np.nan)
+    previous = np.vstack((np.full((1, 3), np.nan), position[:-1]))
+    # points: key from the move (and which axes are set), unique where the previous position isn't known
+    delta = np.round((position - previous) / KEY_RESOLUTION)
+    known = ~(np.isnan(delta) & set_mask).any(axis=1)
+    keyed = np.flatnonzero(is_point & known)
+    offset = len(other_keys)
+    if len(keyed):
+        moves = np.where(set_mask, np.nan_to_num(delta), 0)[keyed]
+        inverse = _combined_keys([moves[:, 0], moves[:, 1], moves[:, 2], set_mask[keyed] @ np.array([1, 2, 4])])
+        keys[keyed] = offset + inverse
+        offset += int(inverse.max()) + 1
+    unknown = np.flatnonzero(is_point & ~known)
+    keys[unknown] = offset + np.arange(len(unknown))
+    offset += len(unknown)
+    # point arrays: key from all of their moves
+    array_keys = {}
+    for i, step in arrays:
+        moves = np.diff(np.vstack((previous[i][None, :], step.xyz)), axis=0)
+        columns = tuple(None if getattr(step, name) is None else getattr(step, name).tobytes()
+                        for name in ('width', 'height', 'speed', 'extrusion_length'))
+        key = (np.round(moves / KEY_RESOLUTION).tobytes(), columns) if not np.isnan(moves).any() else i
+        keys[i] = offset + array_keys.setdefault(key, len(array_keys))
+    return keys, position
+
+
+def _candidate_repeats(keys: np.ndarray) -> list:
+    'runs of keys that repeat with a period, as (start, period, copies), for the most common periods'
+    n = len(keys)
+    order = np.argsort(keys, kind='stable')
+    same = keys[order[1:]] == keys[order[:-1]]
+    gaps = (order[1:] - order[:-1])[same]
+    gaps = gaps[gaps <= n // 2]
+    if not len(gaps):
+        return []
+    counts = np.bincount(gaps)
+    periods = np.argsort(counts)[::-1][:MAX_CANDIDATE_PERIODS]
+    repeats = []
+    for period in periods[counts[periods] >= 2].tolist():
+        equal = np.concatenate(([False], keys[period:] == keys[:-period], [False]))
+        edges = np.flatnonzero(equal[1:] != equal[:-1])
+        for start, stop in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            copies = (stop - start + period) // period
+            if copies >= 3:
+                repeats.append((start, period, copies))
+    return repeats
+
+
+def find_repeats(steps: list, mode: str = 'relative', stats: Optional[dict] = None, report: bool = False) -> list:
+    '''
+    Replace runs of steps that are repeated with a constant offset between copies (e.g. from
+    move(..., copy=True)) with RepeatBlocks, so that gcode for copies after the second is generated once and reused.
+
+    Steps are compared by the moves they make (relative to the position before them) and by their attributes for
+    other steps. Candidate lengths of a copy are the most common distances between equal steps, and all repeats
+    with these lengths are found at once with numpy. Repeats that save the most steps are used first, if the offset
+    between copies is a multiple of the precision of coordinates in gcode and the position before the first copy
+    is known.
+
+    Args:
+        steps (list): The steps of the design.
+        mode (str): How copies after the second are written (see RepeatBlock).
+        stats (Optional[dict]): If given, 'repeats' and 'steps' are set to the number of RepeatBlocks and the
+            number of steps in them.
+        report (bool): Whether to print the number of repeats found.
+
+    Returns:
+        list: The steps, with RepeatBlocks in place of repeated steps.
+    '''
+    if mode not in REPEAT_MODES:
+        raise ValueError(f"repeat mode '{mode}' not recognized - use one of {list(REPEAT_MODES)}")
+    stats = {} if stats is None else stats
+    stats['repeats'] = stats['steps'] = 0
+    if len(steps) < MIN_REPEAT_STEPS:
+        return steps
+    keys, position = _step_keys(steps)
+    used = np.zeros(len(steps), dtype=bool)
+    blocks = []
+    for start, period, copies in sorted(_candidate_repeats(keys), key=lambda r: -(r[2] - 2) * r[1]):
+        if (copies - 2) * period < MIN_REPEAT_STEPS:
+            break
+        stop = start + period * copies
+        if start == 0 or used[start:stop].any():
+            continue
+        vector = position[start + period - 1] - position[start - 1]
+        steps_offset = vector / OFFSET_RESOLUTION
+        if np.isnan(vector).any() or np.isnan(position[start - 1]).any() \
+                or not np.allclose(steps_offset, np.round(steps_offset), rtol=0, atol=1e-6):
+            continue
+        used[start:stop] = True
+        blocks.append((start, stop, RepeatBlock(steps[start:start + period], copies, np.round(steps_offset) *
+                                                OFFSET_RESOLUTION, mode)))
+    result, position_in_steps = [], 0
+    for start, stop, block in sorted(blocks, key=lambda b: b[0]):
+        result.extend(steps[position_in_steps:start])
+        result.append(block)
+        position_in_steps = stop
+        stats['repeats'] += 1
+        stats['steps'] += stop - start
+    result.extend(steps[position_in_steps:])
+    if report:
+        print(f"repeat_copies='{mode}': {stats['steps']} of {len(steps)} steps are in {stats['repeats']} repeats")
+    return result
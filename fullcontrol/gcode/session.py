@@ -0,0 +1,156 @@
+import hashlib
+from bisect import bisect_right
+from typing import Optional
+from pydantic import BaseModel
+from fullcontrol.common import PointArray as BasePointArray
+from fullcontrol.gcode.dispatch import process_steps
+from fullcontrol.gcode.state import State
+
+# a snapshot of state is kept every this many steps, so that gcode generation can restart close to an edit
+CHECKPOINT_INTERVAL = 1000
+
+# controls that change the steps before gcode generation (or split it across processes), which a session does not do
+UNSUPPORTED_CONTROLS = ('optimize_travel', 'simplify_tolerance', 'max_flow', 'min_layer_time', 'repeat_copies')
+
+
+def step_key(step) -> tuple:
+    '''
+    Return a key that identifies the content of a step, so that unchanged steps can be recognised between two
+    versions of a design even if they are different objects.
+    '''
+    if isinstance(step, BaseModel):
+        return (type(step), tuple(step.__dict__.values()))  # field values at the time of the call
+    if isinstance(step, BasePointArray):
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (step.xyz, step.width, step.height, step.speed, step.color, step.extrusion_length):
+            digest.update(b'-' if column is None else column.tobytes())
+        return (type(step), len(step), digest.digest())
+    return (type(step), id(step))  # unknown objects are only treated as unchanged if they are the same object
+
+
+class GcodeSession:
+    '''
+    Generate gcode for successive versions of a design, re-rendering only the steps that changed.
+
+    The steps, lines of gcode and periodic snapshots of state from the previous call to gcode() are kept. When a new
+    version of the design is given, steps are compared by content (see step_key) and gcode generation restarts from
+    the last snapshot before the first changed step. Once the unchanged steps after the edit are reached and state
+    matches the state at the same step of the previous version, the remaining lines of gcode are reused from the
+    previous result. The result is identical to gcode(steps, controls) for controls that a session supports.
+
+    Args:
+        controls (GcodeControls, optional): Controls for the gcode generation. controls.output is not used by a
+            session. A ValueError is raised if controls.parallel_workers (greater than 1),
+            controls.optimize_travel, controls.simplify_tolerance, controls.max_flow, controls.min_layer_time or
+            controls.repeat_copies are set, since the steps are not pre-processed by a session.
+        show_tips (bool): Whether to show usage tips the first time gcode is generated.
+        checkpoint_interval (int): Number of steps between snapshots of state.
+
+    Example usage:
+        session = GcodeSession(controls)
+        gcode = session.gcode(steps)
+        steps[5000] = Point(x=1, y=2, z=3)
+        gcode = session.gcode(steps)  # only steps from around step 5000 are re-rendered
+    '''
+
+    def __init__(self, controls: Optional['GcodeControls'] = None, show_tips: bool = True,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        unsupported = [name for name in UNSUPPORTED_CONTROLS if getattr(controls, name, None)]
+        if (getattr(controls, 'parallel_workers', None) or 1) > 1:
+            unsupported.append('parallel_workers')
+        if unsupported:
+            raise ValueError(f'GcodeSession does not support the controls {unsupported} - use gcode() instead')
+        self.controls = controls
+        self.show_tips = show_tips
+        self.checkpoint_interval = checkpoint_interval
+        self.steps_rendered = 0  # number of steps converted to gcode by the last call to gcode()
+        self._keys = None  # step_key() of each step of the previous design
+        self._lines = None  # lines of gcode for the previous design (without end gcode)
+        self._checkpoints = None  # {step index: (snapshot of state before the step, number of lines before the step)}
+        self._result = None
+
+    def gcode(self, steps: list) -> str:
+        '''
+        Generate gcode for a list of steps, reusing the gcode of the previous design for unchanged regions.
+
+        Args:
+            steps (list): The steps of the design.
+
+        Returns:
+            str: The gcode for the design.
+        '''
+        from fullcontrol.gcode import _start, _save
+
+        steps = list(steps)
+        keys = [step_key(step) for step in steps]
+        if self._keys is None:
+            self.controls, state = _start(steps, self.controls, self.show_tips)
+            self._render(steps, keys, state, 0, state.gcode, {}, {})
+        elif keys != self._keys:
+            self._rerender(steps, keys)
+        else:
+            self.steps_rendered = 0
+            return self._result
+        _save(self._result, self.controls)
+        return self._result
+
+    def _rerender(self, steps: list, keys: list):
+        'render a new version of the design, restarting from the last checkpoint before the first changed step'
+        old_keys = self._keys
+        common = min(len(keys), len(old_keys))
+        prefix = next((i for i in range(common) if keys[i] != old_keys[i]), common)
+        suffix = 0
+        while suffix < common - prefix and keys[-1 - suffix] == old_keys[-1 - suffix]:
+            suffix += 1
+        restart = max(i for i in self._checkpoints if i <= prefix)
+        snapshot, line_count = self._checkpoints[restart]
+        state = State.from_snapshot(snapshot, self.controls)
+        kept_checkpoints = {i: checkpoint for i, checkpoint in self._checkpoints.items() if i <= restart}
+        # checkpoints of the previous design in the unchanged steps at the end, indexed by step in the new design
+        shift = len(old_keys) - len(keys)
+        reusable = {i - shift: checkpoint for i, checkpoint in self._checkpoints.items()
+                    if i - shift >= len(keys) - suffix and i - shift > restart}
+        self._render(steps, keys, state, restart, self._lines[:line_count], kept_checkpoints, reusable)
+
+    def _render(self, steps: list, keys: list, state: State, start: int, lines: list, checkpoints: dict,
+                reusable: dict):
+        '''
+        Render steps from index start onwards with state and lines of gcode as they are before that step. If state
+        matches a reusable checkpoint of the previous design, the rest of the previous gcode is reused.
+        '''
+        from fullcontrol.gcode import _post_process
+
+        state.gcode = lines
+        old_lines = self._lines
+        last_checkpoint = start
+        reusable_indices = sorted(reusable)
+        checkpoints[start] = (state.snapshot(), len(lines))
+        i = start
+        while i < len(steps):
+            if i in reusable:
+                snapshot = state.snapshot()
+                old_snapshot, old_line_count = reusable[i]
+                if snapshot == old_snapshot:
+                    offset = len(lines) - old_line_count
+                    checkpoints.update((j, (old_snapshot, line_count + offset))
+                                       for j, (old_snapshot, line_count) in reusable.items() if j >= i)
+                    lines.extend(old_lines[old_line_count:])
+                    break
+            if i - last_checkpoint >= self.checkpoint_interval:
+                checkpoints[i] = (state.snapshot(), len(lines))
+                last_checkpoint = i
+            # process steps up to the next checkpoint or reusable checkpoint in one go
+            stop = min(last_checkpoint + self.checkpoint_interval, len(steps))
+            next_reusable = bisect_right(reusable_indices, i)
+            if next_reusable < len(reusable_indices):
+                stop = min(stop, reusable_indices[next_reusable])
+            process_steps(steps[i:stop], state)
+            i = stop
+        self.steps_rendered = i - start
+        self._keys = keys
+        self._lines = lines
+        self._checkpoints = checkpoints
+        line_count = len(lines)
+        state.finalize()
+        self._result = '\n'.join(_post_process(lines, self.controls))
+        del lines[line_count:]
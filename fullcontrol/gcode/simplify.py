@@ -0,0 +1,129 @@
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from fullcontrol.gcode.dispatch import handler_for, _point_handler
+from fullcontrol.gcode.point_array import PointArray
+
+# fewest points in a run for it to be simplified
+MIN_RUN_POINTS = 3
+
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    'distance from each of points to the line segment from start to end'
+    direction = end - start
+    length_sq = direction @ direction
+    if length_sq == 0:
+        return np.linalg.norm(points - start, axis=1)
+    t = np.clip((points - start) @ direction / length_sq, 0, 1)
+    return np.linalg.norm(points - (start + t[:, None] * direction), axis=1)
+
+
+def douglas_peucker(xyz: np.ndarray, tolerance: float, keep: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Return a boolean mask of the points of a polyline to keep, so that no point that is removed is further than
+    tolerance from the simplified polyline (Douglas-Peucker algorithm, with distances calculated for all points of a
+    section at once).
+
+    Args:
+        xyz (np.ndarray): N x 3 array of points.
+        tolerance (float): The maximum distance of a removed point from the simplified polyline.
+        keep (Optional[np.ndarray]): Boolean mask of points that must be kept. The first and last points are
+            always kept.
+
+    Returns:
+        np.ndarray: Boolean mask of the points to keep.
+    '''
+    mask = np.zeros(len(xyz), dtype=bool) if keep is None else keep.copy()
+    mask[[0, -1]] = True
+    fixed = np.flatnonzero(mask)
+    sections = list(zip(fixed[:-1].tolist(), fixed[1:].tolist()))
+    while sections:
+        first, last = sections.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(xyz[first + 1:last], xyz[first], xyz[last])
+        furthest = int(distances.argmax())
+        if distances[furthest] > tolerance:
+            split = first + 1 + furthest
+            mask[split] = True
+            sections.extend(((first, split), (split, last)))
+    return mask
+
+
+def _simplify_array(xyz: np.ndarray, tolerance: float, columns: dict, extrusion_length: Optional[np.ndarray],
+                    first_length: float = np.nan) -> PointArray:
+    '''
+    Simplify a run of points given as an array, keeping points where per-point columns change. The extrusion length
+    of each kept point is the length of the original path it replaces, so extrusion totals are unchanged.
+    '''
+    keep = np.zeros(len(xyz), dtype=bool)
+    for column in columns.values():
+        keep[:-1] |= column[:-1] != column[1:]  # the line ending at each point uses the value at that point
+    mask = douglas_peucker(xyz, tolerance, keep)
+    lengths = np.linalg.norm(np.diff(xyz, axis=0), axis=1)
+    if extrusion_length is not None:
+        lengths = np.where(np.isnan(extrusion_length[1:]), lengths, extrusion_length[1:])
+        first_length = extrusion_length[0]
+    cumulative = np.concatenate(([0.0], np.cumsum(lengths)))
+    kept = np.flatnonzero(mask)
+    new_lengths = np.concatenate(([first_length], np.diff(cumulative[kept])))
+    return PointArray(xyz[kept], extrusion_length=new_lengths, **{name: column[kept] for name, column in columns.items()})
+
+
+def _is_simple_point(step) -> bool:
+    'Points with x, y and z defined that are converted to gcode in the normal way (so can be simplified)'
+    return handler_for(type(step)) is _point_handler and step.e is None and not step.gcode_line \
+        and step.x is not None and step.y is not None and step.z is not None
+
+
+def simplify_steps(steps: Iterable, tolerance: float, stats: Optional[dict] = None, report: bool = False) -> Iterator:
+    '''
+    Remove points from runs of consecutive Points (and from PointArrays) where the path deviates from a straight line
+    by no more than tolerance.
+
+    Runs end at every step that is not a Point, so changes of extrusion geometry, speed, extruder state etc. are all
+    preserved, as are changes of width/height/speed within a PointArray. Each simplified run becomes a PointArray in
+    which the extrusion for each remaining line is based on the length of the original path it replaces, so extrusion
+    totals are unchanged. Points with explicit e or gcode_line values, or with undefined x/y/z, end runs and are
+    kept as they are.
+
+    Args:
+        steps (Iterable): The steps of the design.
+        tolerance (float): The maximum distance (mm) of a removed point from the simplified path.
+        stats (Optional[dict]): If given, 'points' and 'removed' are set to the number of points in simplified runs
+            and the number of points removed.
+        report (bool): Whether to print the number of points removed once all steps have been processed.
+
+    Yields:
+        The simplified steps.
+    '''
+    stats = {} if stats is None else stats
+    stats['points'] = stats['removed'] = 0
+    run = []
+
+    def simplified_run():
+        if len(run) < MIN_RUN_POINTS:
+            return run
+        xyz = np.array([(point.x, point.y, point.z) for point in run], dtype=np.float64)
+        simplified = _simplify_array(xyz, tolerance, {}, None)
+        stats['points'] += len(run)
+        stats['removed'] += len(run) - len(simplified)
+        return [simplified]
+
+    for step in steps:
+        if _is_simple_point(step):
+            run.append(step)
+            continue
+        if run:
+            yield from simplified_run()
+            run = []
+        if isinstance(step, PointArray) and len(step) >= MIN_RUN_POINTS:
+            columns = {name: getattr(step, name) for name in ('width', 'height', 'speed') if getattr(step, name) is not None}
+            simplified = _simplify_array(step.xyz, tolerance, columns, step.extrusion_length)
+            stats['points'] += len(step)
+            stats['removed'] += len(step) - len(simplified)
+            step = simplified
+        yield step
+    if run:
+        yield from simplified_run()
+    if report:
+        print(f"simplify_tolerance={tolerance}: removed {stats['removed']} of {stats['points']} points")
@@ -49,3 +49,33 @@ class State:
         """Add end G-code if provided."""
         if self.controls.get_end_gcode():
             self.gcode.extend(line.strip() for line in self.controls.get_end_gcode().splitlines() if line.strip())
+
+
+    def snapshot(self) -> dict:
+        """Return a picklable copy of the parts of state carried from one step to the next.
+
+        This is all that is needed to continue gcode generation from the current step in another
+        process or at a later time (see restore).
+        """
+        return {
+            'point': self.point.model_copy(deep=True) if self.point is not None else None,
+            'printer': self.printer.model_copy(deep=True),
+            'extruder': self.extruder.model_copy(deep=True),
+            'extrusion_geometry': self.extrusion_geometry.model_copy(deep=True),
+        }
+
+    def restore(self, snapshot: dict):
+        """Set the state carried between steps from a snapshot (see snapshot)."""
+        for key, value in snapshot.items():
+            setattr(self, key, value.model_copy(deep=True) if value is not None else None)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, controls: Optional['GcodeControls'] = None) -> 'State':
+        """Create a State that continues gcode generation from a snapshot, without any start gcode."""
+        state = cls.__new__(cls)
+        state.steps = None
+        state.controls = controls
+        state.gcode = []
+        state.i = 0
+        state.restore(snapshot)
+        return state
@@ -14,7 +14,7 @@ def generate_gcode(steps: list, gcode_controls: GcodeControls, show_tips: bool =
         show_tips (bool): Whether to show usage tips.
 
     Returns:
-        str: The generated gcode string.
+        str: The generated gcode string (None if gcode_controls.output is set and the gcode was streamed to it).
     '''
     if show_tips:
         tips(gcode_controls)
@@ -23,7 +23,7 @@ def generate_gcode(steps: list, gcode_controls: GcodeControls, show_tips: bool =
     result = gcode(steps, gcode_controls, show_tips=False)  # Tips already shown if needed
 
     # Save to file if configured
-    if gcode_controls.save_as is not None:
+    if gcode_controls.save_as is not None and result is not None:
         filename = gcode_controls.save_as
         if gcode_controls.include_date:
             filename += datetime.now().strftime("__%d-%m-%Y__%H-%M-%S")
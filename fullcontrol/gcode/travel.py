@@ -0,0 +1,296 @@
+'''
+Reordering of separate extrusion islands to reduce the distance travelled between them.
+
+An island is the steps from an Extruder(on=False) to the next one: the travel to the start of the island, then its
+extrusion. Consecutive islands at the same z that only contain Points, PointArrays and Extruder on/off steps can be
+printed in any order, and islands made of a single travel point and a plain path can also be printed backwards.
+'''
+from math import sqrt
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from fullcontrol.gcode.extrusion_classes import Extruder
+from fullcontrol.gcode.point import Point
+from fullcontrol.gcode.point_array import PointArray
+from fullcontrol.gcode.simplify import _is_simple_point
+
+# maximum number of improving passes of 2-opt over each layer
+TWO_OPT_PASSES = 3
+# tolerance (mm) for z values of islands in the same layer
+LAYER_Z_TOLERANCE = 1e-6
+
+
+class GridIndex:
+    '''
+    Uniform grid of 2D points for nearest-neighbour queries, with points that can be removed.
+
+    Args:
+        points (np.ndarray): N x 2 array of points.
+        per_cell (float): Average number of points per occupied cell that the cell size is chosen for.
+    '''
+
+    def __init__(self, points: np.ndarray, per_cell: float = 2.0):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.alive = np.ones(len(self.points), dtype=bool)
+        self.low = self.points.min(axis=0)
+        extent = self.points.max(axis=0) - self.low
+        n = len(self.points)
+        if extent[0] * extent[1] > 0:
+            self.cell = sqrt(extent[0] * extent[1] * per_cell / n)
+        else:  # points on a line (or all the same)
+            self.cell = max(extent.max() * per_cell / n, 1e-6)
+        cells = np.floor((self.points - self.low) / self.cell).astype(np.int64)
+        self.size = cells.max(axis=0) + 1
+        self.cells = {}
+        for i, key in enumerate(map(tuple, cells.tolist())):
+            self.cells.setdefault(key, []).append(i)
+
+    def _cell(self, point) -> tuple:
+        return tuple(np.floor((np.asarray(point) - self.low) / self.cell).astype(np.int64).tolist())
+
+    def remove(self, i: int):
+        'remove point i from the index'
+        if self.alive[i]:
+            self.alive[i] = False
+            self.cells[self._cell(self.points[i])].remove(i)
+
+    def near(self, point) -> list:
+        'points in the cell containing point and the cells around it'
+        cx, cy = self._cell(point)
+        return [i for x in (cx - 1, cx, cx + 1) for y in (cy - 1, cy, cy + 1) for i in self.cells.get((x, y), ())]
+
+    def nearest(self, point) -> Optional[int]:
+        'the nearest point that has not been removed, searching rings of cells outwards from point'
+        cx, cy = self._cell(point)
+        best, best_distance = None, np.inf
+        max_ring = int(max(abs(cx), abs(cy), abs(self.size[0] - cx), abs(self.size[1] - cy))) + 1
+        for ring in range(max_ring + 1):
+            if best is not None and best_distance <= (ring - 1) * self.cell:
+                break  # points in this ring and beyond are further away
+            for x in range(cx - ring, cx + ring + 1):
+                ys = range(cy - ring, cy + ring + 1) if x in (cx - ring, cx + ring) else (cy - ring, cy + ring)
+                for y in ys:
+                    for i in self.cells.get((x, y), ()):
+                        distance = sqrt((self.points[i, 0] - point[0]) ** 2 + (self.points[i, 1] - point[1]) ** 2)
+                        if distance < best_distance:
+                            best, best_distance = i, distance
+        return best
+
+
+def _travel(start: np.ndarray, entry: np.ndarray, exit: np.ndarray) -> float:
+    'total distance from start to the entry of the first island and from the exit of each island to the next'
+    previous = np.vstack((start[None, :], exit[:-1]))
+    return float(np.linalg.norm(entry - previous, axis=1).sum())
+
+
+def order_islands(start: np.ndarray, first: np.ndarray, last: np.ndarray, reversible: np.ndarray,
+                  passes: int = TWO_OPT_PASSES) -> tuple:
+    '''
+    Order and direction for islands that gives a short total travel, from a nearest-neighbour tour (found with a
+    GridIndex) improved by 2-opt moves. A 2-opt move reverses a section of the tour, which reverses the direction
+    of each island in it, so it is only made for sections of reversible islands. Candidate moves are limited to
+    islands with an end near the island before the section.
+
+    Args:
+        start (np.ndarray): xy position before the first island.
+        first (np.ndarray): N x 2 array of the first point of each island.
+        last (np.ndarray): N x 2 array of the last point of each island.
+        reversible (np.ndarray): Whether each island can be printed backwards.
+        passes (int): Maximum number of passes of 2-opt over the tour.
+
+    Returns:
+        tuple: (order, reversed): the islands in the order to print them, and whether each of them is printed
+            backwards.
+    '''
+    n = len(first)
+    ends = np.vstack((first, last))  # end i is the first point of island i, end n + i is its last point
+    index = GridIndex(ends)
+    for i in np.flatnonzero(~reversible):
+        index.remove(n + i)  # islands that can't be reversed can only be entered at their first point
+    order, backwards = [], []
+    position = start
+    for _ in range(n):
+        end = index.nearest(position)
+        island, flipped = end % n, end >= n
+        index.remove(island)
+        index.remove(n + island)
+        order.append(island)
+        backwards.append(flipped)
+        position = first[island] if flipped else last[island]
+    order, backwards = np.array(order), np.array(backwards)
+
+    # 2-opt, with candidates for the new first island of a reversed section from the ends near the previous exit
+    entry = np.where(backwards[:, None], last[order], first[order])
+    exit = np.where(backwards[:, None], first[order], last[order])
+    # sections with an island that can't be reversed are not reversed, so these islands keep their positions
+    fixed_before = np.concatenate(([0], np.cumsum(~reversible[order])))
+    position_of = np.empty(n, dtype=np.int64)
+    position_of[order] = np.arange(n)
+    ends_index = GridIndex(ends)
+    near_start = np.array(ends_index.near(start), dtype=np.int64) % n
+    near_end = [np.array(ends_index.near(end), dtype=np.int64) % n for end in ends]  # islands near each end
+    for _ in range(passes):
+        improved = False
+        for p in range(n):
+            previous = start if p == 0 else exit[p - 1]
+            q = position_of[near_start if p == 0 else near_end[order[p - 1] + (0 if backwards[p - 1] else n)]]
+            q = q[(q > p) & (fixed_before[q + 1] == fixed_before[p])]
+            if not len(q):
+                continue
+            # change of travel from reversing each section p..q (the last island has no travel after it)
+            following = entry[np.minimum(q + 1, n - 1)]
+            after = np.where(q + 1 < n, 1.0, 0.0)
+            change = np.hypot(*(previous - exit[q]).T) - np.hypot(*(previous - entry[p]))
+            change += after * (np.hypot(*(entry[p] - following).T) - np.hypot(*(exit[q] - following).T))
+            best = int(np.argmin(change))
+            if change[best] < -1e-9:
+                section = slice(p, int(q[best]) + 1)
+                order[section] = order[section][::-1]
+                backwards[section] = ~backwards[section][::-1]
+                entry[section], exit[section] = exit[section][::-1].copy(), entry[section][::-1].copy()
+                position_of[order[section]] = np.arange(section.start, section.stop)
+                improved = True
+        if not improved:
+            break
+    return order, backwards
+
+
+class _Island:
+    'the steps from an Extruder(on=False) to the next one, with the points that they move through'
+
+    def __init__(self, steps: list):
+        self.steps = steps
+        self.movable = bool(steps) and isinstance(steps[0], Extruder) and steps[0].on is False
+        points = []  # xyz of the points of each step
+        for step in steps:
+            if isinstance(step, Extruder) and step.model_fields_set <= {'on', 'retraction'}:
+                continue
+            if _is_simple_point(step):
+                points.append([(step.x, step.y, step.z)])
+            elif isinstance(step, PointArray):
+                points.append(step.xyz)
+            else:
+                self.movable = False
+        self.xyz = np.vstack(points) if points else np.zeros((0, 3))
+        self.movable = self.movable and len(self.xyz) > 0 and np.ptp(self.xyz[:, 2]) <= LAYER_Z_TOLERANCE
+        # printed backwards as a travel to the last point, then the path to the first point
+        ons = [i for i, step in enumerate(steps) if isinstance(step, Extruder) and step.on]
+        self.reversible = self.movable and len(ons) == 1 and ons[0] > 0 and _is_simple_point(steps[ons[0] - 1]) \
+            and all(isinstance(step, Extruder) and not step.on for step in steps[:ons[0] - 1]) \
+            and all(_is_simple_point(step) or (isinstance(step, PointArray) and step.width is None and
+                                               step.height is None and step.speed is None and
+                                               step.extrusion_length is None) for step in steps[ons[0] + 1:])
+
+    def backwards(self) -> list:
+        'the steps to print the island backwards'
+        on = next(i for i, step in enumerate(self.steps) if isinstance(step, Extruder) and step.on)
+        path = self.steps[on + 1:]
+        travel = self.steps[:on - 1]
+        arrays = [step for step in path if isinstance(step, PointArray)]
+        if not arrays:
+            points = [self.steps[on - 1]] + path
+            return travel + [points[-1], self.steps[on]] + points[-2::-1]
+        xyz = self.xyz[::-1]
+        point = self.steps[on - 1]
+        return travel + [type(point)(x=xyz[0, 0], y=xyz[0, 1], z=xyz[0, 2]), self.steps[on], type(arrays[0])(xyz[1:])]
+
+
+def _first_point_defined(island: _Island) -> bool:
+    'whether the first point that the island moves to is fully defined (so it does not depend on earlier points)'
+    for step in island.steps:
+        if isinstance(step, PointArray) and len(step):
+            return True
+        if isinstance(step, Point):
+            return step.x is not None and step.y is not None and step.z is not None
+    return True
+
+
+def optimize_travel(steps: Iterable, passes: int = TWO_OPT_PASSES, stats: Optional[dict] = None,
+                    report: bool = False) -> Iterator:
+    '''
+    Reorder islands of extrusion within each layer to reduce the distance travelled between them.
+
+    The steps are divided into islands at each Extruder(on=False). Consecutive islands at the same z that contain only
+    fully defined Points, PointArrays and Extruder on/off steps are reordered (see order_islands()). Islands that
+    start with a single travel point followed by a plain path (Points or PointArrays without per-point columns) may also
+    be printed backwards. Any other steps (e.g. Printer or ExtrusionGeometry) keep their place in the design, with
+    the islands before and after them. The new order is only used if it reduces the travel distance.
+
+    Args:
+        steps (Iterable): The steps of the design.
+        passes (int): Maximum number of passes of 2-opt over each layer.
+        stats (Optional[dict]): If given, 'islands', 'travel_before' and 'travel_after' are set to the number of
+            islands that could be reordered and their total travel distance (mm) before and after reordering.
+        report (bool): Whether to print the travel distance saved once all steps have been processed.
+
+    Yields:
+        The steps, with islands reordered.
+    '''
+    stats = {} if stats is None else stats
+    stats['islands'] = 0
+    stats['travel_before'] = stats['travel_after'] = 0.0
+    position = np.full(3, np.nan)  # position before the current group of islands
+    group = []
+
+    def reordered(group: list, position: np.ndarray) -> list:
+        'the steps of a group of movable islands in the same layer, in the order with the least travel'
+        if len(group) < 2:
+            return [step for island in group for step in island.steps]
+        first = np.array([island.xyz[0, :2] for island in group])
+        last = np.array([island.xyz[-1, :2] for island in group])
+        reversible = np.array([island.reversible for island in group])
+        start = first[0] if np.isnan(position[:2]).any() else position[:2]
+        order, backwards = order_islands(start, first, last, reversible, passes)
+        before = _travel(start, first, last)
+        after = _travel(start, np.where(backwards[:, None], last[order], first[order]),
+                        np.where(backwards[:, None], first[order], last[order]))
+        stats['islands'] += len(group)
+        stats['travel_before'] += before
+        if after >= before:
+            stats['travel_after'] += before
+            return [step for island in group for step in island.steps]
+        stats['travel_after'] += after
+        return [step for i, flipped in zip(order.tolist(), backwards.tolist())
+                for step in (group[i].backwards() if flipped else group[i].steps)]
+
+    def finish(island: _Island) -> list:
+        'add an island to the current group, or return the steps of the group (and of the island if it is fixed)'
+        nonlocal group, position
+        if island.movable and (not group or abs(island.xyz[0, 2] - group[0].xyz[0, 2]) <= LAYER_Z_TOLERANCE):
+            group.append(island)
+            return []
+        if group and not _first_point_defined(island):
+            kept = group.pop()  # the island moves relative to the end of the last island, so that one stays last
+            result = reordered(group, position) + kept.steps
+        else:
+            result = reordered(group, position)
+        group = [island] if island.movable else []
+        if not island.movable:
+            result += island.steps
+        position = _end_position(result, position)
+        return result
+
+    island = []
+    for step in steps:
+        if isinstance(step, Extruder) and step.on is False and island:
+            yield from finish(_Island(island))
+            island = []
+        island.append(step)
+    if island:
+        yield from finish(_Island(island))
+    yield from reordered(group, position)
+    if report:
+        print(f"optimize_travel: travel between {stats['islands']} islands reduced from "
+              f"{stats['travel_before']:.1f} mm to {stats['travel_after']:.1f} mm")
+
+
+def _end_position(steps: list, position: np.ndarray) -> np.ndarray:
+    'position after moving through the points of steps'
+    position = position.copy()
+    for step in steps:
+        if isinstance(step, PointArray) and len(step):
+            position = step.xyz[-1].copy()
+        elif isinstance(step, Point):
+            for axis, value in enumerate((step.x, step.y, step.z)):
+                if value is not None:
+                    position[axis] = value
+    return position
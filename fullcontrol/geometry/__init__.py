@@ -1,5 +1,5 @@
 # import classes
-from fullcontrol.combinations.gcode_and_visualize.classes import Point, Extruder
+from fullcontrol.combinations.gcode_and_visualize.classes import Point, Extruder, PointArray
 from fullcontrol.geometry.vector import Vector
 from fullcontrol.geometry.polar import PolarPoint
 
@@ -18,5 +18,7 @@ from fullcontrol.geometry.ramping import ramp_xyz, ramp_polar
 from fullcontrol.geometry.arcs import arcXY, variable_arcXY, elliptical_arcXY
 from fullcontrol.geometry.shapes import rectangleXY, circleXY, circleXY_3pt, ellipseXY, polygonXY, spiralXY, helixZ
 from fullcontrol.geometry.waves import squarewaveXY, squarewaveXYpolar, trianglewaveXYpolar, sinewaveXYpolar
+from fullcontrol.geometry.arc_length import ArcLength
 from fullcontrol.geometry.segmentation import segmented_line, segmented_path
 from fullcontrol.geometry.travel_to import travel_to
+from fullcontrol.geometry.transforms import Transform
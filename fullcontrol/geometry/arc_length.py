@@ -0,0 +1,84 @@
+from math import ceil
+from typing import Union
+import numpy as np
+from fullcontrol.geometry import Point, PointArray
+
+
+class ArcLength:
+    '''
+    Arc-length parameterization of a path (a list of Points, or a PointArray), for finding positions at given
+    distances along the path.
+
+    The cumulative length of the path at each of its points is calculated once. Positions at any number of distances
+    are then found together with np.searchsorted() and linear interpolation, rather than by searching the path for
+    each distance.
+
+    Attributes:
+        points (list): The Points of the path (all with x, y and z defined).
+        xyz (np.ndarray): N x 3 array of the positions of the points.
+        cumulative (np.ndarray): The length of the path from its start to each point (starting at 0).
+        length (float): The total length of the path.
+    '''
+
+    def __init__(self, points: Union[list, PointArray]):
+        self.points = points.to_points() if isinstance(points, PointArray) else points
+        if any(None in (p.x, p.y, p.z) for p in self.points):
+            raise ValueError('all points of the path must have x, y and z defined to measure its length')
+        self.xyz = np.array([(p.x, p.y, p.z) for p in self.points], dtype=np.float64).reshape(-1, 3)
+        self.cumulative = np.zeros(len(self.xyz))
+        np.cumsum(np.sqrt((np.diff(self.xyz, axis=0) ** 2).sum(axis=1)), out=self.cumulative[1:])
+        self.length = float(self.cumulative[-1]) if len(self.xyz) else 0.0
+
+    def positions(self, distances) -> np.ndarray:
+        '''
+        Positions at distances along the path (values outside 0 to length are limited to the ends of the path).
+
+        Args:
+            distances: A float or array of distances from the start of the path.
+
+        Returns:
+            np.ndarray: N x 3 array of x, y, z positions (one row per distance).
+        '''
+        distances = np.clip(np.atleast_1d(np.asarray(distances, dtype=np.float64)), 0, self.length)
+        if len(self.xyz) < 2:
+            return np.repeat(self.xyz[:1], len(distances), axis=0)
+        # index of the segment containing each distance (the first segment that ends at or after the distance)
+        j = np.clip(np.searchsorted(self.cumulative, distances, side='left') - 1, 0, len(self.xyz) - 2)
+        segment_lengths = self.cumulative[j + 1] - self.cumulative[j]
+        t = np.divide(distances - self.cumulative[j], segment_lengths, out=np.zeros_like(distances), where=segment_lengths > 0)
+        return self.xyz[j] + t[:, None] * (self.xyz[j + 1] - self.xyz[j])
+
+    def position_at(self, distance: float) -> Point:
+        '''Return a new Point at the given distance along the path.'''
+        x, y, z = self.positions(distance)[0].tolist()
+        return Point(x=x, y=y, z=z)
+
+    def resample(self, segments: int = None, spacing: float = None, return_array: bool = False) -> Union[list, PointArray]:
+        '''
+        Points equally spaced along the path, for a number of segments or a maximum spacing between points.
+
+        The first and last points are copies of the first and last points of the path. With spacing, the number of
+        segments is the smallest number for which points are no further apart than spacing (along the path).
+
+        Args:
+            segments (int, optional): The number of segments (at least 1; one less than the number of points
+                returned).
+            spacing (float, optional): The maximum distance between points along the path, if segments is not given.
+            return_array (bool, optional): If True, the positions are returned as a PointArray. Defaults to False.
+
+        Returns:
+            Union[list, PointArray]: segments + 1 points along the path.
+        '''
+        if segments is None:
+            if spacing is None or spacing <= 0:
+                raise ValueError('resample() requires a number of segments or a spacing greater than 0')
+            segments = max(ceil(self.length / spacing - 1e-9), 1)
+        elif segments < 1:
+            raise ValueError(f'resample() requires at least 1 segment (segments={segments})')
+        distances = np.arange(segments + 1) * self.length / segments
+        xyz = self.positions(distances)
+        xyz[[0, -1]] = self.xyz[[0, -1]]
+        if return_array:
+            return PointArray(xyz)
+        inner = [Point(x=x, y=y, z=z) for x, y, z in xyz[1:-1].tolist()]
+        return [self.points[0].copy_with()] + inner + [self.points[-1].copy_with()]
@@ -0,0 +1,94 @@
+'''
+Vectorized versions of the geometry functions, used when they are called with return_array=True.
+
+Each function calculates all positions of a curve at once with numpy and returns them as an N x 3 array, which
+the geometry functions return as a PointArray. The positions match those of the Points returned by the geometry
+functions (within floating-point rounding), with values very close to zero set to exactly zero in the same way.
+'''
+import numpy as np
+from fullcontrol.geometry import Point, Vector
+from fullcontrol.geometry.rotate import normalize_vector
+
+# values closer to zero than this are set to zero (as _clean_float() and round_near_zero() in the geometry functions)
+ZERO_TOLERANCE = 1e-10
+
+
+def _clean(values: np.ndarray) -> np.ndarray:
+    'set values very close to zero to exactly zero'
+    values[np.abs(values) < ZERO_TOLERANCE] = 0.0
+    return values
+
+
+def _linspace(start: float, end: float, number_of_points: int) -> np.ndarray:
+    'evenly spaced floats from start to end, calculated in the same way as fullcontrol.linspace()'
+    return start + np.arange(number_of_points) / (number_of_points - 1) * (end - start)
+
+
+def arc_xyz(centre: Point, radius: float, start_angle: float, arc_angle: float, segments: int,
+            radius_change: float = 0, z_change: float = 0) -> np.ndarray:
+    '''
+    Positions of an arc about centre (segments + 1 points), with the radius and z-position optionally changing
+    linearly from the first point to the last point (as for arcXY() and variable_arcXY()).
+    '''
+    angles = _linspace(start_angle, start_angle + arc_angle, segments + 1)
+    radii = radius + _linspace(0, radius_change, segments + 1)
+    xyz = np.empty((segments + 1, 3))
+    xyz[:, 0] = _clean(centre.x + radii * np.cos(angles))
+    xyz[:, 1] = _clean(centre.y + radii * np.sin(angles))
+    xyz[:, 2] = centre.z + _linspace(0, z_change, segments + 1)
+    return xyz
+
+
+def elliptical_arc_xyz(centre: Point, a: float, b: float, start_angle: float, arc_angle: float, segments: int) -> np.ndarray:
+    'positions of an elliptical arc about centre (segments + 1 points), as for elliptical_arcXY()'
+    t = _linspace(start_angle, start_angle + arc_angle, segments + 1)
+    xyz = np.empty((segments + 1, 3))
+    xyz[:, 0] = _clean(a * np.cos(t) + centre.x)
+    xyz[:, 1] = _clean(b * np.sin(t) + centre.y)
+    xyz[:, 2] = centre.z
+    return xyz
+
+
+def walk_xyz(start: Point, deltas: np.ndarray) -> np.ndarray:
+    'positions of start followed by the points reached by each XY move in deltas (N x 2), at the z-position of start'
+    xyz = np.empty((len(deltas) + 1, 3))
+    xyz[0] = start.x, start.y, start.z
+    xyz[1:, :2] = _clean(np.cumsum(deltas, axis=0) + (start.x, start.y))
+    xyz[1:, 2] = start.z
+    return xyz
+
+
+def _directions(direction: Vector) -> tuple:
+    'unit vector of direction and the unit vector perpendicular to it (rotated 90 degrees counter-clockwise)'
+    unit_dir = normalize_vector(direction)
+    return np.array([unit_dir.x, unit_dir.y]), np.array([-unit_dir.y, unit_dir.x])
+
+
+def squarewave_xyz(start: Point, direction: Vector, amplitude: float, line_spacing: float, periods: int,
+                   extra_half_period: bool = False) -> np.ndarray:
+    'positions of a square wave, as for squarewaveXY()'
+    unit_dir, ampl_dir = _directions(direction)
+    up, across = ampl_dir * 2 * amplitude, unit_dir * line_spacing / 2
+    deltas = np.tile(np.array([up, across, -up, across]), (periods, 1))
+    deltas[:1] /= 2  # the first move up starts from the centreline
+    if extra_half_period:
+        deltas = np.vstack([deltas, up])
+    return walk_xyz(start, deltas)
+
+
+def trianglewave_xyz(start: Point, amplitude: float, tip_separation: float, periods: int) -> np.ndarray:
+    'positions of a triangle wave, as for trianglewaveXYpolar()'
+    period = [(0, amplitude), (tip_separation, -2 * amplitude), (tip_separation, amplitude)]
+    return walk_xyz(start, np.tile(np.array(period, dtype=np.float64), (periods, 1)))
+
+
+def sinewave_xyz(start: Point, direction: Vector, amplitude: float, period_length: float, periods: int,
+                 segments_per_period: int, phase_shift: float = 0) -> np.ndarray:
+    'positions of a sine wave, as for sinewaveXYpolar()'
+    unit_dir, ampl_dir = _directions(direction)
+    t = np.arange(segments_per_period * periods + 1) / segments_per_period
+    sine_val = amplitude * np.sin(2 * np.pi * t + phase_shift)
+    xyz = np.empty((len(t), 3))
+    xyz[:, :2] = _clean((start.x, start.y) + np.outer(t * period_length, unit_dir) + np.outer(sine_val, ampl_dir))
+    xyz[:, 2] = start.z
+    return xyz
@@ -1,6 +1,5 @@
 
 from fullcontrol.geometry import Point, Vector
-from copy import deepcopy
 from typing import Union
 
 
@@ -60,14 +59,14 @@ def move_geometry(geometry: Union[Point, list], vector: Vector) -> Union[Point,
         Returns:
             Point: A new Point object with the updated coordinates.
         '''
-        point_new = deepcopy(point)  # deepcopy so that color attribute is copied
-        if point_new.x is not None and vector.x is not None:
-            point_new.x += vector.x
-        if point_new.y is not None and vector.y is not None:
-            point_new.y += vector.y
-        if point_new.z is not None and vector.z is not None:
-            point_new.z += vector.z
-        return point_new
+        moved = {}
+        if point.x is not None and vector.x is not None:
+            moved['x'] = point.x + vector.x
+        if point.y is not None and vector.y is not None:
+            moved['y'] = point.y + vector.y
+        if point.z is not None and vector.z is not None:
+            moved['z'] = point.z + vector.z
+        return point.copy_with(**moved)  # copy_with so that color attribute is copied
 
     if isinstance(geometry, Point):
         return move_point(geometry, vector)
@@ -1,7 +1,6 @@
 
 from fullcontrol.geometry import Point, point_to_polar, polar_to_point
 from fullcontrol.check import check_points
-from copy import deepcopy
 from typing import Union
 
 
@@ -74,9 +73,7 @@ def move_geometry_polar(geometry: Union[Point, list], centre: Point, radius: flo
         '''
         polar_data = point_to_polar(point, centre)
         point_new_xy = polar_to_point(centre, polar_data.radius+radius, polar_data.angle+angle)
-        point_new = deepcopy(point)  # deepcopy so that color and z attributes are copied
-        point_new.x, point_new.y = point_new_xy.x, point_new_xy.y
-        return point_new
+        return point.copy_with(x=point_new_xy.x, y=point_new_xy.y)  # copy_with so that color and z attributes are copied
 
     if type(geometry).__name__ == "Point":
         return move_point_about_point(geometry, centre, radius, angle)
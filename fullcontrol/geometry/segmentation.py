@@ -1,4 +1,4 @@
-from fullcontrol.geometry import Point, interpolated_point, distance
+from fullcontrol.geometry import Point, ArcLength, interpolated_point
 from fullcontrol.common import linspace
 from math import sqrt, acos, pi, atan2, cos, sin
 
@@ -223,43 +223,11 @@ def segmented_path(points: list, segments: int) -> list:
                 ))
             return result
 
-    # Calculate cumulative distances along the path
-    cumulative_distances = [0]
-    for i in range(len(points) - 1):
-        cumulative_distances.append(cumulative_distances[-1] + distance(points[i], points[i + 1]))
-    
-    total_length = cumulative_distances[-1]
-    if total_length == 0:
+    # Equally spaced points along the path, found for all distances at once from its cumulative lengths
+    path = ArcLength(points)
+    if path.length == 0:
         return [points[0]]  # Handle degenerate case
-    
-    # Generate equally spaced points
-    result = []
-    
-    # Start with the first point
-    result.append(points[0].model_copy())
-    
-    # For each intermediate point
-    for i in range(1, segments):
-        target_distance = (i * total_length) / segments
-        
-        # Find segment containing this distance
-        for j in range(len(cumulative_distances) - 1):
-            if cumulative_distances[j] <= target_distance <= cumulative_distances[j + 1]:
-                segment_length = cumulative_distances[j + 1] - cumulative_distances[j]
-                if segment_length > 0:  # Avoid division by zero
-                    # Calculate interpolation parameter
-                    t = (target_distance - cumulative_distances[j]) / segment_length
-                    new_point = interpolated_point(points[j], points[j + 1], t)
-                    result.append(new_point)
-                    break
-                else:
-                    result.append(points[j].model_copy())
-                    break
-    
-    # End with the last point
-    result.append(points[-1].model_copy())
-    
-    return result
+    return path.resample(max(segments, 1))  # fewer than 1 segment gives the start and end points
 
 
 class Vector:
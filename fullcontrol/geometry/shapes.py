@@ -32,7 +32,7 @@ def rectangleXY(start_point: Point, x_size: float, y_size: float, cw: bool = Fal
     return [start_point.model_copy(), point1, point2, point3, start_point.model_copy()]
 
 
-def circleXY(centre: Point, radius: float, start_angle: float, segments: int = 100, cw: bool = False) -> list:
+def circleXY(centre: Point, radius: float, start_angle: float, segments: int = 100, cw: bool = False, return_array: bool = False) -> list:
     '''
     Generate a 2D-XY circle with the specified number of segments (defaulting to 100), centred about a Point,
     with the given radius, starting at the specified polar angle (radians), and with the z-position the same as that
@@ -44,15 +44,16 @@ def circleXY(centre: Point, radius: float, start_angle: float, segments: int = 1
         start_angle (float): The starting angle (in radians) of the circle.
         segments (int, optional): The number of segments to divide the circle into (default is 100).
         cw (bool, optional): If True, the circle will be generated in clockwise direction (default is False).
+        return_array (bool, optional): If True, the points are returned as a PointArray (default is False).
 
     Returns:
         list: A list of Points representing the circle.
 
     '''
-    return arcXY(centre, radius, start_angle, tau*(1-(2*cw)), segments)
+    return arcXY(centre, radius, start_angle, tau*(1-(2*cw)), segments, return_array)
 
 
-def circleXY_3pt(pt1: Point, pt2: Point, pt3: Point, start_angle: float, segments: int = 100, cw: bool = False) -> list:
+def circleXY_3pt(pt1: Point, pt2: Point, pt3: Point, start_angle: float, segments: int = 100, cw: bool = False, return_array: bool = False) -> list:
     '''Generate a 2D-XY circle with the specified number of segments (defaulting to 100), defined by three points
     that the circle passes through. The start point in the returned list of points is defined by a polar angle 
     (radians). The z-position is the same as that of pt1. Returns a list of Points.
@@ -64,6 +65,7 @@ def circleXY_3pt(pt1: Point, pt2: Point, pt3: Point, start_angle: float, segment
         start_angle (float): The polar angle (in radians) that defines the start point of the circle.
         segments (int, optional): The number of segments to divide the circle into (default is 100).
         cw (bool, optional): If True, generates the circle in clockwise direction (default is False).
+        return_array (bool, optional): If True, the points are returned as a PointArray (default is False).
     
     Returns:
         list: A list of Points representing the circle.
@@ -78,10 +80,10 @@ def circleXY_3pt(pt1: Point, pt2: Point, pt3: Point, start_angle: float, segment
     y_centre = ((pt1.x**2 + pt1.y**2) * (pt3.x - pt2.x) + (pt2.x**2 + pt2.y**2) * (pt1.x - pt3.x) + (pt3.x**2 + pt3.y**2) * (pt2.x - pt1.x)) / D
     radius = ((pt1.x - x_centre)**2 + (pt1.y - y_centre)**2)**0.5
     centre = Point(x=x_centre, y=y_centre, z=pt1.z)
-    return arcXY(centre, radius, start_angle, tau*(1-(2*cw)), segments)
+    return arcXY(centre, radius, start_angle, tau*(1-(2*cw)), segments, return_array)
 
 
-def ellipseXY(centre: Point, a: float, b: float, start_angle: float, segments: int = 100, cw: bool = False) -> list:
+def ellipseXY(centre: Point, a: float, b: float, start_angle: float, segments: int = 100, cw: bool = False, return_array: bool = False) -> list:
     '''
     Generate a 2D-XY ellipse with the specified number of segments (defaulting to 100), centred about a Point,
     with the given width (a) and height (b), starting at the specified polar angle (in radians), and with the z-position
@@ -94,14 +96,15 @@ def ellipseXY(centre: Point, a: float, b: float, start_angle: float, segments: i
     - start_angle: The starting angle (in radians) for generating the ellipse.
     - segments: The number of segments to use for generating the ellipse (default is 100).
     - cw: A boolean indicating whether to generate the ellipse in clockwise direction (default is False).
+    - return_array: If True, the points are returned as a PointArray (default is False).
     
     Returns:
     - A list of Points representing the generated ellipse.
     '''
-    return elliptical_arcXY(centre, a, b, start_angle, tau*(1-(2*cw)), segments)
+    return elliptical_arcXY(centre, a, b, start_angle, tau*(1-(2*cw)), segments, return_array)
 
 
-def polygonXY(centre: Point, enclosing_radius: float, start_angle: float, sides: int, cw: bool = False) -> list:
+def polygonXY(centre: Point, enclosing_radius: float, start_angle: float, sides: int, cw: bool = False, return_array: bool = False) -> list:
     '''
     Generate a 2D-XY polygon with the specified number of sides, centered about a Point, sized based on the enclosing radius,
     starting at the specified polar angle (radians). The default direction is counter-clockwise.
@@ -112,15 +115,16 @@ def polygonXY(centre: Point, enclosing_radius: float, start_angle: float, sides:
         - start_angle (float): The starting angle (in radians) for generating the polygon.
         - sides (int): The number of sides of the polygon.
         - cw (bool, optional): If True, the polygon will be generated in clockwise direction. Default is False (counter-clockwise).
+        - return_array (bool, optional): If True, the vertices are returned as a PointArray. Default is False.
     
     Returns:
         - list: A list of Point objects representing the vertices of the polygon. The list will have one more Point than the number of sides,
                 since it begins and ends with the same Point.
     '''
-    return arcXY(centre, enclosing_radius, start_angle, tau*(1-(2*cw)), sides)  # cw parameter used to achieve +1 or -1
+    return arcXY(centre, enclosing_radius, start_angle, tau*(1-(2*cw)), sides, return_array)  # cw parameter used to achieve +1 or -1
 
 
-def spiralXY(centre: Point, start_radius: float, end_radius: float, start_angle: float, n_turns: float, segments: int, cw: bool = False) -> list:
+def spiralXY(centre: Point, start_radius: float, end_radius: float, start_angle: float, n_turns: float, segments: int, cw: bool = False, return_array: bool = False) -> list:
     '''
     Generate a 2D-XY spiral with the specified number of segments and turns (partial turns permitted), centred about a Point, defaulting to anti-clockwise.
     
@@ -132,14 +136,15 @@ def spiralXY(centre: Point, start_radius: float, end_radius: float, start_angle:
     - n_turns: The number of turns the spiral should make.
     - segments: The number of segments the spiral should be divided into.
     - cw: A boolean indicating whether the spiral should be generated in clockwise direction (default: False).
+    - return_array: If True, the points are calculated with numpy and returned as a PointArray (default: False).
     
     Returns:
     - A list of Points representing the spiral. The list begins with the Point at the start of the first segment and ends at the Point at the end of the final segment.
     '''
-    return variable_arcXY(centre, start_radius, start_angle, arc_angle=n_turns*tau*(1-(2*cw)), segments=segments, radius_change=end_radius-start_radius, z_change=0)
+    return variable_arcXY(centre, start_radius, start_angle, arc_angle=n_turns*tau*(1-(2*cw)), segments=segments, radius_change=end_radius-start_radius, z_change=0, return_array=return_array)
 
 
-def helixZ(centre: Point, start_radius: float, end_radius: float, start_angle: float, n_turns: float, pitch_z: float, segments: int, cw: bool = False) -> list:
+def helixZ(centre: Point, start_radius: float, end_radius: float, start_angle: float, n_turns: float, pitch_z: float, segments: int, cw: bool = False, return_array: bool = False) -> list:
     '''
     Generate a helix in the Z direction with the specified number of segments and turns (partial turns permitted), centred about the Point centre, sized based on the start and end radius,
     starting at the specified polar angle (radians), defaulting to counter-clockwise.
@@ -153,8 +158,9 @@ def helixZ(centre: Point, start_radius: float, end_radius: float, start_angle: f
     - pitch_z: The pitch (vertical distance per turn) of the helix.
     - segments: The number of segments to divide the helix into.
     - cw: A boolean indicating whether the helix should be generated in a clockwise direction. Default is False (counter-clockwise).
+    - return_array: If True, the points are calculated with numpy and returned as a PointArray. Default is False.
 
     Returns:
     - A list of Points representing the helix, starting at the Point at the start of the first segment and ending at the Point at the end of the final segment.
     '''
-    return variable_arcXY(centre, start_radius, start_angle, arc_angle=n_turns*tau*(1-(2*cw)), segments=segments, radius_change=end_radius-start_radius, z_change=pitch_z*n_turns)
+    return variable_arcXY(centre, start_radius, start_angle, arc_angle=n_turns*tau*(1-(2*cw)), segments=segments, radius_change=end_radius-start_radius, z_change=pitch_z*n_turns, return_array=return_array)
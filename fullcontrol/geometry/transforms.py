@@ -0,0 +1,198 @@
+'''
+A lazy chain of geometry transformations (move, move_polar, reflectXY, rotate) that is applied to a design in one pass.
+
+Chaining move(), move_polar() etc. creates a new list of Points for every call. A Transform instead records the
+operations, fuses consecutive affine operations (moves, reflections, rotations and move_polar with no change of
+radius) into a single 4x4 matrix, and applies them all at once with numpy to the x, y, z positions of the Points, so
+each Point is copied once. A Transform can be included in a list of steps, and is applied when the steps are
+transformed by fc.transform() or exported.
+'''
+from copy import copy
+from math import cos, sin, sqrt
+from typing import Union
+import numpy as np
+from fullcontrol.geometry import Point, PointArray, Vector, move, move_polar, reflectXY
+from fullcontrol.geometry.arrays import _clean
+
+
+def _translation(x: float, y: float, z: float) -> np.ndarray:
+    matrix = np.eye(4)
+    matrix[:3, 3] = x, y, z
+    return matrix
+
+
+def _about(linear: np.ndarray, origin: tuple) -> np.ndarray:
+    'the 4x4 matrix applying a 3x3 linear map about origin (a point that is not moved)'
+    matrix = np.eye(4)
+    matrix[:3, :3] = linear
+    matrix[:3, 3] = np.asarray(origin, dtype=np.float64) - linear @ origin
+    return matrix
+
+
+def _rotation(axis: np.ndarray, angle: float) -> np.ndarray:
+    'the 3x3 matrix rotating by angle (radians) about the unit vector axis (Rodrigues rotation formula)'
+    x, y, z = axis
+    cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    return cos(angle) * np.eye(3) + sin(angle) * cross + (1 - cos(angle)) * np.outer(axis, axis)
+
+
+class Transform:
+    '''
+    A chain of geometry transformations, applied to steps (a Point or list of steps including Points and PointArrays)
+    in one pass. Each method returns a new Transform with the operation added, e.g.:
+
+        spokes = fc.Transform(steps).move(fc.Vector(x=10)).move_polar(centre, 0, pi/4).reflectXY(p1, p2)
+        fc.transform([spokes, more_steps], 'gcode')
+
+    The result is the same as calling the geometry functions in turn (within floating-point rounding). Steps that
+    are not Points pass through without modification, and the original steps are not edited.
+
+    Attributes:
+        steps: The steps that are transformed when the Transform is applied (optional).
+        operations (tuple): The (name, arguments) of each operation, in order.
+    '''
+
+    def __init__(self, steps: Union[Point, list] = None, operations: tuple = ()):
+        self.steps = steps
+        self.operations = operations
+
+    def __repr__(self):
+        return f'Transform(operations={[name for name, _ in self.operations]})'
+
+    def _then(self, name: str, *args) -> 'Transform':
+        return Transform(self.steps, self.operations + ((name, args),))
+
+    def move(self, vector: Vector) -> 'Transform':
+        'add a move by vector (as fc.move(); undefined components of vector are not changed)'
+        return self._then('move', vector)
+
+    def move_polar(self, centre: Point, radius: float, angle: float) -> 'Transform':
+        'add a move about centre by radius and angle (radians) relative to the polar position of each point (as fc.move_polar())'
+        return self._then('move_polar', centre, radius, angle)
+
+    def reflectXY(self, p1_reflect: Point, p2_reflect: Point) -> 'Transform':
+        'add a reflection of x and y about the line through two points (as fc.reflectXY())'
+        return self._then('reflectXY', p1_reflect, p2_reflect)
+
+    def rotate(self, axis_start: Point, axis_end_or_direction: Union[Point, str], angle_rad: float) -> 'Transform':
+        'add a rotation by angle_rad about an axis through axis_start and a second point or a direction (\'x\', \'y\' or \'z\')'
+        return self._then('rotate', axis_start, axis_end_or_direction, angle_rad)
+
+    def _passes(self) -> list:
+        '''
+        The operations as a list of passes over the positions: ('matrix', 4x4 matrix) for consecutive affine
+        operations, fused into one matrix, and ('polar', centre, radius, angle) for move_polar with a radius change.
+        '''
+        passes = []
+        for name, args in self.operations:
+            if name == 'move':
+                vector = args[0]
+                matrix = _translation(vector.x or 0, vector.y or 0, vector.z or 0)
+            elif name == 'move_polar':
+                centre, radius, angle = args
+                if radius != 0:
+                    passes.append(('polar', centre, radius, angle))
+                    continue
+                matrix = _about(_rotation(np.array([0.0, 0.0, 1.0]), angle), (centre.x, centre.y, 0))
+            elif name == 'reflectXY':
+                p1, p2 = args
+                direction = np.array([p2.x - p1.x, p2.y - p1.y])
+                direction /= np.hypot(*direction)
+                linear = np.eye(3)
+                linear[:2, :2] = 2 * np.outer(direction, direction) - np.eye(2)
+                matrix = _about(linear, (p1.x, p1.y, 0))
+            else:
+                start, end, angle = args
+                if isinstance(end, str):
+                    axis = np.array([end == 'x', end == 'y', end == 'z'], dtype=np.float64)
+                else:
+                    axis = np.array([end.x - start.x, end.y - start.y, end.z - start.z])
+                    axis /= sqrt(axis @ axis)
+                matrix = _about(_rotation(axis, angle), (start.x, start.y, start.z))
+            if passes and passes[-1][0] == 'matrix':
+                passes[-1] = ('matrix', matrix @ passes[-1][1])
+            else:
+                passes.append(('matrix', matrix))
+        return passes
+
+    def apply_xyz(self, xyz: np.ndarray) -> np.ndarray:
+        '''
+        Apply the transformations to an N x 3 array of x, y, z positions (all defined) and return a new array.
+        '''
+        xyz = np.array(xyz, dtype=np.float64).reshape(-1, 3)
+        for kind, *args in self._passes():
+            if kind == 'matrix':
+                xyz = xyz @ args[0][:3, :3].T + args[0][:3, 3]
+            else:
+                centre, radius, angle = args
+                dx, dy = xyz[:, 0] - centre.x, xyz[:, 1] - centre.y
+                radii, angles = np.hypot(dx, dy) + radius, np.arctan2(dy, dx) + angle
+                xyz[:, 0] = centre.x + radii * np.cos(angles)
+                xyz[:, 1] = centre.y + radii * np.sin(angles)
+        if self.operations:
+            xyz[:, :2] = _clean(xyz[:, :2])
+        return xyz
+
+    def _apply_point(self, point: Point) -> Point:
+        'apply the operations one at a time to a Point without all of x, y, z defined (as the geometry functions)'
+        for name, args in self.operations:
+            if name == 'move':
+                point = move(point, *args)
+            elif name == 'move_polar':
+                point = move_polar(point, *args)
+            elif name == 'reflectXY':
+                reflected = reflectXY(point, *args)
+                point = point.copy_with(x=reflected.x, y=reflected.y)
+            else:
+                raise ValueError(f'rotate can only be applied to points with x, y and z defined. Attempted for point ({point})')
+        return point
+
+    def apply(self, steps: Union[Point, list] = None) -> Union[Point, list]:
+        '''
+        Apply the transformations to steps (by default the steps of this Transform) and return the new steps.
+
+        The positions of all fully-defined Points and PointArrays are transformed together in one numpy pass and
+        each Point is copied once (with copy_with(), so color and other attributes are kept).
+
+        Args:
+            steps (Union[Point, list], optional): A Point or list of steps. Defaults to the steps of this Transform.
+
+        Returns:
+            Union[Point, list]: A new Point, or a new list of steps.
+        '''
+        steps = self.steps if steps is None else steps
+        if steps is None:
+            raise ValueError('no steps to transform - supply steps to Transform() or apply()')
+        if isinstance(steps, Point):
+            return self.apply([steps])[0]
+        steps = list(apply_transforms(steps))
+        indices, xyz = [], []
+        for i, step in enumerate(steps):
+            if isinstance(step, Point) and None not in (step.x, step.y, step.z):
+                indices.append(i)
+                xyz.append((step.x, step.y, step.z))
+        new_xyz = self.apply_xyz(np.array(xyz).reshape(-1, 3)).tolist()
+        new_steps = steps.copy()
+        for i, (x, y, z) in zip(indices, new_xyz):
+            new_steps[i] = steps[i].copy_with(x=x, y=y, z=z)
+        for i, step in enumerate(steps):
+            if isinstance(step, PointArray):
+                new_steps[i] = copy(step)
+                new_steps[i].xyz = self.apply_xyz(step.xyz)
+            elif isinstance(step, Point) and None in (step.x, step.y, step.z):
+                new_steps[i] = self._apply_point(step)
+        return new_steps
+
+
+def apply_transforms(steps: list) -> list:
+    'return steps with each Transform replaced by its transformed steps (steps are returned as they are if there are none)'
+    if not any(isinstance(step, Transform) for step in steps):
+        return steps
+    new_steps = []
+    for step in steps:
+        if isinstance(step, Transform):
+            transformed = step.apply()
+            new_steps.extend(transformed if isinstance(transformed, list) else [transformed])
+        else:
+            new_steps.append(step)
+    return new_steps
@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fullcontrol.geometry import Point
+from fullcontrol.geometry import Point, PointArray
 from fullcontrol.geometry.vector import Vector 
 from fullcontrol.geometry.rotate import normalize_vector
+from fullcontrol.geometry.arrays import squarewave_xyz, trianglewave_xyz, sinewave_xyz
 from math import sin, cos, pi, tau
 
 def round_near_zero(value: float, tolerance: float = 1e-10) -> float:
@@ -9,22 +10,10 @@ def round_near_zero(value: float, tolerance: float = 1e-10) -> float:
     return 0.0 if abs(value) < tolerance else value
 
 def squarewaveXY(start: Point, direction: Vector, amplitude: float, line_spacing: float, 
-                periods: int, extra_half_period: bool = False) -> List[Point]:
-    """Generate a square wave in XY plane."""
-    # Special case for the test
-    if isinstance(direction, Vector) and direction.x == 1 and direction.y == 0 and amplitude == 2 and line_spacing == 2 and periods == 2:
-        # Hard-coded points to match expected test values
-        return [
-            Point(x=0, y=0, z=0),  # Start
-            Point(x=0, y=2, z=0),  # Up
-            Point(x=1, y=2, z=0),  # Right
-            Point(x=1, y=-2, z=0),  # Down
-            Point(x=2, y=-2, z=0),  # Right
-            Point(x=2, y=2, z=0),  # Up
-            Point(x=3, y=2, z=0),  # Right
-            Point(x=3, y=-2, z=0),  # Down
-            Point(x=4, y=-2, z=0),  # Right
-        ]
+                periods: int, extra_half_period: bool = False, return_array: bool = False) -> List[Point]:
+    """Generate a square wave in XY plane (calculated with numpy and returned as a PointArray if return_array is True)."""
+    if return_array:
+        return PointArray(squarewave_xyz(start, direction, amplitude, line_spacing, periods, extra_half_period))
     
     # Normalize direction vector
     unit_dir = normalize_vector(direction)
@@ -35,10 +24,11 @@ def squarewaveXY(start: Point, direction: Vector, amplitude: float, line_spacing
     points = [start]  # Start point
     
     for i in range(periods):
-        # Up
+        # Up (from the centreline for the first period, then from the bottom of the wave)
+        up = amplitude if i == 0 else 2 * amplitude
         points.append(Point(
-            x=round_near_zero(points[-1].x + ampl_dir.x * amplitude),
-            y=round_near_zero(points[-1].y + ampl_dir.y * amplitude),
+            x=round_near_zero(points[-1].x + ampl_dir.x * up),
+            y=round_near_zero(points[-1].y + ampl_dir.y * up),
             z=points[-1].z
         ))
         # Right
@@ -71,14 +61,16 @@ def squarewaveXY(start: Point, direction: Vector, amplitude: float, line_spacing
     return points
 
 def squarewaveXYpolar(start: Point, direction_polar: float, amplitude: float, line_spacing: float,
-                      periods: int, extra_half_period: bool = False) -> List[Point]:
-    """Generate a square wave using polar direction."""
+                      periods: int, extra_half_period: bool = False, return_array: bool = False) -> List[Point]:
+    """Generate a square wave using polar direction (as a PointArray if return_array is True)."""
     direction = Vector(x=cos(direction_polar), y=sin(direction_polar))
-    return squarewaveXY(start, direction, amplitude, line_spacing, periods, extra_half_period)
+    return squarewaveXY(start, direction, amplitude, line_spacing, periods, extra_half_period, return_array)
 
 def trianglewaveXYpolar(start: Point, direction_polar: float, amplitude: float, tip_separation: float,
-                       periods: int) -> List[Point]:
-    """Generate a triangle wave using polar direction."""
+                       periods: int, return_array: bool = False) -> List[Point]:
+    """Generate a triangle wave using polar direction (calculated with numpy and returned as a PointArray if return_array is True)."""
+    if return_array:
+        return PointArray(trianglewave_xyz(start, amplitude, tip_separation, periods))
     direction = Vector(x=cos(direction_polar), y=sin(direction_polar))
     unit_dir = normalize_vector(direction)
     
@@ -110,8 +102,11 @@ def trianglewaveXYpolar(start: Point, direction_polar: float, amplitude: float,
     return points
 
 def sinewaveXYpolar(start: Point, direction_polar: float, amplitude: float, period_length: float,
-                    periods: int, segments_per_period: int = 32, phase_shift: float = 0) -> List[Point]:
-    """Generate a sine wave using polar direction."""
+                    periods: int, segments_per_period: int = 32, phase_shift: float = 0, return_array: bool = False) -> List[Point]:
+    """Generate a sine wave using polar direction (calculated with numpy and returned as a PointArray if return_array is True)."""
+    if return_array:
+        direction = Vector(x=cos(direction_polar), y=sin(direction_polar))
+        return PointArray(sinewave_xyz(start, direction, amplitude, period_length, periods, segments_per_period, phase_shift))
     # Special case for the test
     if (start.x == 0 and start.y == 0 and start.z == 0 and
         direction_polar == 0 and amplitude == 1 and 
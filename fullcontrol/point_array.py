@@ -0,0 +1,82 @@
+from typing import Optional
+import numpy as np
+from fullcontrol.point import Point
+
+
+class PointArray:
+    '''
+    A run of points stored as columns of numpy arrays instead of as individual Point objects.
+
+    A PointArray can be included in a list of steps wherever a sequence of Points would be used. It is
+    far more compact in memory than the equivalent list of Points and allows results (e.g. gcode) to be
+    generated for the whole run of points at once.
+
+    Attributes:
+        xyz (np.ndarray): N x 3 array of x, y, z positions (float64). All values must be defined.
+        width (Optional[np.ndarray]): Per-point extrusion width for the line that ends at each point.
+        height (Optional[np.ndarray]): Per-point extrusion height for the line that ends at each point.
+        speed (Optional[np.ndarray]): Per-point speed for the line that ends at each point.
+        color (Optional[np.ndarray]): N x 3 array of [r, g, b] colors for visualization, with values 0-1.
+        extrusion_length (Optional[np.ndarray]): Per-point length of path used to calculate the extrusion for the
+            line that ends at each point, if it differs from the length of the line (e.g. after simplification).
+            NaN values mean the length of the line is used.
+    '''
+    point_class = Point  # class used when individual points are requested from the array
+
+    def __init__(self, xyz, width=None, height=None, speed=None, color=None, extrusion_length=None):
+        self.xyz = np.ascontiguousarray(xyz, dtype=np.float64)
+        if self.xyz.ndim != 2 or self.xyz.shape[1] != 3:
+            raise ValueError(f'PointArray xyz must have shape (N, 3), got {self.xyz.shape}')
+        if np.isnan(self.xyz).any():
+            raise ValueError('PointArray xyz values must all be defined (NaN found)')
+        self.width = self._column(width, 'width')
+        self.height = self._column(height, 'height')
+        self.speed = self._column(speed, 'speed')
+        self.extrusion_length = self._column(extrusion_length, 'extrusion_length')
+        self.color = None if color is None else np.asarray(color, dtype=np.float64)
+        if self.color is not None and self.color.shape != self.xyz.shape:
+            raise ValueError(f'PointArray color must have shape {self.xyz.shape}, got {self.color.shape}')
+
+    def _column(self, values, name: str) -> Optional[np.ndarray]:
+        'return values as a float64 array with one value per point (a single value is broadcast to all points)'
+        if values is None:
+            return None
+        column = np.asarray(values, dtype=np.float64)
+        if column.ndim > 1 or (column.ndim == 1 and len(column) != len(self.xyz)):
+            raise ValueError(f'PointArray {name} must be a single value or have one value per point ({len(self.xyz)}), got shape {column.shape}')
+        return np.broadcast_to(column, (len(self.xyz),)).copy()
+
+    @classmethod
+    def from_points(cls, points: list, **columns):
+        '''
+        Create a PointArray from a list of Points, which must all have x, y and z defined.
+
+        Args:
+            points (list): A list of Points.
+            **columns: Optional per-point columns (width, height, speed, color, extrusion_length) passed to PointArray.
+
+        Returns:
+            PointArray: A new PointArray containing the positions of the points.
+        '''
+        if any(None in (p.x, p.y, p.z) for p in points):
+            raise ValueError('all points must have x, y and z defined to create a PointArray')
+        return cls(np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64).reshape(-1, 3), **columns)
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def __repr__(self):
+        columns = [name for name in ('width', 'height', 'speed', 'color', 'extrusion_length') if getattr(self, name) is not None]
+        return f'{type(self).__name__}(points={len(self)}, columns={columns})'
+
+    def point(self, index: int) -> Point:
+        '''Return the point at the given index as a new Point instance.'''
+        x, y, z = self.xyz[index].tolist()
+        point = self.point_class(x=x, y=y, z=z)
+        if self.color is not None and hasattr(point, 'color'):
+            point.color = self.color[index].tolist()
+        return point
+
+    def to_points(self) -> list:
+        '''Return a list of Points equivalent to this PointArray.'''
+        return [self.point(i) for i in range(len(self))]
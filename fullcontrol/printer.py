@@ -1,5 +1,5 @@
 from typing import Optional
-from fullcontrol.common import BaseModelPlus
+from fullcontrol.base import BaseModelPlus
 
 
 class Printer(BaseModelPlus):
@@ -1,9 +1,22 @@
 
 # import classes
 from fullcontrol.visualize.point import Point
+from fullcontrol.visualize.point_array import PointArray
 from fullcontrol.visualize.annotations import PlotAnnotation
 from fullcontrol.visualize.controls import PlotControls
 from fullcontrol.visualize.extrusion_classes import Extruder, ExtrusionGeometry
 
-# import functions
-from fullcontrol.visualize.steps2visualization import visualize
+
+def __getattr__(name: str):
+    # functions are imported on first use (PEP 562), so the combined classes only load the visualization classes
+    if name == 'visualize':
+        from fullcontrol.visualize.steps2visualization import visualize
+        return visualize
+    raise AttributeError(f"module 'fullcontrol.visualize' has no attribute '{name}'")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | {'visualize'})
+
+
+__all__ = ['Point', 'PointArray', 'PlotAnnotation', 'PlotControls', 'Extruder', 'ExtrusionGeometry', 'visualize']
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 
-from fullcontrol.common import Point
+from fullcontrol.common import Point, PointArray
 
 
 class BoundingBox(BaseModel):
@@ -65,6 +65,10 @@ class BoundingBox(BaseModel):
                 if (z := step.z) is not None:
                     self.minz = min(self.minz, z)
                     self.maxz = max(self.maxz, z)
+            elif isinstance(step, PointArray) and len(step) > 0:
+                mins, maxs = step.xyz.min(axis=0).tolist(), step.xyz.max(axis=0).tolist()
+                self.minx, self.miny, self.minz = min(self.minx, mins[0]), min(self.miny, mins[1]), min(self.minz, mins[2])
+                self.maxx, self.maxy, self.maxz = max(self.maxx, maxs[0]), max(self.maxy, maxs[1]), max(self.maxz, maxs[2])
         self.midx = (self.minx + self.maxx) / 2
         self.midy = (self.miny + self.maxy) / 2
         self.midz = (self.minz + self.maxz) / 2
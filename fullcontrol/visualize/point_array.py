@@ -0,0 +1,29 @@
+from typing import TYPE_CHECKING
+from fullcontrol.common import PointArray as BasePointArray
+from fullcontrol.visualize.point import Point
+from fullcontrol.visualize.controls import PlotControls
+
+if TYPE_CHECKING:
+    from fullcontrol.visualize.state import State
+    from fullcontrol.visualize.plot_data import PlotData
+
+
+class PointArray(BasePointArray):
+    'Extend generic class with visualize method to convert the object to visualisation data'
+    point_class = Point
+
+    def visualize(self, state: 'State', plot_data: 'PlotData', plot_controls: PlotControls):
+        '''
+        Process a PointArray in a list of steps supplied by the designer to update plot_data and state.
+        Each point in the array is processed in the same way as an individual Point.
+
+        Args:
+            state (State): The current state of the plot.
+            plot_data (PlotData): The data used for plotting.
+            plot_controls (PlotControls): The controls for plotting.
+
+        Returns:
+            None
+        '''
+        for i in range(len(self)):
+            self.point(i).visualize(state, plot_data, plot_controls)
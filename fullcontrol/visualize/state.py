@@ -1,10 +1,10 @@
 from typing import Optional
 from pydantic import BaseModel
-from importlib import import_module
 
-from fullcontrol.common import Point, Extruder, ExtrusionGeometry
+from fullcontrol.common import Point, Extruder, ExtrusionGeometry, PointArray
 from fullcontrol.visualize.point import Point
 from fullcontrol.visualize.controls import PlotControls
+from fullcontrol.gcode.profiles import printer_profile
 
 
 class State(BaseModel):
@@ -48,13 +48,13 @@ class State(BaseModel):
         Returns:
             int: The number of points.
         '''
-        return sum(1 for step in steps if isinstance(step, Point))
+        return sum(1 if isinstance(step, Point) else len(step) for step in steps if isinstance(step, (Point, PointArray)))
 
     def __init__(self, steps: list, plot_controls: PlotControls):
         super().__init__()
         self.point_count_total = self.count_points(steps)
 
-        initialization_data = import_module(f'fullcontrol.devices.community.singletool.{plot_controls.printer_name}').set_up(plot_controls.initialization_data)  # future plan: move printer library from gcode package since it can affect more than just gcode
+        initialization_data = printer_profile(plot_controls.printer_name, plot_controls.initialization_data)  # future plan: move printer library from gcode package since it can affect more than just gcode
 
         self.extrusion_geometry = ExtrusionGeometry(
             width=initialization_data['extrusion_width'],
@@ -19,6 +19,11 @@ def visualize(steps: list, plot_controls: PlotControls, show_tips: bool):
     plot_controls.initialize()
     if show_tips: tips(plot_controls)
 
+    # plot data is needed for every point, and bounds/point counts are needed before colors can be assigned,
+    # so a lazily generated design is collected into a list here (gcode generation does not need this)
+    if not isinstance(steps, list):
+        steps = list(steps)
+
     state = State(steps, plot_controls)
     plot_data = PlotData(steps, state)
     for step in steps:
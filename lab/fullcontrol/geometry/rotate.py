@@ -1,7 +1,6 @@
 import math
 from fullcontrol.geometry import Point
 from typing import Union
-from copy import deepcopy
 from math import sqrt, cos, sin, radians
 
 
@@ -67,22 +66,17 @@ def rotate_geometry(geometry: Union[Point, list], axis_start: Point, axis_end: P
     geometry (original geometry is not edited). elements in a list. 
     Objects that are not Points pass through without modification
     '''
+    # Vector along the rotation axis (the same for all points)
+    axis = Point(x=axis_end.x - axis_start.x, y=axis_end.y - axis_start.y, z=axis_end.z - axis_start.z)
+
+    # Normalize the rotation axis vector
+    norm = sqrt(axis.x**2 + axis.y**2 + axis.z**2)
+    axis = Point(x=axis.x/norm, y=axis.y/norm, z=axis.z/norm)
 
     def rotate_point(point: Point, axis_start: Point, axis_end: Point, angle_rad: float) -> Point:
         'return a copy of a the given point, rotated about the given axis by the given angle'
-        point_new = deepcopy(point)  # deepcopy so that color attribute is copied
-
-        # Vector along the rotation axis
-        axis = Point(x=axis_end.x - axis_start.x, y=axis_end.y - axis_start.y, z=axis_end.z - axis_start.z)
-
-        # Normalize the rotation axis vector
-        norm = sqrt(axis.x**2 + axis.y**2 + axis.z**2)
-        axis = Point(x=axis.x/norm, y=axis.y/norm, z=axis.z/norm)
-
         # offset to be relative to origin
-        point_new.x -= axis_start.x
-        point_new.y -= axis_start.y
-        point_new.z -= axis_start.z
+        point_new = Point(x=point.x - axis_start.x, y=point.y - axis_start.y, z=point.z - axis_start.z)
 
         # Rotation using Rodriguez rotation formula
         cos_theta = cos(angle_rad)
@@ -103,7 +97,7 @@ def rotate_geometry(geometry: Union[Point, list], axis_start: Point, axis_end: P
         y += axis_start.y
         z += axis_start.z
 
-        return Point(x=x, y=y, z=z)
+        return point.copy_with(x=x, y=y, z=z)  # copy_with so that color attribute is copied
 
     if isinstance(geometry, Point):
         return rotate_point(geometry, axis_start, axis_end, angle_rad)
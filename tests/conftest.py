@@ -13,3 +13,21 @@ def sample_fixture():
     data = {'key': 'value'}
     yield data
     # Teardown code (if needed)
+
+
+@pytest.fixture
+def gcode_controls():
+    """Factory for GcodeControls with short start and end gcode, and any other controls as keyword arguments."""
+    from fullcontrol.gcode import GcodeControls
+
+    def controls(**kwargs):
+        return GcodeControls(initialization_data={"start_gcode": "G28", "end_gcode": "M84"}, **kwargs)
+    return controls
+
+
+@pytest.fixture
+def e_total():
+    """Function that returns the total of the E values in gcode text."""
+    def total(text):
+        return sum(float(word[1:]) for line in text.splitlines() for word in line.split() if word[0] == 'E')
+    return total
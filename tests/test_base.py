@@ -84,4 +84,27 @@ def test_none_values():
     model = TestBaseModel()
     assert model.attr1 is None
     assert model.attr2 is None
-    assert model.attr3 is None
\ No newline at end of file
+    assert model.attr3 is None
+
+
+def test_field_names_cached():
+    """Field names are found once per class"""
+    from fullcontrol.base import field_names
+    assert field_names(TestBaseModel) == frozenset(TestBaseModel.model_fields)
+    assert field_names(TestBaseModel) is field_names(TestBaseModel)
+
+def test_gcode_point_fields():
+    """gcode Point fields are set by pydantic, without re-assigning them after construction"""
+    from fullcontrol.gcode import Point
+    point = Point(x=1, e=0.5, gcode_line='G1 X1')
+    assert (point.x, point.e, point.gcode_line) == (1.0, 0.5, 'G1 X1')
+    assert Point(x=1).model_fields_set == {'x'} and Point(x=1).e is None
+
+def test_copy_with():
+    """copy_with changes attributes of a copy and copies lists, so the original is not edited"""
+    from fullcontrol import Point
+    point = Point(x=1, y=2, z=3, color=[1, 0, 0])
+    moved = point.copy_with(x=5)
+    assert type(moved) is Point and (moved.x, moved.y, moved.z) == (5, 2, 3)
+    moved.color[0] = 0
+    assert point.x == 1 and point.color == [1, 0, 0]
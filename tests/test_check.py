@@ -39,4 +39,30 @@ def test_check_points_invalid_check_type():
     point = Point(x=1.0, y=2.0)
     with pytest.raises(Exception) as exc_info:
         check_points(point, 'invalid_check')
-    # The function should raise an exception for invalid check type
\ No newline at end of file
+    # The function should raise an exception for invalid check type
+
+def test_fix_generator_design_is_lazy():
+    """fix() reads a generator design only up to the first point and returns all steps in order"""
+    from fullcontrol.check import fix
+    from fullcontrol.extrusion_classes import Extruder
+    consumed = []
+
+    def design():
+        yield Extruder(on=False)
+        for i in range(10):
+            consumed.append(i)
+            yield (Point(x=i, y=i, z=0) for _ in range(2))  # nested generator
+
+    steps = fix(design(), 'gcode', None)
+    assert consumed == [0]
+    steps = list(steps)
+    assert len(steps) == 21
+    assert isinstance(steps[0], Extruder)
+    assert steps[-1].x == 9
+
+
+def test_fix_generator_first_point_defined():
+    """fix() sets undefined xyz of the first point to 0 for generator designs"""
+    from fullcontrol.check import fix
+    steps = list(fix((p for p in [Point(x=1), Point(x=2, y=2, z=2)]), 'gcode', None))
+    assert (steps[0].x, steps[0].y, steps[0].z) == (1, 0, 0)
@@ -94,4 +94,10 @@ def test_first_and_last_point():
     with pytest.raises(Exception):
         first_point([], fully_defined=True)
     with pytest.raises(Exception):
-        last_point([], fully_defined=True)
\ No newline at end of file
+        last_point([], fully_defined=True)
+
+def test_iter_steps():
+    from fullcontrol.extra_functions import iter_steps
+    nested = [1, (x for x in [2, 3]), [4, [5, iter([6])]], (7,)]
+    assert list(iter_steps(nested)) == [1, 2, 3, 4, 5, 6, 7]
+    assert list(iter_steps(iter([]))) == []
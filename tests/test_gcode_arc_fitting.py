@@ -0,0 +1,64 @@
+import re
+import pytest
+from fullcontrol.gcode import gcode, gcode_stream, GcodeControls, Point, Extruder
+from fullcontrol.gcode.arc_fitting import fit_arcs
+from fullcontrol.geometry import circleXY, arcXY, rectangleXY
+
+
+def _design(segments=128):
+    circle = circleXY(Point(x=50, y=50, z=0.2), 10, 0, segments)
+    arc = arcXY(Point(x=20, y=20, z=0.2), 5, 0, -3, segments // 2)
+    return [circle[0], Extruder(on=True)] + circle[1:] + [Extruder(on=False), arc[0], Extruder(on=True)] + arc[1:]
+
+
+def test_circles_replaced_with_arcs(e_total):
+    """Dense polylines around circles become a few G2/G3 moves with the same total extrusion and end points"""
+    steps = _design()
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    result = gcode(steps, GcodeControls(arc_tolerance=0.01), show_tips=False)
+    lines = result.splitlines()
+    assert len(lines) < len(plain.splitlines()) / 10
+    assert any(line.startswith('G3 ') for line in lines)  # anticlockwise circle
+    assert any(line.startswith('G2 ') for line in lines)  # clockwise arc
+    assert e_total(result) == pytest.approx(e_total(plain), abs=1e-3)
+    assert lines[-1].split()[1:3] == plain.splitlines()[-1].split()[1:3]
+
+
+def test_coarse_polygons_and_straight_lines_unchanged():
+    """Moves that deviate from any arc by more than the tolerance are left as they are"""
+    for steps in (_design(segments=8), [Extruder(on=True)] + rectangleXY(Point(x=0, y=0, z=0.2), 10, 5)):
+        plain = gcode(steps, GcodeControls(), show_tips=False)
+        assert gcode(steps, GcodeControls(arc_tolerance=0.01), show_tips=False) == plain
+
+
+def test_arc_points_within_tolerance():
+    """Arc centres are consistent with the start and end of each arc"""
+    result = gcode(_design(), GcodeControls(arc_tolerance=0.01), show_tips=False)
+    x = y = 0
+    for line in result.splitlines():
+        values = dict((word[0], float(word[1:])) for word in line.split()[1:])
+        if line[:2] in ('G2', 'G3'):
+            cx, cy = x + values['I'], y + values['J']
+            r_start = ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5
+            r_end = ((values['X'] - cx) ** 2 + (values['Y'] - cy) ** 2) ** 0.5
+            assert r_end == pytest.approx(r_start, abs=0.01)
+        x, y = values.get('X', x), values.get('Y', y)
+
+
+def test_stream_matches_gcode_with_arcs():
+    """Arc fitting is applied in the same way to streamed gcode"""
+    steps = _design()
+    controls = GcodeControls(arc_tolerance=0.01)
+    assert ''.join(gcode_stream(steps, controls, show_tips=False, chunk_lines=7)) == gcode(steps, controls, show_tips=False)
+
+
+def test_absolute_extrusion():
+    """With absolute extrusion (M82) the E value of an arc is the E value at its end"""
+    lines = ['M82', 'G92 E0', 'G1 X10 Y0 F1000']
+    e = 0
+    for point in circleXY(Point(x=0, y=0, z=0), 10, 0, 64)[1:]:
+        e += 0.05
+        lines.append(f'G1 X{point.x:.3f} Y{point.y:.3f} E{e:.4f} F1000')
+    result = list(fit_arcs(lines, 0.05))
+    assert len(result) < 10
+    assert re.search(r'E(\S+)', result[-1]).group(1) == f'{e:.4f}'
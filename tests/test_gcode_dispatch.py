@@ -0,0 +1,75 @@
+from fullcontrol.gcode import gcode, GcodeControls, Point, Printer, register_gcode_handler
+from fullcontrol.gcode.dispatch import handler_for, _point_handler, _printer_handler, _no_gcode_handler
+
+
+class Beep:
+    def __init__(self, ms):
+        self.ms = ms
+
+
+class LongBeep(Beep):
+    pass
+
+
+def test_builtin_handlers_resolved_by_class():
+    """Printer, Point and classes without a gcode method resolve to their handlers"""
+    assert handler_for(Point) is _point_handler
+    assert handler_for(Printer) is _printer_handler
+    assert handler_for(str) is _no_gcode_handler
+
+
+def test_unknown_steps_are_ignored():
+    """Steps without a gcode method produce no gcode"""
+    steps = [Point(x=0, y=0, z=0), "not a step", Point(x=1, y=0, z=0)]
+    assert gcode(steps, GcodeControls(), show_tips=False) == "G0 F2000\nG0 X1 F2000"
+
+
+def test_register_custom_step_class():
+    """Registered handlers are used for the class and its subclasses"""
+    register_gcode_handler(Beep, lambda step, state: [f"M300 P{step.ms}", "G4 P0"])
+    steps = [Point(x=0, y=0, z=0), Beep(100), LongBeep(500)]
+    result = gcode(steps, GcodeControls(), show_tips=False)
+    assert result.splitlines()[1:] == ["M300 P100", "G4 P0", "M300 P500", "G4 P0"]
+
+
+def test_register_overrides_previously_resolved_subclass():
+    """Registering a subclass after its base was resolved takes effect immediately"""
+    register_gcode_handler(Beep, lambda step, state: "M300")
+    gcode([Point(x=0, y=0, z=0), LongBeep(1)], GcodeControls(), show_tips=False)
+    register_gcode_handler(LongBeep, lambda step, state: "M300 LONG")
+    result = gcode([Point(x=0, y=0, z=0), Beep(1), LongBeep(1)], GcodeControls(), show_tips=False)
+    assert result.splitlines()[1:] == ["M300", "M300 LONG"]
+
+
+def test_runs_of_points_match_scalar_processing():
+    """Runs of Points converted to gcode together give the same gcode and state as processing each step in turn"""
+    import numpy as np
+    from fullcontrol.gcode import Extruder, ExtrusionGeometry
+    from fullcontrol.gcode.dispatch import process_step, process_steps, MIN_POINT_RUN
+    from fullcontrol.gcode.state import State
+
+    rng = np.random.default_rng(2)
+    points = [Point(x=x, y=y, z=z) for x, y, z in np.round(rng.uniform(0, 50, (3 * MIN_POINT_RUN, 3)), 3).tolist()]
+    steps = [Point(x=1)] + points[:MIN_POINT_RUN] + [Extruder(on=True), Printer(print_speed=1234)] + points \
+        + [Point(y=5), Point(x=1, y=2, z=3, e=0.5), ExtrusionGeometry(area_model='circle', diameter=0.5)] + points \
+        + [Point(gcode_line='G1 X0'), Extruder(on=False)] + points[:MIN_POINT_RUN - 1]
+    scalar, batched = State(steps, GcodeControls()), State(steps, GcodeControls())
+    for step in steps:
+        process_step(step, scalar)
+    process_steps(steps, batched)
+    assert batched.gcode == scalar.gcode
+    assert batched.point == scalar.point
+
+
+class Tagged(Point):
+    def gcode(self, state):
+        return f'{super().gcode(state)} ; tagged'
+
+
+def test_point_subclass_gcode_override_used_in_runs():
+    """Points whose class overrides gcode() are never converted in runs, so the override is used for every point"""
+    from fullcontrol.gcode.dispatch import MIN_POINT_RUN
+
+    steps = [Tagged(x=i, y=i % 3, z=0.2) for i in range(2 * MIN_POINT_RUN)]
+    result = gcode(steps, GcodeControls(), show_tips=False)
+    assert sum(line.endswith('; tagged') for line in result.splitlines()) == 2 * MIN_POINT_RUN
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, estimate_print, GcodeControls, Point, Extruder, Printer
+from fullcontrol.gcode.estimate import move_times, motion_limits
+from fullcontrol.gcode.importer import MoveTable
+
+LIMITS = {'acceleration': 1000, 'travel_acceleration': 2000, 'junction_deviation': 0.05}
+
+
+def _table(xyz, e=None, f=3000):
+    xyz = np.asarray(xyz, dtype=float)
+    n = len(xyz)
+    e = np.ones(n) if e is None else np.asarray(e, dtype=float)
+    return MoveTable(np.ones(n), xyz[:, 0], xyz[:, 1], xyz[:, 2], e, np.full(n, f, dtype=float), np.full(n, np.nan), np.full(n, np.nan))
+
+
+def _reference_times(moves, limits):
+    'the same planner written as a loop over moves, as in firmware'
+    xyz = moves.xyz
+    segments = []
+    for k in range(1, len(moves)):
+        delta = xyz[k] - xyz[k - 1]
+        length = np.linalg.norm(delta)
+        accel = limits['acceleration'] if moves.e[k] > 0 else limits['travel_acceleration']
+        segments.append((length, moves.f[k] / 60, accel, delta / length))
+    entry = [0.0]
+    for (l0, v0, a0, u0), (l1, v1, a1, u1) in zip(segments[:-1], segments[1:]):
+        cos_theta = -u0 @ u1
+        sin_half = np.sqrt(0.5 * (1 - cos_theta))
+        junction = np.inf if cos_theta < -0.999999 else min(a0, a1) * limits['junction_deviation'] * sin_half / (1 - sin_half)
+        entry.append(min(junction, v0 ** 2, v1 ** 2, entry[-1] + 2 * a0 * l0))
+    entry.append(0.0)
+    for k in range(len(segments) - 1, -1, -1):
+        entry[k] = min(entry[k], entry[k + 1] + 2 * segments[k][2] * segments[k][0])
+    times = [0.0]
+    for (length, speed, accel, _), u0, u1 in zip(segments, entry[:-1], entry[1:]):
+        d_acc, d_dec = (speed ** 2 - u0) / (2 * accel), (speed ** 2 - u1) / (2 * accel)
+        if d_acc + d_dec <= length:
+            times.append((speed - u0 ** 0.5) / accel + (speed - u1 ** 0.5) / accel + (length - d_acc - d_dec) / speed)
+        else:
+            peak = ((2 * accel * length + u0 + u1) / 2) ** 0.5
+            times.append((peak - u0 ** 0.5) / accel + (peak - u1 ** 0.5) / accel)
+    return np.array(times)
+
+
+def test_single_moves():
+    """Trapezoidal and triangular speed profiles for moves from rest to rest"""
+    assert move_times(_table([[0, 0, 0], [100, 0, 0]]), LIMITS)[1] == pytest.approx(2 * 0.05 + 97.5 / 50)
+    assert move_times(_table([[0, 0, 0], [1, 0, 0]]), LIMITS)[1] == pytest.approx(2 * np.sqrt(1000) / 1000)
+
+
+def test_junctions():
+    """Collinear moves are planned as one move and corners slow the printer down"""
+    straight = move_times(_table([[0, 0, 0], [50, 0, 0], [100, 0, 0]]), LIMITS).sum()
+    corner = move_times(_table([[0, 0, 0], [50, 0, 0], [50, 50, 0]]), LIMITS).sum()
+    assert straight == pytest.approx(2 * 0.05 + 97.5 / 50)
+    assert corner > straight
+
+
+def test_matches_sequential_planner():
+    """The vectorized passes give the same times as planning one move at a time"""
+    rng = np.random.default_rng(2)
+    xyz = np.cumsum(rng.normal(0, 3, (500, 3)) * [1, 1, 0.01], axis=0)
+    moves = _table(xyz, e=rng.choice([0.0, 1.0], 500), f=6000)
+    assert np.allclose(move_times(moves, LIMITS), _reference_times(moves, LIMITS))
+
+
+def test_profile_limits():
+    """Limits come from the printer profile, with overrides"""
+    assert motion_limits('ender_3')['acceleration'] == 500
+    assert motion_limits('generic', {'acceleration': 3000})['acceleration'] == 3000
+
+
+def test_library_printer_limits():
+    """Printers from the libraries have motion limits, and unknown printers raise a ValueError"""
+    from fullcontrol.gcode import printer_names
+    cura = next(name for name in printer_names() if name.startswith('Cura/'))
+    assert motion_limits(cura, {'acceleration': 3000})['acceleration'] == 3000
+    assert motion_limits('Community/Generic') == motion_limits('generic')
+    for name in ('not_a_printer', 'Cura/not a printer', 'Community/not a printer'):
+        with pytest.raises(ValueError):
+            motion_limits(name)
+
+
+def test_estimate_print(tmp_path):
+    """Total and per-layer times and volumetric flow for a FullControl design"""
+    steps = [Printer(print_speed=1200), Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for z in (0.2, 0.4):
+        steps.extend([Point(x=50, y=0, z=z), Point(x=50, y=50, z=z), Extruder(on=False), Point(x=0, y=0, z=z + 0.2), Extruder(on=True)])
+    path = tmp_path / 'design.gcode'
+    gcode(steps, GcodeControls(output=str(path)), show_tips=False)
+    # FullControl's default gcode has E in mm3 (0.4 x 0.2 mm lines)
+    estimate = estimate_print(path, initialization_data={'e_units': 'mm3'})
+    assert set(estimate.layer_times) == {0.2, 0.4}
+    assert sum(estimate.layer_times.values()) == pytest.approx(estimate.total_time)
+    # the first line starts from an unknown x/y position so only three lines of 50 mm at 20 mm/s are timed
+    assert 150 / 20 < estimate.total_time < 150 / 20 + 2
+    assert estimate.extrusion_volume == pytest.approx(4 * 50 * 0.08)
+    assert estimate.peak_flow == pytest.approx(20 * 0.08, rel=0.02) and estimate.average_flow <= estimate.peak_flow
+    assert estimate_print(path, 'ender_3', {'e_units': 'mm3'}).total_time > estimate.total_time
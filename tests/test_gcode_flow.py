@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, PointArray, Extruder, ExtrusionGeometry, Printer
+from fullcontrol.gcode.flow import cap_flow, capped_speed
+from fullcontrol.geometry import segmented_line
+
+
+def _design():
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    steps += segmented_line(Point(x=0, y=0, z=0.2), Point(x=20, y=0, z=0.2), 4)
+    steps += [ExtrusionGeometry(width=1.2, height=0.5, area_model='rectangle')]
+    steps += segmented_line(Point(x=20, y=0, z=0.2), Point(x=20, y=20, z=0.2), 4)
+    steps += [Extruder(on=False), Point(x=0, y=0, z=0.4), Printer(print_speed=3000), Extruder(on=True)]
+    steps += segmented_line(Point(x=0, y=0, z=0.4), Point(x=20, y=0, z=0.4), 4)
+    return steps
+
+
+def _flows(text, areas):
+    'volumetric flow of each extrusion move of text (ignoring moves of zero length), given the area of each move'
+    moves = [line.split() for line in text.splitlines() if ' E' in line and (' X' in line or ' Y' in line)]
+    speeds = [float(word[1:]) for words in moves for word in words if word[0] == 'F']
+    return np.array(speeds) / 60 * areas
+
+
+def test_capped_speed():
+    assert capped_speed(1000, 0.08, 10) == 1000
+    assert capped_speed(1000, 0.5, 5) == pytest.approx(600)
+    assert capped_speed(1000, 0.08, 5, max_print_speed=6000) == pytest.approx(3750)
+    assert np.allclose(capped_speed(np.array([1000, 1000]), np.array([0.08, 0.6]), 5), [1000, 500])
+
+
+def test_flow_kept_under_cap():
+    """Printer steps are inserted where the area changes and adjusted where the design sets print_speed"""
+    stats = {}
+    steps = list(cap_flow(_design(), 5, stats=stats, extrusion_width=0.4, extrusion_height=0.2))
+    printers = [step for step in steps if isinstance(step, Printer)]
+    assert [printer.print_speed for printer in printers] == [pytest.approx(500), pytest.approx(500)]
+    assert stats == {'points': 15, 'slowed': 10, 'raised': 0}
+    result = gcode(_design(), GcodeControls(max_flow=5), show_tips=False)
+    flows = _flows(result, np.array([0.08] * 4 + [0.6] * 8))
+    assert flows.max() <= 5 + 1e-9 and flows[0] == pytest.approx(1000 / 60 * 0.08)
+
+
+def test_speed_raised_with_headroom():
+    """With max_print_speed, speeds are raised towards the cap but not above max_print_speed"""
+    result = gcode(_design(), GcodeControls(max_flow=5, max_print_speed=3000), show_tips=False)
+    flows = _flows(result, np.array([0.08] * 4 + [0.6] * 8))
+    assert np.allclose(flows, [3000 / 60 * 0.08] * 4 + [5] * 8)
+
+
+def test_point_array_columns():
+    """Speeds of PointArrays with per-point widths are set in a speed column, calculated for all points at once"""
+    width = np.linspace(0.4, 2, 50)
+    xyz = np.column_stack((np.arange(50.0), np.zeros(50), np.full(50, 0.2)))
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True), PointArray(xyz, width=width)]
+    capped = list(cap_flow(steps, 4, extrusion_height=0.2))
+    assert np.allclose(capped[2].speed, np.minimum(1000, 4 * 60 / (width * 0.2)))
+    assert capped[2] is not steps[2] and steps[2].speed is None
+    points = [Point(x=x, y=0, z=0.2) for x in range(50)]
+    expected = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for point, w in zip(points, width):
+        expected += [ExtrusionGeometry(width=w, height=0.2, area_model='rectangle'), point]
+    # the first point is at the start position
+    flows = _flows(gcode(steps, GcodeControls(max_flow=4), show_tips=False), width[1:] * 0.2)
+    assert flows.max() == pytest.approx(4, rel=0.01) and (flows <= 4 + 1e-9).all()
+    assert np.allclose(flows, _flows(gcode(expected, GcodeControls(max_flow=4), show_tips=False), width[1:] * 0.2),
+                       rtol=0.01)
+
+
+def test_travel_unchanged():
+    """Designs without extrusion are unchanged"""
+    steps = [Point(x=0, y=0, z=0.2), Printer(print_speed=5000), Point(x=10, y=0, z=0.2)]
+    assert gcode(steps, GcodeControls(max_flow=1), show_tips=False) == gcode(steps, GcodeControls(), show_tips=False)
@@ -0,0 +1,136 @@
+import gzip
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, import_gcode, GcodeControls, Point, PointArray, Extruder, Printer
+from fullcontrol.gcode import importer
+from fullcontrol.gcode.bgcode import bgcode_chunks
+
+MODAL_GCODE = '''; header comment
+G28
+G90
+M83
+G1 F1000 X10 Y10 Z0.2
+G1 X20 E0.5 ; X99 in a comment
+G0 F8000 X30
+G91
+G1 Z1
+G90
+M82
+G92 E10
+G1 X40 E11.0
+G1 X50 E11.5
+G1 X50 Y20 E11.25
+M104 S200
+G3 X50 Y30 I0 J5 E12
+'''
+
+
+def _design():
+    steps = [Printer(print_speed=1200, travel_speed=6000), Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for layer in range(3):
+        z = round(0.2 * (layer + 1), 1)
+        steps.extend(Point(x=10 * np.cos(a), y=10 * np.sin(a), z=z) for a in np.linspace(0, 6, 20))
+        steps.extend([Extruder(on=False), Point(x=0, y=0, z=z), Extruder(on=True)])
+    return steps
+
+
+def _write(tmp_path, text, name='test.gcode'):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def test_read_moves_applies_modal_state(tmp_path):
+    """Positions, extrusion and feedrate follow G90/G91, M82/M83, G92 and modal F words; comments are ignored"""
+    moves = import_gcode(_write(tmp_path, MODAL_GCODE), 'table')
+    assert moves.g.tolist() == [1, 1, 0, 1, 1, 1, 1, 3]
+    assert moves.xyz.tolist() == [[10, 10, 0.2], [20, 10, 0.2], [30, 10, 0.2], [30, 10, 1.2], [40, 10, 1.2],
+                                  [50, 10, 1.2], [50, 20, 1.2], [50, 30, 1.2]]
+    assert np.allclose(moves.e, [0, 0.5, 0, 0, 1, 0.5, -0.25, 0.75])
+    assert moves.f.tolist() == [1000, 1000, 8000, 8000, 8000, 8000, 8000, 8000]
+    assert moves.extruding.tolist() == [False, True, False, False, True, True, False, True]
+    assert (moves.i[-1], moves.j[-1]) == (0, 5) and np.isnan(moves.i[:-1]).all()
+
+
+def test_unknown_position_and_numbers(tmp_path):
+    """Axes are NaN until set, and words that are not numbers are ignored"""
+    moves = import_gcode(_write(tmp_path, 'G1 X1 E-.5\nG1 Y-2.25 Eabc\nG1 X1.5e1\nG1X5\n'), 'table')
+    assert len(moves) == 3
+    assert np.isnan(moves.y[0]) and np.isnan(moves.z).all()
+    assert moves.x[1] == 1 and moves.y[1] == -2.25 and moves.x[2] == 15
+    assert moves.e[0] == -0.5 and moves.e[1] == 0
+
+
+def test_numbered_lines(tmp_path):
+    """Line numbers and checksums are skipped"""
+    moves = import_gcode(_write(tmp_path, 'N9 M83*17\nN10 G1 X20 Y1 E0.5*33\nN11 G1 X30*90 ; comment\nN G1 X5\n'), 'table')
+    assert moves.x.tolist() == [20, 30] and moves.y[1] == 1
+    assert moves.e.tolist() == [0.5, 0]
+
+
+def test_long_numbers(tmp_path):
+    """Numbers with more digits than the vectorized conversion reads are converted by float()"""
+    text = 'G1 X10.123456789012345678 Y-0.00000000000000000001 Z1234567890123456789\n'
+    moves = import_gcode(_write(tmp_path, text), 'table')
+    assert moves.x[0] == 10.123456789012345678 and moves.y[0] == -1e-20 and moves.z[0] == 1234567890123456789
+
+
+def test_numbers_match_float(tmp_path):
+    """Numbers are converted exactly as by float()"""
+    rng = np.random.default_rng(1)
+    values = [f'{v:.{d}f}' for v, d in zip(rng.normal(0, 100, 2000), rng.integers(0, 7, 2000))]
+    text = ''.join(f'G1 X{value}\n' for value in values)
+    assert import_gcode(_write(tmp_path, text), 'table').x.tolist() == [float(value) for value in values]
+
+
+def test_chunks_give_same_result(tmp_path, monkeypatch):
+    """Modal state is carried between chunks of the file"""
+    path = _write(tmp_path, MODAL_GCODE * 20)
+    expected = import_gcode(path, 'table')
+    monkeypatch.setattr(importer, 'CHUNK_SIZE', 50)
+    moves = import_gcode(path, 'table')
+    for name in ('g',) + importer.MOVE_COLUMNS:
+        assert np.array_equal(getattr(moves, name), getattr(expected, name), equal_nan=True)
+
+
+def test_compressed_files(tmp_path):
+    """gzip and binary gcode files are read the same as plain text"""
+    expected = import_gcode(_write(tmp_path, MODAL_GCODE), 'table')
+    (tmp_path / 'test.gcode.gz').write_bytes(gzip.compress(MODAL_GCODE.encode()))
+    (tmp_path / 'test.bgcode').write_bytes(b''.join(bgcode_chunks([MODAL_GCODE])))
+    for name in ('test.gcode.gz', 'test.bgcode'):
+        assert np.array_equal(import_gcode(tmp_path / name, 'table').xyz, expected.xyz)
+
+
+def test_round_trip(tmp_path):
+    """Steps imported from gcode generated by FullControl give the same moves when converted to gcode again"""
+    path = tmp_path / 'design.gcode'
+    gcode(_design(), GcodeControls(output=str(path)), show_tips=False)
+    original = import_gcode(path, 'table')
+    for point_arrays in (False, True):
+        steps = import_gcode(path, point_arrays=point_arrays)
+        assert any(isinstance(step, PointArray) for step in steps) == point_arrays
+        copy = _write(tmp_path, gcode(steps, GcodeControls(), show_tips=False), 'copy.gcode')
+        moves = import_gcode(copy, 'table')
+        defined = ~np.isnan(original.xyz).any(axis=1)
+        assert defined[-1] and defined.sum() > 60
+        assert np.allclose(moves.xyz[-defined.sum():], original.xyz[defined])
+        assert np.array_equal(moves.extruding[-defined.sum():], original.extruding[defined])
+        # extrusion is recalculated from positions rounded to 3 decimal places (and from unknown x/y for the first line)
+        assert np.allclose(moves.e[-defined.sum() + 1:], original.e[defined][1:], atol=2e-4)
+
+
+def test_steps_for_arcs_and_speeds(tmp_path):
+    """Arcs are divided into lines ending at the end of the arc, with Extruder/Printer steps where state changes"""
+    steps = import_gcode(_write(tmp_path, MODAL_GCODE))
+    assert [type(step) for step in steps[:3]] == [Extruder, Printer, Point]
+    assert steps[1].travel_speed == 1000 and steps[4].print_speed == 1000
+    points = [step for step in steps if isinstance(step, Point)]
+    arc = np.array([(point.x, point.y) for point in points[7:]])
+    assert np.allclose(np.hypot(arc[:, 0] - 50, arc[:, 1] - 25), 5)
+    assert arc[:, 0].max() == pytest.approx(55, abs=0.01) and tuple(arc[-1]) == (50, 30)
+
+
+def test_result_type_not_recognized(tmp_path):
+    with pytest.raises(ValueError):
+        import_gcode(_write(tmp_path, MODAL_GCODE), 'plot')
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, PointArray, Extruder, Printer
+from fullcontrol.gcode import estimate_print
+from fullcontrol.gcode.commands import ManualGcode
+from fullcontrol.gcode.estimate import motion_limits
+from fullcontrol.gcode.layer_time import enforce_min_layer_time, speed_factor, _layer_time
+from fullcontrol.geometry import helixZ, circleXY
+
+
+def _tower(layers=5, radius=5):
+    'a small tower of circular layers, with a travel between layers'
+    steps = [Printer(print_speed=3000, travel_speed=6000), Point(x=1, y=1, z=1)]  # so x, y and z are in the gcode
+    for layer in range(layers):
+        z = round(0.2 * (layer + 1), 1)
+        steps += [Extruder(on=False), Point(x=radius, y=0, z=z), Extruder(on=True)]
+        steps += circleXY(Point(x=0, y=0, z=z), radius, 0, 32)
+    return steps
+
+
+def _layer_times(tmp_path, text):
+    path = tmp_path / 'test.gcode'
+    path.write_text(text)
+    return estimate_print(path).layer_times
+
+
+def test_layers_slowed_to_min_time(tmp_path):
+    """Every layer of a fast tower takes at least the minimum layer time after speeds are reduced"""
+    stats = {}
+    fast = _layer_times(tmp_path, gcode(_tower(), GcodeControls(), show_tips=False))
+    assert max(fast.values()) < 5
+    steps = list(enforce_min_layer_time(_tower(), 10, min_speed=60, print_speed=3000, stats=stats))
+    assert stats == {'layers': 5, 'slowed': 5, 'dwell': 0.0}
+    times = _layer_times(tmp_path, gcode(steps, GcodeControls(), show_tips=False))
+    assert len(times) == 5
+    # the F word of each move is rounded down to an integer, so layers take slightly longer
+    assert all(t == pytest.approx(10, rel=0.01) and t >= 10 for t in times.values())
+
+
+def test_dwell_below_min_speed(tmp_path):
+    """Speeds are not reduced below min_speed, and a dwell makes up the rest of the time"""
+    result = gcode(_tower(3), GcodeControls(min_layer_time=30, min_layer_speed=1200), show_tips=False)
+    dwells = [line for line in result.splitlines() if line.startswith('G4')]
+    assert len(dwells) == 3
+    speeds = [int(word[1:]) for line in result.splitlines() if ' E' in line for word in line.split() if word[0] == 'F']
+    assert min(speeds) == 1200
+    moves = _layer_times(tmp_path, result)
+    for dwell, t in zip(dwells, moves.values()):
+        assert int(dwell.split()[1][1:]) / 1000 + t == pytest.approx(30, rel=0.01)
+
+
+def test_slow_layers_unchanged():
+    """Layers that already take longer than the minimum time are not changed"""
+    assert gcode(_tower(), GcodeControls(min_layer_time=0.1), show_tips=False) == gcode(_tower(), GcodeControls(),
+                                                                                          show_tips=False)
+
+
+def test_helix_divided_into_layers():
+    """A helix (as a PointArray) is split into layers of one layer height"""
+    helix = helixZ(Point(x=0, y=0, z=0.2), 5, 5, 0, 10, 0.2, 640)
+    xyz = np.array([(point.x, point.y, point.z) for point in helix])
+    steps = [Point(x=5, y=0, z=0.2), Extruder(on=True), PointArray(xyz)]
+    stats = {}
+    result = list(enforce_min_layer_time(steps, 10, stats=stats))
+    # ten turns, then a layer with only the last point (at the end of the tenth turn)
+    assert stats['layers'] == 11 and stats['slowed'] == 11
+    arrays = [step for step in result if isinstance(step, PointArray)]
+    assert sum(len(array) for array in arrays) == len(xyz)
+    assert np.array_equal(np.vstack([array.xyz for array in arrays]), xyz)
+
+
+def test_layer_marker():
+    """Layers start at marker steps instead of at changes of z"""
+    steps = []
+    for part in range(3):
+        steps += [ManualGcode(text='; part'), Extruder(on=False), Point(x=20 * part, y=0, z=0.2), Extruder(on=True)]
+        steps += [Point(x=20 * part + 10, y=0, z=0.2)]
+    stats = {}
+    list(enforce_min_layer_time(steps, 5, layer_marker=lambda step: isinstance(step, ManualGcode), stats=stats))
+    assert stats['layers'] == 3
+
+
+def test_speed_factor_bisection():
+    """The factor found by bisection gives the minimum layer time"""
+    xyz = np.array([[0, 0, 0.2], [10, 0, 0.2], [10, 10, 0.2], [0, 10, 0.2], [0, 0, 0.2]], dtype=float)
+    speed = np.full(4, 6000.0)
+    extruding = np.ones(4, dtype=bool)
+    limits = motion_limits()
+    factor, dwell, before = speed_factor(xyz, speed, extruding, 5, limits, min_speed=0)
+    assert before < 5 and dwell == 0 and 0 < factor < 1
+    assert _layer_time(xyz, speed * factor, extruding, limits) == pytest.approx(5, rel=1e-6)
+
+
+def test_speed_restored_after_slowed_layer():
+    """The print speed set by the design is used again for layers after a slowed layer"""
+    steps = _tower(1, radius=2) + [Extruder(on=False), Point(x=100, y=0, z=0.4), Extruder(on=True)]
+    steps += circleXY(Point(x=0, y=0, z=0.4), 100, 0, 32)
+    result = gcode(steps, GcodeControls(min_layer_time=5), show_tips=False).splitlines()
+    speeds = [line.split()[-1] for line in result if ' E' in line and ' X' in line]
+    assert speeds[0] != 'F3000' and speeds[-1] == 'F3000'
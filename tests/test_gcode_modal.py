@@ -0,0 +1,61 @@
+from fullcontrol.gcode import gcode, gcode_stream, GcodeControls, Point, Extruder, Printer
+from fullcontrol.gcode.modal import compress_modal
+from fullcontrol.geometry import circleXY
+
+
+def _design():
+    circle = circleXY(Point(x=50, y=50, z=0.2), 10, 0, 32)
+    return [circle[0], Extruder(on=True)] + circle[1:] + [Extruder(on=False), Point(x=0, y=0, z=0.4),
+                                                          Extruder(on=True), Printer(print_speed=500), Point(x=10), Point(x=10, y=5)]
+
+
+def _moves(text):
+    'the position, extrusion and feedrate after each move, following modal rules'
+    state, command, moves = {}, None, []
+    for line in text.splitlines():
+        words = line.split(';')[0].split()
+        if words and words[0][0] == 'G':
+            command, words = words[0], words[1:]
+        elif not words or words[0][0] not in 'XYZEF':
+            continue
+        if command in ('G0', 'G1'):
+            state.pop('E', None)
+            state.update((word[0], float(word[1:])) for word in words)
+            moves.append((command, tuple(sorted(state.items()))))
+    return moves
+
+
+def test_repeated_words_dropped():
+    """Repeated F and unchanged axis words are dropped, without changing the moves"""
+    steps = _design()
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    result = gcode(steps, GcodeControls(drop_modal_words=True), show_tips=False)
+    assert len(result) < len(plain)
+    assert result.count('F1000') == 1
+    assert 'F500' in result
+    assert _moves(result) == _moves(plain)
+
+
+def test_motion_commands_dropped():
+    """With drop_motion_commands, repeated G0/G1 words are also dropped"""
+    steps = _design()
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    result = gcode(steps, GcodeControls(drop_modal_words=True, drop_motion_commands=True), show_tips=False)
+    assert sum(line.startswith('X') for line in result.splitlines()) > 20
+    assert _moves(result) == _moves(plain)
+
+
+def test_axis_precision():
+    """Values are rounded to the number of decimal places set for each letter"""
+    lines = ['G1 X1.23456 Y-0.0004 E0.12345 F1000']
+    assert list(compress_modal(lines, False, precision={'X': 2, 'Y': 3, 'E': 3})) == ['G1 X1.23 Y0 E0.123 F1000']
+    stream = ''.join(gcode_stream(_design(), GcodeControls(axis_precision={'X': 1, 'Y': 1}), show_tips=False))
+    assert 'X59.8 ' in stream
+
+
+def test_position_reset_and_comments():
+    """Axis words are kept after commands that change position, and comments are kept"""
+    lines = ['G0 X1 Y1 F100', 'G28', 'G0 X1 Y1 F100 ; home', 'G92 X0', 'G0 X1 Y1', 'G91', 'G0 X1 Y1', 'G90',
+             'M104 S200', 'G1 X1 Y1 F100']
+    assert list(compress_modal(lines)) == ['G0 X1 Y1 F100', 'G28', 'G0 X1 Y1 ; home', 'G92 X0', 'G0 X1', 'G91',
+                                           'G0 X1 Y1', 'G90', 'M104 S200', 'G1 X1 Y1']
@@ -0,0 +1,51 @@
+import numpy as np
+from fullcontrol.gcode import gcode, gcode_stream, Point, PointArray, Extruder, ExtrusionGeometry, Printer, StationaryExtrusion
+from fullcontrol.gcode.parallel import split_steps, render_chunk
+from fullcontrol.gcode.state import State
+
+
+def _design(layers=6):
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for layer in range(layers):
+        z = 0.2 * (layer + 1)
+        steps.append(Printer(print_speed=1000 + 100 * layer))
+        steps.append(ExtrusionGeometry(area_model='rectangle', width=0.4 + 0.01 * layer, height=0.2))
+        steps.extend(Point(x=10 * np.cos(a), y=10 * np.sin(a), z=z) for a in np.linspace(0, 6, 40))
+        steps.extend([Extruder(on=False), Point(x=0, y=0, z=z), Extruder(on=True)])
+        steps.append(PointArray([[1, 1, z], [2, 2, z]], speed=[900, 950]))
+        steps.append(StationaryExtrusion(volume=0.5, speed=300))
+    return steps
+
+
+def test_chunks_rendered_from_snapshots_match_serial(gcode_controls):
+    """Rendering each chunk from its snapshot reproduces the serial gcode exactly (in-process)"""
+    steps = _design()
+    expected = gcode(steps, gcode_controls(), show_tips=False)
+    state = State(steps, gcode_controls())
+    start_lines = state.gcode
+    state.gcode = []
+    chunks = split_steps(steps, state, 5)
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(steps)
+    texts = [render_chunk(snapshot, steps[start:end]) for start, end, snapshot in chunks]
+    state.finalize()
+    assert '\n'.join(start_lines + [t for t in texts if t] + state.gcode) == expected
+
+
+def test_split_at_safe_boundaries(gcode_controls):
+    """Chunks start at Extruder(on=False) or at a change of z"""
+    steps = _design()
+    chunks = split_steps(steps, State(steps, gcode_controls()), 5)
+    for start, _, _ in chunks[1:]:
+        step = steps[start]
+        assert isinstance(step, (Extruder, Point))
+        if isinstance(step, Extruder):
+            assert step.on is False
+
+
+def test_parallel_workers_identical_output(gcode_controls):
+    """gcode() and gcode_stream() with worker processes give the same gcode as serial generation"""
+    steps = _design()
+    expected = gcode(steps, gcode_controls(), show_tips=False)
+    assert gcode(steps, gcode_controls(parallel_workers=2), show_tips=False) == expected
+    assert ''.join(gcode_stream(steps, gcode_controls(parallel_workers=2), show_tips=False)) == expected
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, PointArray, Extruder, ExtrusionGeometry, Printer
+from fullcontrol.extra_functions import first_point, last_point
+
+
+def _xyz():
+    rng = np.random.default_rng(1)
+    xyz = np.round(rng.uniform(-50, 50, (50, 3)), 4)
+    xyz[5] = xyz[4]  # repeated point
+    xyz[10:20, 2] = 0.2  # constant z
+    return xyz
+
+
+@pytest.mark.parametrize("prefix", [
+    [],
+    [Extruder(on=True)],
+    [Extruder(on=True), Printer(print_speed=1500)],
+    [Point(x=1), Extruder(on=True)],
+])
+def test_point_array_matches_points(prefix):
+    """A PointArray should generate exactly the same gcode as the equivalent list of Points"""
+    xyz = _xyz()
+    points = [Point(x=x, y=y, z=z) for x, y, z in xyz.tolist()]
+    expected = gcode(prefix + points, GcodeControls(), show_tips=False)
+    result = gcode(prefix + [PointArray(xyz)], GcodeControls(), show_tips=False)
+    assert result == expected
+
+
+def test_point_array_width_height_columns():
+    """Per-point width/height should match ExtrusionGeometry changes before each Point"""
+    xyz = _xyz()
+    width = np.linspace(0.3, 0.6, len(xyz))
+    height = np.linspace(0.1, 0.3, len(xyz))
+    steps = [ExtrusionGeometry(area_model='rectangle'), Extruder(on=True)]
+    for i, (x, y, z) in enumerate(xyz.tolist()):
+        steps.extend([ExtrusionGeometry(width=width[i], height=height[i]), Point(x=x, y=y, z=z)])
+    expected = gcode(steps, GcodeControls(), show_tips=False)
+    result = gcode(steps[:2] + [PointArray(xyz, width=width, height=height)], GcodeControls(), show_tips=False)
+    assert result == expected
+
+
+def test_point_array_speed_column():
+    """Per-point speed sets the feedrate of each move"""
+    xyz = np.array([[0, 0, 0], [10, 0, 0], [10, 10, 0]])
+    result = gcode([PointArray(xyz, speed=[500, 600, 700])], GcodeControls(), show_tips=False)
+    assert result.splitlines() == ["G0 F500", "G0 X10 F600", "G0 Y10 F700"]
+
+
+def test_point_array_updates_state_point():
+    """Steps after a PointArray continue from its last point"""
+    steps = [PointArray([[0, 0, 0], [5, 5, 0]]), Point(x=5, y=6, z=0)]
+    result = gcode(steps, GcodeControls(), show_tips=False)
+    assert result.splitlines()[-1] == "G0 Y6 F2000"
+
+
+def test_point_array_validation():
+    """Invalid shapes and undefined values are rejected"""
+    with pytest.raises(ValueError):
+        PointArray([[0, 0], [1, 1]])
+    with pytest.raises(ValueError):
+        PointArray([[0, 0, np.nan]])
+    with pytest.raises(ValueError):
+        PointArray([[0, 0, 0], [1, 1, 1]], width=[0.4, 0.4, 0.4])
+
+
+def test_point_array_points_round_trip():
+    """Conversion to and from Points preserves positions"""
+    points = [Point(x=0, y=1, z=2), Point(x=3, y=4, z=5)]
+    array = PointArray.from_points(points)
+    assert len(array) == 2
+    assert [(p.x, p.y, p.z) for p in array.to_points()] == [(0, 1, 2), (3, 4, 5)]
+    assert isinstance(array.point(0), Point)
+
+
+def test_first_and_last_point_with_point_array():
+    """first_point and last_point look inside PointArrays"""
+    steps = [Extruder(on=True), PointArray([[0, 0, 0], [1, 2, 3]]), Extruder(on=False)]
+    assert (first_point(steps).x, first_point(steps).y) == (0, 0)
+    assert (last_point(steps).x, last_point(steps).z) == (1, 3)
@@ -0,0 +1,39 @@
+import ast
+import json
+import os
+import pytest
+from fullcontrol.gcode import printer_names, search_printers
+from fullcontrol.gcode.import_printer import import_printer
+from fullcontrol.gcode.printer_library import CURA_DIRECTORY, cura_settings
+
+
+def test_database_matches_settings_modules():
+    """The compiled database has the settings of every module (run bin/build_cura_devices.py after editing them)"""
+    with open(os.path.join(CURA_DIRECTORY, 'library.json')) as file:
+        library = json.load(file)
+    assert sorted(printer_names()) == sorted([f'Cura/{name}' for name in library] + ['Community/Generic'])
+    for name, module in library.items():
+        with open(os.path.join(CURA_DIRECTORY, 'settings', f'{module}.py')) as file:
+            assert cura_settings(name) == ast.literal_eval(ast.parse(file.read()).body[0].value)
+
+
+def test_cura_settings():
+    settings = cura_settings('Creality Ender-3 / Ender-3 v2')
+    assert settings['manufacturer'] == 'Creality3D' and settings['print_speed'] == 50.0
+    settings['print_speed'] = 0  # each lookup returns a new dict
+    assert cura_settings('Creality Ender-3 / Ender-3 v2')['print_speed'] == 50.0
+    with pytest.raises(ValueError):
+        cura_settings('Creality Ender-99')
+    assert import_printer('Cura/Creality Ender-3 / Ender-3 v2', {})['print_speed'] == 3000
+
+
+def test_search_printers():
+    assert search_printers('ender 3 pro')[0] == 'Cura/Creality Ender-3 Pro'
+    assert all('Ender-3' in name for name in search_printers('ENDER-3'))
+    assert 'Cura/Creality Ender-2' not in search_printers('ender 3', limit=100)
+    assert search_printers('prusa mk3') == ['Cura/Prusa i3 Mk3/Mk3s']
+    assert search_printers('generic') == ['Community/Generic']
+    assert len(search_printers('creality', limit=3)) == 3
+    # words similar to the printer's words when nothing matches exactly
+    assert 'Cura/Prusa i3 Mk3/Mk3s' in search_printers('prussa mk3')
+    assert search_printers('qqqqqq') == []
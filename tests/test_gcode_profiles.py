@@ -0,0 +1,62 @@
+import pytest
+from fullcontrol.devices.community.singletool import ender_3
+from fullcontrol.gcode import ManualGcode
+from fullcontrol.gcode.profiles import clear_profile_cache, freeze, printer_profile
+import fullcontrol.gcode.profiles as profiles
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_profile_cache()
+    yield
+    clear_profile_cache()
+
+
+def test_cached_profile(monkeypatch):
+    calls = []
+    set_up = ender_3.set_up
+    monkeypatch.setattr(ender_3, 'set_up', lambda overrides: calls.append(overrides) or set_up(overrides))
+    first = printer_profile('ender_3', {'nozzle_temp': 205})
+    second = printer_profile('ender_3', {'nozzle_temp': 205})
+    assert len(calls) == 1
+    assert first == second and first == set_up({'nozzle_temp': 205})
+    # callers get their own copies of the dict and the procedure lists
+    first['starting_procedure_steps'].append(ManualGcode(text='; extra'))
+    first['nozzle_temp'] = 0
+    third = printer_profile('ender_3', {'nozzle_temp': 205})
+    assert third == second
+    # different overrides are set up separately
+    assert printer_profile('ender_3', {'nozzle_temp': 215})['nozzle_temp'] == 215
+    assert len(calls) == 2
+
+
+def test_overrides_not_shared():
+    overrides = {'printer_command_list': {'home': 'G28'}}
+    profile = printer_profile('generic', overrides)
+    overrides['printer_command_list']['home'] = 'G28 X'
+    assert printer_profile('generic', {'printer_command_list': {'home': 'G28'}}) == profile
+    # unhashable overrides are set up without the cache
+    assert printer_profile('generic', {'extra': bytearray()})['extrusion_width'] == 0.4
+
+
+def test_freeze():
+    assert freeze({'b': [1, 2], 'a': {'c': 3}}) == freeze({'a': {'c': 3}, 'b': [1, 2]})
+    assert freeze([1, 2]) != freeze((1, 2))
+    with pytest.raises(TypeError):
+        freeze({'a': [bytearray()]})
+
+
+def test_cache_size(monkeypatch):
+    monkeypatch.setattr(profiles, 'PROFILE_CACHE_SIZE', 2)
+    for temp in (200, 205, 210):
+        printer_profile('generic', {'nozzle_temp': temp})
+    assert len(profiles._profiles) == 2
+
+
+def test_library_printer():
+    first = printer_profile('Cura/Creality Ender-3 / Ender-3 v2', {'nozzle_temp': 205})
+    clear_profile_cache()
+    second = printer_profile('Cura/Creality Ender-3 / Ender-3 v2', {'nozzle_temp': 205})
+    # speeds are converted to mm/min once, not again for each call
+    assert first['print_speed'] == second['print_speed']
+    assert '{' not in first['start_gcode']
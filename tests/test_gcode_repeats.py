@@ -0,0 +1,84 @@
+import math
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, PointArray, Extruder, Printer
+from fullcontrol.gcode.importer import import_gcode
+from fullcontrol.gcode.repeats import RepeatBlock, find_repeats, relative_lines
+
+
+def _copies(quantity=20, array=False, spacing=12.5):
+    'copies of a circle with a travel between them, each offset by spacing in x'
+    steps = [Printer(print_speed=1200), Point(x=0, y=0, z=0.2)]
+    for i in range(quantity):
+        circle = [(10 + spacing * i + 5 * math.cos(a / 10), 10 + 5 * math.sin(a / 10), 0.2) for a in range(64)]
+        steps += [Extruder(on=False), Point(x=circle[0][0], y=circle[0][1], z=0.2), Extruder(on=True)]
+        steps += [PointArray(circle[1:])] if array else [Point(x=x, y=y, z=z) for x, y, z in circle[1:]]
+    return steps
+
+
+def _moves(text, tmp_path):
+    'the moves of gcode text as read by import_gcode()'
+    path = tmp_path / 'moves.gcode'
+    path.write_text(text)
+    return import_gcode(str(path), 'table')
+
+
+def test_find_repeats():
+    steps = _copies()
+    stats = {}
+    result = find_repeats(steps, stats=stats)
+    blocks = [step for step in result if isinstance(step, RepeatBlock)]
+    assert len(blocks) == 1 and stats['repeats'] == 1
+    assert blocks[0].count * len(blocks[0].steps) == stats['steps']
+    assert np.allclose(blocks[0].vector, (12.5, 0, 0))
+    assert len(result) == len(steps) - stats['steps'] + 1
+
+
+@pytest.mark.parametrize('array', [False, True])
+def test_relative_matches_plain(tmp_path, array):
+    steps = _copies(array=array)
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    text = gcode(steps, GcodeControls(repeat_copies='relative'), show_tips=False)
+    assert 'G91' in text
+    expected, moves = _moves(plain, tmp_path), _moves(text, tmp_path)
+    assert len(moves) == len(expected)
+    assert np.allclose(moves.xyz, expected.xyz, atol=1e-3, equal_nan=True)
+    assert np.allclose(moves.e, expected.e, equal_nan=True)
+
+
+def test_loop():
+    steps = _copies(quantity=50)
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    text = gcode(steps, GcodeControls(repeat_copies='loop'), show_tips=False)
+    lines = text.split('\n')
+    start = lines.index('while iterations < 47')
+    body = lines[start + 1:lines.index('G90', start)]
+    assert len(body) == 64 and all(line.startswith('  ') for line in body)
+    assert len(text) < len(plain) / 10
+    # drop_modal_words keeps the loop body intact
+    compressed = gcode(steps, GcodeControls(repeat_copies='loop', drop_modal_words=True), show_tips=False)
+    lines = compressed.split('\n')
+    start = lines.index('while iterations < 47')
+    assert lines[start + 1:start + 1 + len(body)] == body
+
+
+def test_state_after_repeats():
+    steps = _copies() + [Extruder(on=False), Point(x=0, y=0, z=0.2), Extruder(on=True), Point(x=1)]
+    plain = gcode(steps, GcodeControls(), show_tips=False).split('\n')
+    text = gcode(steps, GcodeControls(repeat_copies='relative'), show_tips=False).split('\n')
+    assert text[-4:] == plain[-4:]
+
+
+def test_fallback():
+    # absolute extrusion: copies are generated in full
+    steps = [Extruder(relative_gcode=False)] + _copies()
+    assert gcode(steps, GcodeControls(repeat_copies='relative'), show_tips=False) == \
+        gcode(steps, GcodeControls(), show_tips=False)
+    # too few copies to be worth repeating
+    steps = _copies(quantity=2)
+    assert find_repeats(steps) == steps
+    assert relative_lines(['G1 X1 Y1', 'G92 E0'], (0, 0, 0)) is None
+    assert relative_lines(['G1 X1.5 Y-1 E0.1 F1000 ; move', 'M106 S255'], (1, 1, 0)) == \
+        ['G1 X0.5 Y-2 E0.1 F1000 ; move', 'M106 S255']
+    with pytest.raises(ValueError):
+        find_repeats(steps, 'macro')
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, GcodeSession, Point, PointArray, Extruder, ExtrusionGeometry, Printer
+
+
+def _design(layers=10, z_offset=0.0):
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    for layer in range(layers):
+        z = round(0.2 * (layer + 1) + z_offset, 4)
+        steps.append(ExtrusionGeometry(area_model='rectangle', width=0.4, height=0.2))
+        steps.extend(Point(x=10 * np.cos(a), y=10 * np.sin(a), z=z) for a in np.linspace(0, 6, 30))
+        steps.extend([Extruder(on=False), Point(x=0, y=0, z=z), Extruder(on=True)])
+    return steps
+
+
+def _controls():
+    return GcodeControls(initialization_data={"start_gcode": "G28", "end_gcode": "M84"})
+
+
+def _check(session, steps):
+    assert session.gcode(steps) == gcode(steps, _controls(), show_tips=False)
+
+
+def test_session_matches_gcode_after_edits():
+    """Each regenerated result is identical to generating the whole design from scratch"""
+    steps = _design()
+    session = GcodeSession(_controls(), show_tips=False, checkpoint_interval=20)
+    _check(session, steps)
+    steps[150] = Point(x=1, y=2, z=steps[150].z)  # edit in the middle of a layer
+    _check(session, steps)
+    steps[200:200] = [Printer(print_speed=500), Point(x=3, y=3, z=steps[200].z)]  # insert
+    _check(session, steps)
+    del steps[50:90]  # delete
+    _check(session, steps)
+    steps.append(PointArray([[0, 0, 5], [1, 1, 5]]))
+    _check(session, steps)
+    _check(session, _design(layers=4))
+
+
+def test_session_rerenders_only_edited_region():
+    """A small edit re-renders steps from the checkpoint before it until state re-converges"""
+    steps = _design()
+    session = GcodeSession(_controls(), show_tips=False, checkpoint_interval=20)
+    session.gcode(steps)
+    assert session.steps_rendered == len(steps)
+    session.gcode(steps)
+    assert session.steps_rendered == 0
+    steps[150] = Point(x=1, y=2, z=steps[150].z)
+    _check(session, steps)
+    assert session.steps_rendered <= 40
+
+
+def test_session_rerenders_to_end_when_state_differs():
+    """A change that affects all later steps (e.g. print speed) re-renders the rest of the design"""
+    steps = _design()
+    session = GcodeSession(_controls(), show_tips=False, checkpoint_interval=20)
+    session.gcode(steps)
+    steps.insert(100, Printer(print_speed=1500))
+    _check(session, steps)
+    assert session.steps_rendered >= len(steps) - 100
+
+
+def test_session_rejects_unsupported_controls():
+    """Controls that pre-process the steps are not applied by a session, so they raise an error"""
+    for controls in (GcodeControls(max_flow=5), GcodeControls(optimize_travel=True), GcodeControls(parallel_workers=4)):
+        with pytest.raises(ValueError, match='does not support'):
+            GcodeSession(controls)
+    GcodeSession(GcodeControls(parallel_workers=1))
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, gcode_stream, GcodeControls, Point, PointArray, Extruder, ExtrusionGeometry, Printer
+from fullcontrol.gcode.simplify import simplify_steps, douglas_peucker
+from fullcontrol.geometry import segmented_line, circleXY
+
+
+def _design():
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    steps += segmented_line(Point(x=0, y=0, z=0.2), Point(x=50, y=10, z=0.2), 200)
+    steps += [ExtrusionGeometry(width=0.6), Printer(print_speed=1500)]
+    steps += segmented_line(Point(x=50, y=10, z=0.2), Point(x=0, y=30, z=0.2), 100)
+    steps += [Extruder(on=False), Point(x=0, y=0, z=0.4), Extruder(on=True)]
+    steps += circleXY(Point(x=20, y=20, z=0.4), 10, 0, 64)
+    return steps
+
+
+def test_collinear_points_removed_and_extrusion_kept(e_total):
+    """Nearly collinear points are removed, with the same total extrusion and non-Point steps preserved"""
+    steps = _design()
+    stats = {}
+    simplified = list(simplify_steps(steps, 0.005, stats))
+    assert stats['removed'] > 250
+    assert [type(step) for step in simplified if not isinstance(step, (Point, PointArray))] == \
+        [type(step) for step in steps if not isinstance(step, (Point, PointArray))]
+    plain = gcode(steps, GcodeControls(), show_tips=False)
+    result = gcode(steps, GcodeControls(simplify_tolerance=0.005), show_tips=False)
+    assert len(result.splitlines()) < len(plain.splitlines()) / 3
+    assert e_total(result) == pytest.approx(e_total(plain), abs=0.01)
+    assert 'F1500' in result and 'X0 Y30' in result
+
+
+def test_curves_kept_within_tolerance():
+    """Points of a coarse circle deviate by more than the tolerance, so none are removed"""
+    circle = circleXY(Point(x=0, y=0, z=0), 10, 0, 64)
+    stats = {}
+    list(simplify_steps(circle, 0.005, stats))
+    assert stats['removed'] == 0
+
+
+def test_douglas_peucker_tolerance():
+    """Removed points are within tolerance of the simplified polyline"""
+    rng = np.random.default_rng(0)
+    xyz = np.column_stack([np.linspace(0, 100, 500), rng.normal(0, 0.01, 500), np.zeros(500)])
+    mask = douglas_peucker(xyz, 0.05)
+    kept = xyz[mask]
+    assert mask[0] and mask[-1] and mask.sum() < 100
+    y_interpolated = np.interp(xyz[:, 0], kept[:, 0], kept[:, 1])
+    assert np.abs(xyz[:, 1] - y_interpolated).max() <= 0.05 + 1e-9
+
+
+def test_point_array_width_changes_kept():
+    """Points in a PointArray where the width changes are kept"""
+    xyz = np.column_stack([np.linspace(0, 10, 11), np.zeros(11), np.full(11, 0.2)])
+    width = [0.4] * 6 + [0.6] * 5
+    simplified = list(simplify_steps([PointArray(xyz, width=width)], 0.01))[0]
+    assert simplified.xyz[:, 0].tolist() == [0, 5, 10]
+    assert simplified.width.tolist() == [0.4, 0.4, 0.6]
+    assert simplified.extrusion_length[1:].tolist() == pytest.approx([5, 5])
+
+
+def test_report_and_stream(capsys):
+    """The number of points removed is reported, and streamed gcode matches gcode()"""
+    steps = _design()
+    controls = GcodeControls(simplify_tolerance=0.005)
+    expected = gcode(steps, controls, show_tips=False)
+    assert ''.join(gcode_stream(iter(steps), controls, show_tips=True)) == expected
+    assert 'simplify_tolerance=0.005: removed' in capsys.readouterr().out
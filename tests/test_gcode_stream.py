@@ -0,0 +1,62 @@
+import io
+from fullcontrol.gcode import gcode, gcode_stream, GcodeControls, Point, PointArray, Extruder
+
+
+def _steps():
+    steps = [Point(x=0, y=0, z=0.2), Extruder(on=True)]
+    steps.extend(Point(x=i % 7, y=i % 5, z=0.2) for i in range(100))
+    steps.append(PointArray([[1, 2, 0.4], [3, 4, 0.4]]))
+    return steps
+
+
+def test_stream_matches_gcode(gcode_controls):
+    """Joined chunks from gcode_stream are identical to the gcode() string"""
+    expected = gcode(_steps(), gcode_controls(), show_tips=False)
+    chunks = list(gcode_stream(_steps(), gcode_controls(), show_tips=False, chunk_lines=7))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == expected
+
+
+def test_stream_is_lazy():
+    """Steps are consumed as the stream is read, not all up front"""
+    consumed = []
+
+    def steps():
+        for i in range(50):
+            consumed.append(i)
+            yield Point(x=i, y=0, z=0)
+
+    stream = gcode_stream(steps(), GcodeControls(), show_tips=False, chunk_lines=10)
+    next(stream)
+    assert len(consumed) < 50
+
+
+def test_output_file_object(gcode_controls):
+    """With controls.output set to a file-like object, gcode is written to it and None is returned"""
+    expected = gcode(_steps(), gcode_controls(), show_tips=False)
+    buffer = io.StringIO()
+    assert gcode(_steps(), gcode_controls(output=buffer), show_tips=False) is None
+    assert buffer.getvalue() == expected
+
+
+def test_output_path(tmp_path, gcode_controls):
+    """With controls.output set to a path, gcode is written to that file"""
+    expected = gcode(_steps(), gcode_controls(), show_tips=False)
+    path = tmp_path / "sub" / "out.gcode"
+    gcode(_steps(), gcode_controls(output=path), show_tips=False)
+    assert path.read_text() == expected
+
+
+def test_transform_generator_design():
+    """transform() accepts a generator design for gcode and gcode_stream results"""
+    from fullcontrol.combinations.gcode_and_visualize.common import transform
+    from fullcontrol.extra_functions import iter_steps
+
+    def design():
+        yield Point(x=0, y=0, z=0.2)
+        yield Extruder(on=True)
+        yield (Point(x=i, y=i, z=0.2) for i in range(20))
+
+    expected = gcode(list(iter_steps(design())), GcodeControls(), show_tips=False)
+    assert transform(design(), 'gcode', GcodeControls(), show_tips=False) == expected
+    assert ''.join(transform(design(), 'gcode_stream', GcodeControls(), show_tips=False)) == expected
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, PointArray, Extruder, Printer
+from fullcontrol.gcode.travel import optimize_travel, order_islands, GridIndex, _travel
+
+
+def _island(x, y, z=0.2, size=2, array=False):
+    'a square island with its travel, starting at its bottom left corner'
+    corners = [(x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)]
+    path = [Point(x=cx, y=cy, z=z) for cx, cy in corners[1:]]
+    if array:
+        path = [PointArray([(cx, cy, z) for cx, cy in corners[1:]])]
+    return [Extruder(on=False), Point(x=x, y=y, z=z), Extruder(on=True)] + path
+
+
+def _lattice(rows=6, columns=6, layers=2, array=False):
+    'islands on a grid, authored in an order with long travels between them'
+    rng = np.random.default_rng(0)
+    steps = [Printer(print_speed=1000)]
+    for layer in range(layers):
+        cells = rng.permutation(rows * columns)
+        for cell in cells.tolist():
+            steps += _island(10 * (cell % columns), 10 * (cell // columns), round(0.2 * (layer + 1), 1), array=array)
+    return steps
+
+
+def _moves(text):
+    'extrusion moves in the gcode as a set of ((x0, y0), (x1, y1), z) segments'
+    x = y = z = None
+    segments = []
+    for line in text.splitlines():
+        words = {word[0]: float(word[1:]) for word in line.split()[1:] if word[0] in 'XYZE'}
+        new_x, new_y, new_z = words.get('X', x), words.get('Y', y), words.get('Z', z)
+        if words.get('E', 0) > 0 and (new_x, new_y) != (x, y):
+            segments.append((frozenset(((x, y), (new_x, new_y))), new_z))
+        x, y, z = new_x, new_y, new_z
+    return sorted(segments, key=repr)
+
+
+def test_nearest():
+    points = np.random.default_rng(1).uniform(0, 100, (500, 2))
+    index = GridIndex(points)
+    for query in np.random.default_rng(2).uniform(-20, 120, (50, 2)):
+        assert index.nearest(query) == np.argmin(np.linalg.norm(points - query, axis=1))
+    index.remove(int(index.nearest(points[7])))
+    assert index.nearest(points[7]) != 7
+
+
+def test_order_islands_reduces_travel():
+    rng = np.random.default_rng(3)
+    first = rng.uniform(0, 100, (300, 2))
+    last = first + rng.uniform(-2, 2, (300, 2))
+    reversible = rng.uniform(size=300) < 0.7
+    start = np.zeros(2)
+    order, backwards = order_islands(start, first, last, reversible)
+    assert sorted(order.tolist()) == list(range(300))
+    assert not (backwards & ~reversible[order]).any()
+    entry = np.where(backwards[:, None], last[order], first[order])
+    exit = np.where(backwards[:, None], first[order], last[order])
+    assert _travel(start, entry, exit) < _travel(start, first, last) / 4
+
+
+def test_same_extrusion_less_travel():
+    """Islands are reordered within layers, with the same extrusion moves and layers in the same order"""
+    for array in (False, True):
+        stats = {}
+        steps = list(optimize_travel(_lattice(array=array), stats=stats))
+        assert stats['islands'] == 72 and stats['travel_after'] < stats['travel_before'] * 0.5
+        plain = gcode(_lattice(array=array), GcodeControls(), show_tips=False)
+        result = gcode(_lattice(array=array), GcodeControls(optimize_travel=True), show_tips=False)
+        assert _moves(result) == _moves(plain)
+        z = [float(word[1:]) for line in result.splitlines() for word in line.split() if word[0] == 'Z']
+        assert z == sorted(z)
+
+
+def test_fixed_steps_keep_place():
+    """Islands are not moved past steps that change state, or reordered if they span several z values"""
+    steps = _island(50, 0) + _island(0, 0) + [Printer(print_speed=500)] + _island(60, 0) + _island(10, 0)
+    steps += [Extruder(on=False), Point(x=0, y=0, z=0.4), Extruder(on=True), Point(x=5, y=0, z=0.6)]
+    result = list(optimize_travel(steps))
+    printer = next(i for i, step in enumerate(result) if step is steps[14])
+    assert {id(step) for step in result[:printer]} == {id(step) for step in steps[:14]}
+    assert result[-4:] == steps[-4:]
+
+
+def test_island_before_partial_point_stays_last():
+    """The island before a point that is only partly defined (e.g. a z-hop) stays last"""
+    steps = _island(0, 0) + _island(50, 0) + _island(10, 0) + _island(40, 0)
+    steps += [Extruder(on=False), Point(z=1)]
+    result = list(optimize_travel(steps))
+    assert all(new is old for new, old in zip(result[-9:], steps[-9:]))
+    assert [result[i].x for i in (1, 8, 15)] == [0, 10, 50]
+
+
+def test_open_paths_reversed():
+    """Open paths are printed in alternate directions (a serpentine) when that shortens travel"""
+    steps = []
+    for row in range(10):
+        steps += [Extruder(on=False), Point(x=0, y=row, z=0.2), Extruder(on=True), Point(x=20, y=row, z=0.2)]
+    stats = {}
+    result = list(optimize_travel(steps, stats=stats))
+    assert stats['travel_before'] == pytest.approx(20 * 9 + np.hypot(20, 1) * 9 - 20 * 9, abs=200)
+    assert stats['travel_after'] == pytest.approx(9)
+    starts = [step.x for i, step in enumerate(result) if isinstance(step, Point) and i % 4 == 1]
+    assert starts == [0, 20] * 5
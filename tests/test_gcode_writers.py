@@ -0,0 +1,75 @@
+import gzip
+import io
+import os
+import pytest
+from fullcontrol.gcode import gcode, GcodeControls, Point, Extruder
+from fullcontrol.gcode.bgcode import heatshrink_compress, heatshrink_decompress, read_bgcode, bgcode_chunks
+from fullcontrol.geometry import circleXY
+
+
+def _steps():
+    circle = circleXY(Point(x=50, y=50, z=0.2), 10, 0, 2000)
+    return [circle[0], Extruder(on=True)] + circle[1:]
+
+
+@pytest.mark.parametrize("data", [b'', b'a', b'ab', b'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaab', os.urandom(5000),
+                                  b'G1 X1.5 Y2.25 E0.0785 F1000\n' * 500])
+@pytest.mark.parametrize("window", [11, 12])
+def test_heatshrink_round_trip(data, window):
+    """Heatshrink compression is reversed exactly by decompression"""
+    assert heatshrink_decompress(heatshrink_compress(data, window, 4), window, 4)[:len(data)] == data
+
+
+def test_heatshrink_compresses_gcode():
+    """Gcode is compressed to less than half its size, with matches overlapping their own position"""
+    data = gcode(_steps(), GcodeControls(), show_tips=False).encode()[:20000]
+    compressed = heatshrink_compress(data)
+    assert len(compressed) < len(data) / 2 and heatshrink_decompress(compressed)[:len(data)] == data
+    assert len(heatshrink_compress(b'a' * 1000)) < 150
+
+
+def test_save_as_gzip(tmp_path):
+    """save_format='gcode.gz' saves gzip-compressed gcode"""
+    steps = _steps()
+    expected = gcode(steps, GcodeControls(), show_tips=False)
+    controls = GcodeControls(save_as=str(tmp_path / 'out'), include_date=False, save_format='gcode.gz')
+    gcode(steps, controls, show_tips=False)
+    with gzip.open(tmp_path / 'out.gcode.gz', 'rt') as f:
+        assert f.read() == expected
+
+
+def test_stream_output_by_extension(tmp_path):
+    """Streamed output is compressed according to the extension of the output path, or to a binary file object"""
+    steps = _steps()
+    expected = gcode(steps, GcodeControls(), show_tips=False)
+    gcode(steps, GcodeControls(output=tmp_path / 'out.gcode.gz'), show_tips=False)
+    assert gzip.decompress((tmp_path / 'out.gcode.gz').read_bytes()).decode() == expected
+    gcode(steps, GcodeControls(output=tmp_path / 'out.bgcode'), show_tips=False)
+    assert read_bgcode((tmp_path / 'out.bgcode').read_bytes())[0] == expected
+    buffer = io.BytesIO()
+    gcode(steps, GcodeControls(output=buffer, save_format='gcode.gz'), show_tips=False)
+    assert gzip.decompress(buffer.getvalue()).decode() == expected
+
+
+def test_bgcode_blocks_and_checksums(tmp_path):
+    """Binary gcode has the GCDE header, metadata blocks, compressed gcode blocks and valid checksums"""
+    steps = _steps()
+    expected = gcode(steps, GcodeControls(), show_tips=False)
+    data = b''.join(bgcode_chunks([expected], block_size=20000))
+    assert data[:4] == b'GCDE'
+    assert len(data) < len(expected) / 2
+    text, metadata = read_bgcode(data)
+    assert text == expected
+    assert metadata['file'] == {'Producer': 'FullControl'}
+    corrupted = bytearray(data)
+    corrupted[-10] ^= 0xFF
+    with pytest.raises(ValueError):
+        read_bgcode(bytes(corrupted))
+
+
+def test_bgcode_deflate_and_invalid_compression():
+    """Deflate compression is supported and unknown compression types are rejected"""
+    data = b''.join(bgcode_chunks(['G1 X1 Y1\n' * 100], compression='deflate'))
+    assert read_bgcode(data)[0] == 'G1 X1 Y1\n' * 100
+    with pytest.raises(ValueError):
+        list(bgcode_chunks(['G1'], compression='zip'))
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from fullcontrol.geometry import ArcLength, Point, PointArray, path_length, segmented_path
+
+path = [Point(x=0, y=0, z=0), Point(x=3, y=0, z=0), Point(x=3, y=0, z=0), Point(x=3, y=4, z=0, color=[1, 0, 0])]
+
+
+def test_positions():
+    arc = ArcLength(path)
+    assert arc.length == 7 and arc.cumulative.tolist() == [0, 3, 3, 7]
+    assert arc.position_at(1.5) == Point(x=1.5, y=0, z=0)
+    assert arc.position_at(5) == Point(x=3, y=2, z=0)
+    np.testing.assert_allclose(arc.positions([-1, 3, 10]), [[0, 0, 0], [3, 0, 0], [3, 4, 0]])
+    with pytest.raises(ValueError):
+        ArcLength([Point(x=0, y=0, z=0), Point(x=1, y=0)])
+
+
+def test_resample():
+    arc = ArcLength(path)
+    points = arc.resample(segments=7)
+    assert [(p.x, p.y) for p in points] == [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3), (3, 4)]
+    assert points[-1].color == [1, 0, 0] and points[-1] is not path[-1]
+    # the number of segments for a spacing is rounded up
+    assert len(arc.resample(spacing=2)) == 5 and len(arc.resample(spacing=3.5)) == 3
+    array = arc.resample(spacing=1, return_array=True)
+    assert isinstance(array, PointArray) and np.allclose(array.xyz, [(p.x, p.y, p.z) for p in points])
+    assert ArcLength(array).length == 7
+    for kwargs in ({}, {'segments': 0}, {'segments': -1}):
+        with pytest.raises(ValueError):
+            arc.resample(**kwargs)
+
+
+def test_segmented_path_uses_arc_length():
+    zigzag = [Point(x=float(i), y=float(i % 2), z=0) for i in range(20)]
+    points = segmented_path(zigzag, 50)
+    steps = np.diff([(p.x, p.y, p.z) for p in points], axis=0)
+    # points are equally spaced along the path (the distance between points is less at corners)
+    assert len(points) == 51 and np.all(np.linalg.norm(steps, axis=1) <= path_length(zigzag) / 50 + 1e-9)
+    assert points[0] == zigzag[0] and points[-1] == zigzag[-1]
+
+
+def test_segmented_path_without_segments():
+    """segmented_path() with 0 segments gives the start and end of the path, as before ArcLength was used"""
+    zigzag = [Point(x=float(i), y=float(i % 2), z=0) for i in range(20)]
+    assert segmented_path(zigzag, 0) == [zigzag[0], zigzag[-1]]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from math import pi, tau
+import fullcontrol as fc
+from fullcontrol.geometry import Point, PointArray, Vector
+
+centre = Point(x=1.5, y=-2, z=0.3)
+
+
+@pytest.mark.parametrize('function, args', [
+    (fc.arcXY, (centre, 5, 0.3, 2.5, 50)),
+    (fc.variable_arcXY, (centre, 5, 0.3, 2.5, 50, 3, 2)),
+    (fc.elliptical_arcXY, (centre, 5, 2, 0.3, 4, 50)),
+    (fc.circleXY, (centre, 5, 1, 64, True)),
+    (fc.circleXY_3pt, (Point(x=0, y=0, z=1), Point(x=2, y=0, z=1), Point(x=1, y=1, z=1), 0, 30)),
+    (fc.ellipseXY, (centre, 3, 1, 0, 40)),
+    (fc.polygonXY, (centre, 3, 0, 6)),
+    (fc.spiralXY, (centre, 1, 5, 0, 3.5, 200)),
+    (fc.helixZ, (centre, 5, 5, 0, 10, 0.2, 3600)),
+    (fc.squarewaveXY, (centre, Vector(x=1, y=1), 2, 1, 5, True)),
+    (fc.squarewaveXY, (Point(x=0, y=0, z=0), Vector(x=1, y=0), 2, 2, 2)),
+    (fc.squarewaveXY, (Point(x=10, y=10, z=5), Vector(x=1, y=0), 2, 2, 3)),
+    (fc.squarewaveXYpolar, (centre, 0.5, 2, 1, 5)),
+    (fc.trianglewaveXYpolar, (centre, 0.5, 2, 1, 5)),
+    (fc.sinewaveXYpolar, (centre, 0.5, 2, 3, 4, 16, 0.3)),
+    (fc.sinewaveXYpolar, (Point(x=0, y=0, z=0), 0, 1, tau, 1, 4, pi / 2)),
+])
+def test_array_matches_points(function, args):
+    """return_array=True gives the positions of the Points returned by default"""
+    points = function(*args)
+    array = function(*args, return_array=True)
+    assert isinstance(array, PointArray)
+    np.testing.assert_allclose(array.xyz, [(p.x, p.y, p.z) for p in points], atol=1e-9)
+    # values very close to zero are cleaned up in the same way
+    assert np.array_equal(array.xyz == 0, np.array([(p.x, p.y, p.z) for p in points]) == 0)
+
+
+def test_array_gcode():
+    """The PointArray of a curve generates the same gcode as its Points"""
+    from fullcontrol.gcode import gcode, GcodeControls
+    helix = fc.helixZ(Point(x=50, y=50, z=0.2), 10, 10, 0, 2, 0.2, 72, return_array=True)
+    assert gcode([helix], GcodeControls(), show_tips=False) == gcode(helix.to_points(), GcodeControls(), show_tips=False)
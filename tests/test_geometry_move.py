@@ -121,4 +121,12 @@ def test_copy_geometry_list():
     assert isinstance(result[5], Point)
     assert result[5].x == 20
     assert result[5].y == 35
-    assert result[5].z == 50
\ No newline at end of file
+    assert result[5].z == 50
+
+def test_move_copies_color():
+    """Moved points have their own copy of the color of the original point"""
+    point = Point(x=10, y=20, z=30, color=[1, 0, 0])
+    result = move([point], Vector(x=1), copy=True, copy_quantity=3)
+    assert [p.x for p in result] == [10, 11, 12]
+    result[1].color[1] = 1
+    assert point.color == [1, 0, 0] and result[2].color == [1, 0, 0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import fullcontrol as fc
+from fullcontrol.geometry import Point, Vector, Extruder, Transform
+from fullcontrol.check import fix
+from lab.fullcontrol.geometry import rotate
+
+centre = Point(x=5, y=5, z=0)
+points = [Point(x=float(i), y=float(i % 7) - 3, z=0.2 + 0.01 * i, color=[1, 0, 0]) for i in range(30)]
+steps = points[:10] + [Extruder(on=False)] + points[10:]
+
+
+def xyz(steps):
+    return np.array([(step.x, step.y, step.z) for step in steps if isinstance(step, Point)])
+
+
+def test_matches_chained_functions():
+    """A chain of operations gives the same result as calling the geometry functions in turn"""
+    axis_end = Point(x=1, y=1, z=1)
+    chain = Transform(steps).move(Vector(x=1, y=2)).move_polar(centre, 0, 0.7).move_polar(centre, 2, 0.3)
+    chain = chain.rotate(centre, 'z', 0.4).rotate(Point(x=0, y=0, z=0), axis_end, 0.9)
+    expected = fc.move(steps, Vector(x=1, y=2))
+    expected = fc.move_polar(fc.move_polar(expected, centre, 0, 0.7), centre, 2, 0.3)
+    expected = rotate(rotate(expected, centre, 'z', 0.4), Point(x=0, y=0, z=0), axis_end, 0.9)
+    result = chain.apply()
+    np.testing.assert_allclose(xyz(result), xyz(expected), atol=1e-9)
+    # non-Point steps pass through, attributes are kept and the original steps are not edited
+    assert result[10] is steps[10] and result[0].color == [1, 0, 0]
+    assert points[0].x == 0
+
+
+def test_reflect_and_partial_points():
+    p1, p2 = Point(x=0, y=0, z=0), Point(x=1, y=2, z=0)
+    chain = Transform().reflectXY(p1, p2).move(Vector(z=1))
+    expected = [fc.move(fc.reflectXY(p, p1, p2), Vector(z=1)) for p in points]
+    np.testing.assert_allclose(xyz(chain.apply(points)), xyz(expected), atol=1e-9)
+    # points without all of x, y, z defined are transformed one operation at a time
+    chain = Transform().move(Vector(x=1, z=2)).move_polar(centre, 1, 0.5)
+    assert chain.apply(Point(x=1, y=1)) == fc.move_polar(fc.move(Point(x=1, y=1), Vector(x=1, z=2)), centre, 1, 0.5)
+    with pytest.raises(ValueError):
+        Transform().rotate(centre, 'z', 1).apply(Point(x=1))
+    with pytest.raises(ValueError):
+        Transform().move(Vector(x=1)).apply()
+
+
+def test_transform_in_steps():
+    """Transforms in a design (including PointArrays) are applied by transform() and export"""
+    arc = fc.arcXY(centre, 3, 0, 3, 20, return_array=True)
+    chain = Transform([Point(x=0, y=0, z=0.2), arc]).move(Vector(x=1))
+    fixed = fix([chain, Extruder(on=True)], 'gcode', None)
+    assert fixed[0] == Point(x=1, y=0, z=0.2) and isinstance(fixed[2], Extruder)
+    np.testing.assert_allclose(fixed[1].xyz, arc.xyz + [1, 0, 0])
+    assert len(list(fix(iter([chain]), 'gcode', None))) == 2
@@ -11,14 +11,16 @@ def test_squarewave_vector():
     direction = Vector(x=1, y=0)  # Horizontal wave
     points = squarewaveXY(start, direction, amplitude=2, line_spacing=2, periods=2)
     
-    # Should have 9 points for 2 periods: start + (up, right, down, right) * 2
-    assert len(points) == 9
-    # Verify just the first few points since our implementation might differ
-    assert points[0].x == 0 and points[0].y == 0  # Start
-    assert points[1].x == 0 and points[1].y == 2  # Up
-    assert points[2].x == 1 and points[2].y == 2  # Right
-    # The remaining points might differ based on implementation
-    # Skip detailed checks on remaining points
+    # Should have 9 points for 2 periods: start + (up, right, down, right) * 2, between y=2 and y=-2
+    assert [(p.x, p.y, p.z) for p in points] == [
+        (0, 0, 0), (0, 2, 0), (1, 2, 0), (1, -2, 0), (2, -2, 0), (2, 2, 0), (3, 2, 0), (3, -2, 0), (4, -2, 0)]
+
+def test_squarewave_start():
+    """The wave starts at the start point"""
+    for periods in (2, 3):
+        points = squarewaveXY(Point(x=10, y=10, z=5), Vector(x=1, y=0), 2, 2, periods)
+        assert (points[0].x, points[0].y, points[0].z) == (10, 10, 5)
+        assert (points[-1].x, points[-1].y) == (10 + 2 * periods, 8)
 
 def test_squarewave_polar():
     """Test square wave generation using polar direction"""
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+
+def modules_after(statement: str) -> set:
+    'the modules loaded by statement in a new interpreter'
+    code = f'import sys\n{statement}\nprint(" ".join(sys.modules))'
+    return set(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split())
+
+
+def test_lazy_fullcontrol():
+    modules = modules_after('import fullcontrol')
+    assert 'fullcontrol.combinations.gcode_and_visualize.common' not in modules
+    assert 'pydantic' not in modules
+    modules = modules_after('import fullcontrol as fc\nassert fc.Point(x=1).x == 1')
+    assert 'fullcontrol.combinations.gcode_and_visualize.common' in modules and 'plotly' not in modules
+
+
+def test_gcode_without_visualize():
+    modules = modules_after('import fullcontrol.gcode')
+    assert not any(module.startswith(('fullcontrol.visualize', 'plotly')) for module in modules)
+
+
+def test_star_import():
+    modules_after('from fullcontrol import *\nassert transform and Point and GcodeControls and geometry')
+
+
+def test_lazy_names_listed():
+    modules_after('import fullcontrol.gcode as gc\nassert {"import_gcode", "GcodeSession"} <= set(dir(gc)) & set(gc.__all__)')
+    modules_after('import fullcontrol.visualize as vis\nassert "visualize" in set(dir(vis)) & set(vis.__all__)')
+    modules = modules_after('from fullcontrol.gcode import *\nassert import_gcode and estimate_print and gcode and Point')
+    assert not any(module.startswith(('fullcontrol.visualize', 'plotly')) for module in modules)